@@ -1,13 +1,40 @@
+import sys
+import numpy as np
 import pandas as pd
 from collections import defaultdict
+from functools import lru_cache
 from typing import Iterable, Dict, List, Tuple, Set
 
+from table_reader import readTable, applySchema, RAW_SHEET
+from workload_rules import loadRuleTable, compileRules, enrollmentBands, OVERRIDE_SCOPE_COLUMNS
+from assignment import AssignmentMatrix
+from schedule import roomKey
+from cancellation import checkpoint
+
 # ---------------------------------------------------------------------------
 # Helper utilities
 # ---------------------------------------------------------------------------
 
+# Category text (CCAT, Class, Instructor Role, ...) has a handful of distinct
+# values, so each one is stripped/lowercased once and interned; every course
+# sharing a value then holds the same canonical string.
+@lru_cache(maxsize=None)
+def _normText(s: str) -> str:
+    return sys.intern(s.strip().lower())
+
+
 def _norm(s):
-    return str(s).strip().lower() if pd.notna(s) else ""
+    return _normText(str(s)) if pd.notna(s) else ""
+
+
+@lru_cache(maxsize=None)
+def _containsAny(text: str, needles) -> bool:
+    """Substring test against canonical values, answered once per distinct (text, needles)."""
+    return any(k in text for k in needles)
+
+
+THESIS_CAT_NBRS = ("699", "799")
+GROUPED_CATEGORIES = ("lecture", "laboratory")
 
 
 def _meeting_signature(row_or_course) -> Tuple:
@@ -22,6 +49,52 @@ def _meeting_signature(row_or_course) -> Tuple:
         #_norm(data.get("Facility Room")),
     )
 
+# ---------------------------------------------------------------------------
+# Input schemas – the only columns ever read from each file
+# ---------------------------------------------------------------------------
+
+RAW_SCHEMA = {
+    'Term': 'code',
+    'Subject': 'category',
+    'Cat Nbr': 'text',
+    'Section': 'text',
+    'Class Nbr': 'Int64',
+    'Class': 'category',
+    'Class Description': 'text',
+    'Course Category (CCAT)': 'category',
+    'Max Units': 'Float64',
+    'Enroll Total': 'Int64',
+    'Start Date': 'datetime',
+    'End Date': 'datetime',
+    'Start Time': 'datetime',
+    'End Time': 'datetime',
+    'Days': 'category',
+    'Facility Building': 'category',
+    'Facility Room': 'category',
+    'Unit': 'category',
+    'Instructor': 'text',
+    'Instructor Email': 'text',
+    'Instructor Emplid': 'Int64',
+    'Instructor Role': 'category',
+}
+
+TRACK_SCHEMA = {
+    'Instructor Emplid': 'Int64',
+    'Track': 'category',
+}
+
+# the whole track file, for matching instructors missing from it
+TRACK_ROSTER_SCHEMA = {
+    'Instructor': 'text',
+    'Instructor Email': 'text',
+    'Instructor Emplid': 'Int64',
+    'Track': 'category',
+}
+
+SPECIAL_SCHEMA = {
+    'Course': 'text',
+}
+
 # ---------------------------------------------------------------------------
 # Policy / loaders
 # ---------------------------------------------------------------------------
@@ -39,12 +112,27 @@ def loadWorkloadPolicy(path: str | None = None) -> dict:
         "lectureThreshold": {"low": 90, "mid": 150, "high": 200},
         "midRate": 4.17,
         "highRate": 5.0,
-        "maxRate": 6.66
+        "maxRate": 6.66,
+        # 1 = co-convened sections must also share a building and room
+        "coconvenedSameRoom": 0.0
     }
     policy = defaults.copy()
+    overrides = []
     if path:
         try:
             df = pd.read_excel(path)
+            # rows scoped to a Unit and/or Subject are overrides, not global values
+            scope = [c for c in df.columns if str(c).strip() in OVERRIDE_SCOPE_COLUMNS]
+            scoped = df[scope].notna().any(axis=1).to_numpy() if scope else np.zeros(len(df), dtype=bool)
+            for _, r in df[scoped].iterrows():
+                value = r.iloc[1]
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    pass
+                overrides.append({"Parameter": str(r.iloc[0]).strip(), "Value": value,
+                                  **{str(c).strip(): r[c] for c in scope if pd.notna(r[c])}})
+            df = df[~scoped]
             kv = {str(k).strip(): v for k, v in zip(df.iloc[:, 0], df.iloc[:, 1])}
             if all(k in kv for k in ("lectureThreshold_low", "lectureThreshold_mid", "lectureThreshold_high")):
                 policy["lectureThreshold"] = {
@@ -59,25 +147,43 @@ def loadWorkloadPolicy(path: str | None = None) -> dict:
                     policy[k] = v
         except Exception as e:
             print("Warning: failed to load policy – using defaults:", e)
+    known = lambda k: k in policy or k.startswith(("lectureThreshold_", "enrollmentBands_"))
+    for o in overrides:
+        if not known(o["Parameter"]):
+            print(f"Warning: policy override for unknown parameter '{o['Parameter']}' ignored")
+    # per-unit / per-subject values (see workload_rules "Unit / subject overrides")
+    policy["overrides"] = [o for o in overrides if known(o["Parameter"])]
+    # enrollment band tables per category (see workload_rules.enrollmentBands)
+    policy["enrollmentBands"] = enrollmentBands(policy)
+    # ordered load rules (workload_rules.csv next to the policy file, else built-in)
+    policy["rules"] = loadRuleTable(path)
     return policy
 
 
 def loadInstructorTrack(p: str) -> dict:
     try:
-        df = pd.read_excel(p)
-        return pd.Series(df["Track"].values, index=df["Instructor Emplid"]).to_dict()
+        df = readTable(p, schema=TRACK_SCHEMA).dropna(subset=["Instructor Emplid"])
+        return dict(zip(df["Instructor Emplid"].tolist(), df["Track"].tolist()))
     except Exception as e:
         print("Warning loading track file:", e)
         return {}
 
 
+def loadTrackRoster(p: str) -> pd.DataFrame:
+    try:
+        return readTable(p, schema=TRACK_ROSTER_SCHEMA)
+    except Exception as e:
+        print("Warning loading track file:", e)
+        return pd.DataFrame(columns=list(TRACK_ROSTER_SCHEMA))
+
+
 def loadSpecialCourses(p: str) -> set:
     try:
-        df = pd.read_excel(p)
-        return set(df["Course"].dropna().astype(str).str.strip().str.lower())
+        df = readTable(p, schema=SPECIAL_SCHEMA)
+        return frozenset(df["Course"].dropna().astype(str).str.strip().str.lower())
     except Exception as e:
         print("Warning loading special courses:", e)
-        return set()
+        return frozenset()
 
 # ---------------------------------------------------------------------------
 # Row filter
@@ -90,6 +196,76 @@ def rowIsValid(row: pd.Series) -> bool:
     
     return True
 
+# ---------------------------------------------------------------------------
+# Raw export
+# ---------------------------------------------------------------------------
+
+DEDUPE_COLUMNS = [
+    'Instructor Emplid', 'Term', 'Subject', 'Cat Nbr', 'Section',
+    'Start Date', 'End Date', 'Start Time', 'End Time', 'Facility Building', 'Facility Room', 'Days'
+]
+
+
+SIGNATURE_COLUMN = 'Row Signature'
+
+
+def rowSignatures(df: pd.DataFrame) -> pd.Series:
+    """64-bit hash of the dedupe key columns – a stable identity for each raw row."""
+    return pd.util.hash_pandas_object(df[DEDUPE_COLUMNS], index=False)
+
+
+def rowContentHashes(df: pd.DataFrame) -> pd.Series:
+    """64-bit hash of every schema column – changes whenever anything in the row does (e.g. Enroll Total)."""
+    return pd.util.hash_pandas_object(df[[c for c in RAW_SCHEMA if c in df.columns]], index=False)
+
+
+def signatureText(sig: pd.Series) -> pd.Series:
+    # uint64 does not survive Excel's float cells, so reports show it as hex
+    return sig.map("{:016x}".format)
+
+
+def dedupeRawRows(raw_df: pd.DataFrame):
+    """
+    Drops rows whose signature was already seen. Returns the de-duplicated frame
+    (with the signature kept as a column) and an audit frame holding, per
+    duplicated signature, how many copies were dropped and one sample row.
+    """
+    sig = rowSignatures(raw_df)
+    dup = sig.duplicated(keep="first").to_numpy()
+    raw_df = raw_df.assign(**{SIGNATURE_COLUMN: sig.to_numpy()})
+
+    dropped = raw_df[dup]
+    counts = dropped[SIGNATURE_COLUMN].value_counts(sort=False)
+    samples = dropped.drop_duplicates(subset=[SIGNATURE_COLUMN])[[SIGNATURE_COLUMN] + DEDUPE_COLUMNS]
+    duplicates = samples.assign(**{
+        SIGNATURE_COLUMN: signatureText(samples[SIGNATURE_COLUMN]),
+        'Copies Dropped': samples[SIGNATURE_COLUMN].map(counts).to_numpy(),
+    }).reset_index(drop=True)
+
+    return raw_df[~dup].reset_index(drop=True), duplicates
+
+
+def loadRawData(path: str):
+    """
+    Reads the "Raw Data" table from xlsx, csv, parquet or arrow and returns the
+    validated, de-duplicated frame the rest of the pipeline expects, plus the
+    duplicate audit from dedupeRawRows.
+    """
+    return _cleanRawData(readTable(path, sheet_name=RAW_SHEET, schema=RAW_SCHEMA))
+
+
+def prepareRawData(raw_df: pd.DataFrame):
+    """loadRawData for a frame already in memory: schema columns and dtypes, validation, de-duplication."""
+    raw_df = raw_df[[c for c in RAW_SCHEMA if c in raw_df.columns]].copy()
+    return _cleanRawData(applySchema(raw_df, RAW_SCHEMA))
+
+
+def _cleanRawData(raw_df: pd.DataFrame):
+    raw_df['Max Units'] = raw_df['Max Units'].fillna(0.0)
+    raw_df['Enroll Total'] = raw_df['Enroll Total'].fillna(0)
+    raw_df = raw_df[raw_df.apply(rowIsValid, axis=1)].reset_index(drop=True)
+    return dedupeRawRows(raw_df)
+
 # ---------------------------------------------------------------------------
 # Course object
 # ---------------------------------------------------------------------------
@@ -98,26 +274,21 @@ class Course:
     def __init__(self, data: dict, policy: dict, special: Set[str]):
         self.rawData = data
         self.policy = policy
-        self.special = special
+        self.special = special if isinstance(special, frozenset) else frozenset(special)
 
         self.courseCategory = _norm(data.get("Course Category (CCAT)"))
         self.classCat = _norm(data.get("Class"))
 
-        classNbrRaw = str(data.get("Class Nbr", "")).strip()
-        self.classNbr = str(int(float(classNbrRaw))) if classNbrRaw.replace(".", "", 1).isdigit() else classNbrRaw
+        # values arrive typed by RAW_SCHEMA (Int64 / Float64 / text), no re-parsing here
+        classNbr = data.get("Class Nbr")
+        self.classNbr = str(classNbr) if pd.notna(classNbr) else ""
 
-        cat_raw = str(data.get("Cat Nbr", "")).strip()
-        self.catNbr = str(int(float(cat_raw))) if cat_raw.replace(".", "", 1).isdigit() else cat_raw
+        self.catNbr = str(data.get("Cat Nbr", "")).strip()
         self.instructorRole = _norm(data.get("Instructor Role"))
 
-        numUnits = data.get("Max Units", 0)
-        self.maxUnits = float(numUnits) if pd.notna(numUnits) else 0.0
-
-        numEnroll = data.get("Enroll Total", 0)
-        self.enrollTotal = int(numEnroll) if pd.notna(numEnroll) else 0
-
-        emplid_raw = data.get("Instructor Emplid", None)
-        self.instructorEmplid = int(float(emplid_raw)) if pd.notna(emplid_raw) else None
+        self.maxUnits = data.get("Max Units") or 0.0
+        self.enrollTotal = data.get("Enroll Total") or 0
+        self.instructorEmplid = data.get("Instructor Emplid")
 
         self.startDate = data.get("Start Date")
         self.startTime = data.get("Start Time")
@@ -125,7 +296,14 @@ class Course:
         self.facilityRoom = data.get("Facility Room")
 
         self.unit = str(data.get("Unit", "")).strip()
+        self.rowSignature = data.get(SIGNATURE_COLUMN)
         self.load: float | None = None
+        # priced load before any team-taught split, and the split that applies
+        self.preDivisionLoad: float | None = None
+        self.divisor: int = 1
+        # set on the representative of a co-convened bundle
+        self.bundleEnroll: int | None = None
+        self.coconvenedRep: bool = False
 
         self.co_convened_members: List[str] = []
         self.team_taught_members: List[str] = []
@@ -136,6 +314,9 @@ class Course:
     def _meeting_signature(self):
         return _meeting_signature(self.rawData)
 
+    def courseKey(self) -> str:
+        return f"{self.rawData.get('Subject','').strip()} {self.catNbr}-{self.rawData.get('Section','').strip()}"
+
     def getGroupKeyForGrouping(self):
         term = self.rawData.get("Term")
         subject = self.rawData.get("Subject")
@@ -149,45 +330,36 @@ class Course:
         term = self.rawData.get("Term")
         subject = self.rawData.get("Subject")
         section = self.rawData.get("Section")
-        return (self.instructorEmplid, term, subject, section) + self._meeting_signature()
+        key = (self.instructorEmplid, term, subject, section) + self._meeting_signature()
+        if self.policy.get("coconvenedSameRoom"):
+            # stricter bundles: same bucket of the room occupancy index as well
+            key += (roomKey(self.facilityBuilding, self.facilityRoom),)
+        return key
+
+    def resetGrouping(self):
+        """Clears team-taught / co-convened state so the detectors can be re-run on this course."""
+        self.load = None
+        self.preDivisionLoad = None
+        self.divisor = 1
+        self.bundleEnroll = None
+        self.coconvenedRep = False
+        self.co_convened_members = []
+        self.team_taught_members = []
+        self.isCoconvened = False
+        self.isTeamTaught = False
 
     # ------------------------------------------------------------------
-    def _baseRate(self):
-        p = self.policy
-        if any(k in self.classCat for k in ("mat 100", "mat 108", "mat 114", "mat 125")) and self.instructorRole == "st":
-            return float(p.get("supplementalInstructionRate", 1.0))
-        if any(k in self.catNbr for k in ("699", "799")):
-            return float(p.get("699 and 799 Rate", 1.0))
-
-        if any(k in self.courseCategory for k in ("independent study", "research", "fieldwork", "research - experiential", "individualized study - experie")):
-            if self.maxUnits > 0 and self.maxUnits <= 2:
-                return float(p.get("independentStudyRateLow", 0.25))
-            elif self.maxUnits > 2:
-                return float(p.get("independentStudyRateHigh", 0.5))
-        if "laboratory" in self.courseCategory:
-            return float(p.get("laboratoryRate", 5.0))
-        
-        return float(p.get("lectureRate", 3.33))
-
-    def _adjustForEnrollment(self, base):
-        if "lecture" not in self.courseCategory:
-            return base
-        p = self.policy
-        low, mid, high = (float(p["lectureThreshold"][k]) for k in ("low", "mid", "high"))
-        s = self.enrollTotal
-        if s < low:
-            return base
-        if low <= s <= mid:
-            return float(p["midRate"])
-        if mid < s <= high:
-            return float(p["highRate"])
-        
-        return float(p["maxRate"])
-        
+    def effectiveEnroll(self):
+        return self.bundleEnroll if self.bundleEnroll is not None else self.enrollTotal
+
+    def shareWeight(self) -> float:
+        """Fraction of this course's load carried by its instructor."""
+        if self.isCoconvened:
+            return 1.0 if self.coconvenedRep else 0.0
+        return 1.0 / self.divisor
 
-    # ------------------------------------------------------------------
     def calculateLoad(self):
-        if self.enrollTotal == 0 or self.enrollTotal is None:
+        if not self.effectiveEnroll():
             self.load = 0.0
             return 0.0
         
@@ -197,41 +369,36 @@ class Course:
         
         if self.load is not None:
             return self.load
-        
-        base = self._baseRate()
-        eff_enroll = self.enrollTotal
-        
-        if any(k in self.classCat for k in ("mat 100", "mat 108", "mat 114", "mat 125")) and self.instructorRole == "st":
-            load = base
-        
-        elif any(k in self.catNbr for k in ("699", "799")):
-            load = min(base * eff_enroll, 5.0)
 
-        elif any(k in self.courseCategory for k in ("independent study", "research", "fieldwork")):
-            load = base * eff_enroll
-            cap = self.policy.get("maxLoadCap", 5.0)
-            load = min(load, cap)
+        # single-course fallback; whole runs are priced by priceCourses
+        self.load = float(compileRules(self.policy).evaluate(courseTable([self]), self.special)[0])
+        return self.load
 
-        else:
-            rate = self._adjustForEnrollment(base)
-            load = self.maxUnits * rate
-            if "lecture" in self.courseCategory:
-                load = min(load, self.maxUnits * (20.0/3.0))
+# ---------------------------------------------------------------------------
+# Vectorized pricing
+# ---------------------------------------------------------------------------
 
-        if any(code in self.classCat for code in self.special):
-            load += self.maxUnits * self.policy.get("specialCoursesRate", 0.005)
+def courseTable(courses: List[Course]) -> dict:
+    """Column arrays of the fields the rule table matches on."""
+    return {
+        "classCat": [c.classCat for c in courses],
+        "catNbr": [c.catNbr for c in courses],
+        "courseCategory": [c.courseCategory for c in courses],
+        "instructorRole": [c.instructorRole for c in courses],
+        "maxUnits": [c.maxUnits for c in courses],
+        "enrollTotal": [c.effectiveEnroll() for c in courses],
+        # scope of any per-unit / per-subject policy overrides
+        "unit": [c.unit for c in courses],
+        "subject": [str(c.rawData.get("Subject", "")).strip() for c in courses],
+    }
 
-        self.load = load
-        return round(load, 2)
 
-    def adjustLoadDivision(self, d):
-        if d <= 1:
-            return self.load
-        if self.load is None:
-            self.load = self.calculateLoad()
-        self.load /= d
-        self.isteamTaught = True 
-        return self.load
+def priceCourses(courses: List[Course]):
+    """Per-course load vector from one pass of the compiled rule table."""
+    if not courses:
+        return np.zeros(0)
+    first = courses[0]
+    return compileRules(first.policy).evaluate(courseTable(courses), first.special)
 
 # ---------------------------------------------------------------------------
 # Faculty container
@@ -255,6 +422,27 @@ class FacultyMember:
         self.totalLoad = sum(c.calculateLoad() for c in self.courses.values()) 
         return self.totalLoad
 
+# ---------------------------------------------------------------------------
+# Team‑taught detection
+# ---------------------------------------------------------------------------
+
+def detect_team_taught(courseGroups: Dict[Tuple, List[Course]]) -> None:
+    for lst in courseGroups.values():
+        valid = [c for c in lst if all(c._meeting_signature())]
+        valid = [c for c in valid if not _containsAny(c.catNbr, THESIS_CAT_NBRS)]
+        valid = [c for c in valid if _containsAny(c.courseCategory, GROUPED_CATEGORIES)]
+        pi_only = [c for c in valid if c.instructorRole == "pi"]
+        unique_emplids = {c.instructorEmplid for c in pi_only}
+        if len(unique_emplids) >= 2:
+            names = [c.rawData.get('Instructor','').strip() for c in pi_only]
+            for c in pi_only:
+                c.team_taught_members = [
+                    n for n in names 
+                    if n != c.rawData.get('Instructor','').strip()
+                ]
+                c.divisor = len(unique_emplids)
+                c.isTeamTaught = True
+
 # ---------------------------------------------------------------------------
 # Co‑convened adjustment
 # ---------------------------------------------------------------------------
@@ -262,7 +450,7 @@ class FacultyMember:
 def adjust_co_convened(courses: Iterable[Course]) -> None:
     bundles: Dict[Tuple, List[Course]] = defaultdict(list)
     for c in courses:
-        if not any(t in c.courseCategory for t in ("lecture", "laboratory")) or any(t in c.catNbr for t in ("699", "799")):
+        if not _containsAny(c.courseCategory, GROUPED_CATEGORIES) or _containsAny(c.catNbr, THESIS_CAT_NBRS):
             continue
 
         if c.instructorEmplid is None:
@@ -278,27 +466,70 @@ def adjust_co_convened(courses: Iterable[Course]) -> None:
         if len(same) <= 1: 
             continue
         
-        ids = [
-            f"{c.rawData.get('Subject','').strip()} {c.catNbr}-{c.rawData.get('Section','').strip()}"
-            for c in same
-        ]
+        ids = [c.courseKey() for c in same]
 
         for c in same:
-            me = f"{c.rawData.get('Subject','').strip()} {c.catNbr}-{c.rawData.get('Section','').strip()}"
+            me = c.courseKey()
             c.co_convened_members = [other for other in ids if other != me]
         
         rep, *others = sorted(same, key=lambda c: c.maxUnits, reverse=True)
-        combined = sum(c.enrollTotal for c in same)
-        rep.enrollTotal = combined
-        rep.load = None
-        rep.load = rep.calculateLoad()
+        # the representative is priced on the combined enrollment and carries
+        # it in full (replacing any team-taught split); the others carry 0
+        rep.bundleEnroll = sum(c.enrollTotal for c in same)
+        rep.coconvenedRep = True
+        rep.divisor = 1
         rep.isCoconvened = True
 
         for extra in others:
-            extra.load = 0
             extra.isCoconvened = True
 
 
+def buildCourseModel(raw_df: pd.DataFrame, policy: dict, tracks: dict, special, cancel=None):
+    """
+    Courses for every tracked raw row, their faculty, and team-taught /
+    co-convened detection. Returns (faculty, courses) with courses ordered
+    group by group, as the detectors and pricing expect. cancel is an
+    optional CancelToken checked as the rows are read.
+    """
+    faculty = {}
+    courseGroups = {}
+    for i, row in enumerate(raw_df.to_dict("records")):
+        checkpoint(cancel, i)
+        emplid = row.get('Instructor Emplid')
+        if pd.isna(emplid) or emplid not in tracks:
+            continue
+
+        course = Course(row, policy, special)
+        courseGroups.setdefault(course.getGroupKeyForGrouping(), []).append(course)
+
+        if emplid not in faculty:
+            role = str(row.get('Instructor Role', '')).strip().upper()
+            faculty[emplid] = FacultyMember(row.get('Instructor', ''), row.get('Instructor Email', ''), emplid, role, tracks[emplid])
+        faculty[emplid].addCourse(course)
+
+    detect_team_taught(courseGroups)
+    courses = [c for lst in courseGroups.values() for c in lst]
+    adjust_co_convened(courses)
+    return faculty, courses
+
+
+def applyAssignment(faculty: Dict[int, FacultyMember], courses: List[Course]):
+    """
+    Prices all courses, builds the faculty × course assignment matrix and sets
+    each faculty total (one mat-vec) and each course's carried load.
+    Returns (matrix, loads).
+    """
+    loads = priceCourses(courses)
+    matrix = AssignmentMatrix.build(faculty, courses)
+    totals = matrix.facultyTotals(loads)
+    for emplid, total in zip(matrix.emplids, totals.tolist()):
+        faculty[emplid].totalLoad = total
+    for c, load in zip(courses, loads.tolist()):
+        c.preDivisionLoad = load
+        c.load = load * c.shareWeight()
+    return matrix, loads
+
+
 ################################################################################
 '''
 def main():
@@ -0,0 +1,78 @@
+import numpy as np
+from scipy import sparse
+
+# ---------------------------------------------------------------------------
+# Faculty × course assignment matrix
+#
+# Row i is a faculty member, column j a course (one raw row). The entry is the
+# share of course j's load that faculty i carries: 1 for a solo section, 1/k
+# for a k-way team-taught section, 1 for the representative of a co-convened
+# bundle and 0 for the other bundle members. Every total is then a sparse
+# mat-vec against the per-course load vector; nothing mutates Course.load.
+# ---------------------------------------------------------------------------
+
+class AssignmentMatrix:
+    def __init__(self, emplids, courses, matrix):
+        self.emplids = list(emplids)
+        self.courses = list(courses)
+        self.matrix = matrix.tocsr()
+        self.row = {e: i for i, e in enumerate(self.emplids)}
+        self.col = {id(c): j for j, c in enumerate(self.courses)}
+        self.unitNames = None
+        self._unitMatrix = None
+
+    @classmethod
+    def build(cls, facultyDict, courses):
+        """Weights come from each course's team-taught divisor / co-convened role."""
+        courses = list(courses)
+        col = {id(c): j for j, c in enumerate(courses)}
+        emplids = list(facultyDict)
+        rows, cols, data = [], [], []
+        for i, emplid in enumerate(emplids):
+            for c in facultyDict[emplid].courses.values():
+                rows.append(i)
+                cols.append(col[id(c)])
+                data.append(c.shareWeight())
+        matrix = sparse.csr_matrix((data, (rows, cols)), shape=(len(emplids), len(courses)))
+        return cls(emplids, courses, matrix)
+
+    # ------------------------------------------------------------------
+    def facultyTotals(self, loads: np.ndarray) -> np.ndarray:
+        return self.matrix @ loads
+
+    def courseShares(self, loads: np.ndarray) -> sparse.csr_matrix:
+        """Per (faculty, course) load actually carried – the matrix scaled by the load vector."""
+        return self.matrix.multiply(loads.reshape(1, -1)).tocsr()
+
+    def unitMatrix(self) -> sparse.csr_matrix:
+        """Units × courses indicator (built once)."""
+        if self._unitMatrix is None:
+            units = [c.unit for c in self.courses]
+            self.unitNames = sorted(set(units))
+            index = {u: k for k, u in enumerate(self.unitNames)}
+            self._unitMatrix = sparse.csr_matrix(
+                (np.ones(len(units)), ([index[u] for u in units], np.arange(len(units)))),
+                shape=(len(self.unitNames), len(units)),
+            )
+        return self._unitMatrix
+
+    def unitTotals(self, loads: np.ndarray) -> dict:
+        """Load carried per unit: the column sums of the assignment weights times loads, bucketed by unit."""
+        carried = np.asarray(self.matrix.sum(axis=0)).ravel() * loads
+        totals = self.unitMatrix() @ carried
+        return dict(zip(self.unitNames, totals.tolist()))
+
+    def reassigned(self, moves) -> "AssignmentMatrix":
+        """
+        What-if copy with sections moved between faculty. moves is an iterable of
+        (course, from_emplid, to_emplid); the moved share keeps its weight.
+        """
+        delta_rows, delta_cols, delta = [], [], []
+        for course, src, dst in moves:
+            j = self.col[id(course)]
+            w = self.matrix[self.row[src], j]
+            delta_rows += [self.row[src], self.row[dst]]
+            delta_cols += [j, j]
+            delta += [-w, w]
+        change = sparse.csr_matrix((delta, (delta_rows, delta_cols)), shape=self.matrix.shape)
+        return AssignmentMatrix(self.emplids, self.courses, self.matrix + change)
@@ -0,0 +1,153 @@
+import heapq
+from collections import defaultdict
+
+import pandas as pd
+
+from report_common import TRACK_TARGETS
+
+# ---------------------------------------------------------------------------
+# Load-balancing optimizer
+#
+# Within each Unit, proposes moving sections from instructors above their
+# track target (CT 40 / TT 30) to eligible instructors below it. Greedy local
+# search: the most overloaded instructor is popped from a heap and gives away
+# the single section (or co-convened bundle) that most reduces the summed
+# |load - target| of giver and receiver. Moves are applied to the assignment
+# matrix, so "after" totals come from the same mat-vec as the report.
+# ---------------------------------------------------------------------------
+
+BALANCE_TOLERANCE = 2       # within ±2 of target counts as balanced (as in the reports)
+RECEIVER_CANDIDATES = 8     # most-underloaded receivers tried per item
+
+
+class _Item:
+    """A movable unit of work: one section, or a whole co-convened bundle."""
+
+    def __init__(self, courses, load, subject, exclude):
+        self.courses = courses
+        self.load = load
+        self.subject = subject
+        self.exclude = exclude      # instructors already teaching it (team-taught partners)
+        self.moved = False
+
+    def label(self):
+        return " + ".join(c.courseKey() for c in self.courses)
+
+
+def _movableItems(fac, unit, loads, matrix, teams):
+    bundles = defaultdict(list)
+    items = []
+    for c in fac.courses.values():
+        if c.unit != unit or c.instructorRole != "pi":
+            continue
+        if c.isCoconvened:
+            bundles[c.getGroupKeyForCollapsing()].append(c)
+        else:
+            bundles[id(c)].append(c)
+    for courses in bundles.values():
+        load = sum(loads[matrix.col[id(c)]] * c.shareWeight() for c in courses)
+        if load <= 0:
+            continue
+        subject = str(courses[0].rawData.get("Subject", "")).strip()
+        exclude = set().union(*(teams.get(c.getGroupKeyForGrouping(), set()) for c in courses))
+        items.append(_Item(courses, float(load), subject, exclude))
+    return items
+
+
+def _gain(dev_from, dev_to, x):
+    return abs(dev_from) + abs(dev_to) - abs(dev_from - x) - abs(dev_to + x)
+
+
+def proposeReassignments(faculty, matrix, loads, same_subject=True):
+    """
+    Returns (moves, changes_df, summary_df). moves is a list of
+    (course, from_emplid, to_emplid) ready for AssignmentMatrix.reassigned.
+    """
+    totals = dict(zip(matrix.emplids, matrix.facultyTotals(loads).tolist()))
+    before = dict(totals)
+    target = {
+        e: TRACK_TARGETS.get((fac.track or "").strip().upper())
+        for e, fac in faculty.items()
+    }
+    teams = defaultdict(set)
+    for e, fac in faculty.items():
+        for c in fac.courses.values():
+            if c.isTeamTaught:
+                teams[c.getGroupKeyForGrouping()].add(e)
+
+    units = defaultdict(list)
+    for e, fac in faculty.items():
+        if target[e] is None:
+            continue
+        for unit in {c.unit for c in fac.courses.values() if c.unit}:
+            units[unit].append(e)
+
+    moves, changes = [], []
+    for unit in sorted(units):
+        members = units[unit]
+        subjects = {
+            e: {str(c.rawData.get("Subject", "")).strip() for c in faculty[e].courses.values() if c.unit == unit}
+            for e in members
+        }
+        items = {e: _movableItems(faculty[e], unit, loads, matrix, teams) for e in members}
+        dev = lambda e: totals[e] - target[e]
+
+        heap = [(-dev(e), e) for e in members if dev(e) > BALANCE_TOLERANCE]
+        heapq.heapify(heap)
+        while heap:
+            neg, donor = heapq.heappop(heap)
+            if -neg != dev(donor) or dev(donor) <= BALANCE_TOLERANCE:
+                continue    # stale entry
+
+            receivers = heapq.nsmallest(
+                RECEIVER_CANDIDATES, (e for e in members if e != donor and dev(e) < 0), key=dev
+            )
+            best = None
+            for item in items[donor]:
+                if item.moved:
+                    continue
+                for r in receivers:
+                    if r in item.exclude or (same_subject and item.subject not in subjects[r]):
+                        continue
+                    g = _gain(dev(donor), dev(r), item.load)
+                    if g > 1e-9 and (best is None or g > best[0]):
+                        best = (g, item, r)
+            if best is None:
+                continue
+
+            _, item, r = best
+            item.moved = True
+            before_d, before_r = totals[donor], totals[r]
+            totals[donor] -= item.load
+            totals[r] += item.load
+            for c in item.courses:
+                moves.append((c, donor, r))
+            changes.append({
+                "Unit": unit,
+                "Course": item.label(),
+                "Load Moved": round(item.load, 2),
+                "From": faculty[donor].name,
+                "From Track": faculty[donor].track,
+                "From Load Before": round(before_d, 2),
+                "From Load After": round(totals[donor], 2),
+                "To": faculty[r].name,
+                "To Track": faculty[r].track,
+                "To Load Before": round(before_r, 2),
+                "To Load After": round(totals[r], 2),
+            })
+            if dev(donor) > BALANCE_TOLERANCE:
+                heapq.heappush(heap, (-dev(donor), donor))
+
+    after = dict(zip(matrix.emplids, matrix.reassigned(moves).facultyTotals(loads).tolist())) if moves else before
+    summary = []
+    for unit in sorted(units):
+        members = units[unit]
+        summary.append({
+            "Unit": unit,
+            "Faculty": len(members),
+            "Moves": sum(1 for ch in changes if ch["Unit"] == unit),
+            "Total Deviation Before": round(sum(abs(before[e] - target[e]) for e in members), 2),
+            "Total Deviation After": round(sum(abs(after[e] - target[e]) for e in members), 2),
+        })
+
+    return moves, pd.DataFrame(changes), pd.DataFrame(summary)
@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+import threading
+
+# ---------------------------------------------------------------------------
+# Cancellation
+#
+# A run checks its CancelToken at checkpoints: between pipeline stages and
+# every CHECK_ROWS rows inside the row loops. A cancelled run raises
+# Cancelled from the next checkpoint and puts its output files back as they
+# were: reports it created are removed, and reports it overwrote are restored
+# from copies taken before the run, so a cancelled run leaves neither
+# half-written reports nor a missing previous one. A read of one huge file
+# has no checkpoints; the worker process is simply stopped after a short
+# grace period then (see worker.py), and the same clean-up runs from the GUI
+# side.
+# ---------------------------------------------------------------------------
+
+CHECK_ROWS = 2000
+
+
+class Cancelled(Exception):
+    """Raised at a checkpoint once the run has been cancelled."""
+
+
+class CancelToken:
+    def __init__(self, event=None):
+        # threading.Event in-process, multiprocessing Event across processes
+        self._event = event if event is not None else threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    def reset(self):
+        self._event.clear()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise Cancelled("Run cancelled.")
+
+
+def checkpoint(cancel, i=0):
+    """Row-loop checkpoint: checks the token (if any) every CHECK_ROWS rows."""
+    if cancel is not None and i % CHECK_ROWS == 0:
+        cancel.check()
+
+# ---------------------------------------------------------------------------
+# Output clean-up
+# ---------------------------------------------------------------------------
+
+def outputPaths(raw_file_path, output_mode="xlsx", machine_outputs=False) -> list:
+    """Every report file a run with these settings writes."""
+    data_dir = os.path.dirname(raw_file_path)
+    base = os.path.splitext(os.path.basename(raw_file_path))[0]
+    paths = [os.path.join(data_dir, f"{base}_summary.xlsx")]
+    if output_mode in ("xlsx", "both"):
+        paths.append(os.path.join(data_dir, "faculty_by_unit.xlsx"))
+    if output_mode in ("html", "both"):
+        paths.append(os.path.join(data_dir, "faculty_by_unit.html"))
+    if machine_outputs:
+        paths += [os.path.join(data_dir, f"{base}_{table}.{ext}")
+                  for table in ("courses", "faculty") for ext in ("parquet", "jsonl")]
+    return paths
+
+
+def snapshotOutputs(paths) -> dict:
+    """
+    path -> copy of the file taken before the run starts (None if absent).
+    The copies live in a temporary folder until restoreOutputs or
+    discardSnapshot.
+    """
+    snapshot, folder = {}, None
+    for i, p in enumerate(paths):
+        if os.path.exists(p):
+            folder = folder or tempfile.mkdtemp(prefix="outputs-")
+            snapshot[p] = shutil.copy2(p, os.path.join(folder, f"{i}-{os.path.basename(p)}"))
+        else:
+            snapshot[p] = None
+    return snapshot
+
+
+def restoreOutputs(snapshot: dict) -> list:
+    """Deletes the files the run created and restores those it rewrote; returns the paths touched."""
+    touched = []
+    for path, copy in snapshot.items():
+        try:
+            if copy is not None:
+                shutil.move(copy, path)
+                touched.append(path)
+            elif os.path.exists(path):
+                os.remove(path)
+                touched.append(path)
+        except OSError as e:
+            print("Warning: could not restore output", path, e)
+    discardSnapshot(snapshot)
+    return touched
+
+
+def discardSnapshot(snapshot: dict) -> None:
+    """Drops the copies once the run has finished (or been rolled back)."""
+    folders = {os.path.dirname(copy) for copy in snapshot.values() if copy is not None}
+    for folder in folders:
+        shutil.rmtree(folder, ignore_errors=True)
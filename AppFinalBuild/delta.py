@@ -0,0 +1,208 @@
+import hashlib
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from algorithmPolicy import Course, FacultyMember, SIGNATURE_COLUMN, rowContentHashes
+from incremental import IncrementalModel
+from workload_rules import policyHash
+from cancellation import checkpoint
+
+# ---------------------------------------------------------------------------
+# Delta runs
+#
+# A RunState remembers one run's course model plus, per raw row signature,
+# a hash of the row's full contents and a rank giving the row's place in the
+# export. Given the next export, rows are matched by signature: new signatures
+# are added, vanished ones removed, and rows whose contents changed (typically
+# Enroll Total) are replaced. Only the neighbourhoods of those rows are
+# re-detected and re-priced, and only the faculty carrying them rebuilt, so
+# the model work follows the size of the change, not the size of the export.
+#
+# Ranks never change once given; an added row gets one between its
+# neighbours. That keeps every ordering a full run derives from the row order
+# (team-taught partner lists, which co-convened section is the
+# representative, which of two same-key rows a faculty member holds, faculty
+# order) reproducible from the touched rows alone. If rows that survive from
+# the last run come back in a different order, or the policy, track or
+# special-course inputs changed, a full run is done instead.
+#
+# apply() patches the model in place: the RunState it is called on, and the
+# Result it came from, are consumed and must not be used again.
+# ---------------------------------------------------------------------------
+
+def inputsKey(policy: dict, tracks: dict, special) -> str:
+    h = hashlib.sha1(policyHash(policy).encode("ascii"))
+    h.update(repr(sorted(tracks.items(), key=lambda kv: kv[0])).encode("utf-8"))
+    h.update(repr(sorted(special)).encode("utf-8"))
+    return h.hexdigest()
+
+
+class RunState:
+    def __init__(self, key: str, model: IncrementalModel, contents: dict, rows: dict, rank: dict, taught: dict):
+        self.key = key
+        self.model = model
+        # signature -> content hash, for every raw row of the run
+        self.contents = contents
+        # signature -> Course, for the rows that became courses
+        self.rows = rows
+        # signature -> position in the export (float, so rows can be slotted in between)
+        self.rank = rank
+        # emplid -> every Course of that instructor, in rank order
+        self.taught = taught
+        # set once apply() has patched the model into the next run's state
+        self.consumed = False
+
+    @classmethod
+    def capture(cls, key, faculty, courses, raw_df) -> "RunState":
+        signatures = raw_df[SIGNATURE_COLUMN].tolist()
+        contents = dict(zip(signatures, rowContentHashes(raw_df).tolist()))
+        rank = {s: float(i) for i, s in enumerate(signatures)}
+        rows = {c.rowSignature: c for c in courses}
+        taught = defaultdict(list)
+        for c in sorted(courses, key=lambda c: rank[c.rowSignature]):
+            taught[c.instructorEmplid].append(c)
+        return cls(key, IncrementalModel(faculty, courses), contents, rows, rank, taught)
+
+    def compatible(self, key: str) -> bool:
+        return not self.consumed and key == self.key
+
+    def _sortKey(self, c):
+        # full-run course order: team-taught groups by first row, rows in export order within a group
+        rank = self.rank
+        return rank[self.model.teams[c.getGroupKeyForGrouping()][0].rowSignature], rank[c.rowSignature]
+
+    def courses(self) -> list:
+        """Every course, in the order a full run of the same export lists them."""
+        return sorted(self.model.courseById.values(), key=self._sortKey)
+
+    # ------------------------------------------------------------------
+    def _newRanks(self, signatures, known, ranks) -> None:
+        """Ranks for the rows not in the last run, between their neighbours."""
+        new = np.flatnonzero(~known)
+        if not len(new):
+            return
+        if known.any():
+            filled = pd.Series(ranks)
+            lower = filled.ffill().fillna(np.nanmin(ranks) - 1.0).to_numpy()[new]
+            upper = filled.bfill().fillna(np.nanmax(ranks) + 1.0).to_numpy()[new]
+            # k-th of m new rows between the same two old ones
+            run = pd.Series(np.cumsum(known)[new])
+            k = run.groupby(run).cumcount().to_numpy() + 1.0
+            m = run.map(run.value_counts()).to_numpy() + 1.0
+            ranks = ranks.copy()
+            ranks[new] = lower + (upper - lower) * k / m
+        if not known.any() or (np.diff(ranks) <= 0).any():
+            # no old rows, or the gaps ran out of float precision: number everything afresh
+            self.rank = {s: float(i) for i, s in enumerate(signatures)}
+            return
+        for i in new.tolist():
+            self.rank[signatures[i]] = float(ranks[i])
+
+    def apply(self, raw_df: pd.DataFrame, policy, tracks, special, cancel=None):
+        """
+        Brings the model up to date with raw_df. Returns (state for the new
+        run, counts of added / removed / changed rows and courses re-priced),
+        or None when the surviving rows were reordered and a full run is
+        needed. A cancel mid-way leaves the model half patched, so the state
+        must be dropped.
+        """
+        signatures = raw_df[SIGNATURE_COLUMN].tolist()
+        ranks = np.array([self.rank.get(s, np.nan) for s in signatures], dtype=float)
+        known = ~np.isnan(ranks)
+        if (np.diff(ranks[known]) <= 0).any():
+            return None
+
+        hashes = rowContentHashes(raw_df).tolist()
+        current = dict(zip(signatures, hashes))
+        removed = [s for s in self.contents if s not in current]
+        changed = [s for s, h in current.items() if s in self.contents and self.contents[s] != h]
+        added = [s for s in current if s not in self.contents]
+
+        self.consumed = True
+        model, taught = self.model, self.taught
+        outgoing = [self.rows[s] for s in removed + changed if s in self.rows]
+        group = model.neighbourhood(outgoing)
+        old = model.carried(group)
+        # first course of each instructor whose rows change, to see if faculty order moves
+        firstBefore = {}
+
+        for c in outgoing:
+            emplid = c.instructorEmplid
+            firstBefore.setdefault(emplid, taught[emplid][0])
+            model._unindex(c)
+            del model.courseById[id(c)]
+            del self.rows[c.rowSignature]
+            taught[emplid].remove(c)
+        gone = {id(c) for c in outgoing}
+        group = [c for c in group if id(c) not in gone]
+
+        for s in removed:
+            del self.rank[s]
+        self._newRanks(signatures, known, ranks)
+        rank = self.rank
+
+        incoming = []
+        wanted = set(changed) | set(added)
+        if wanted:
+            fresh = raw_df[raw_df[SIGNATURE_COLUMN].isin(wanted)]
+            for i, row in enumerate(fresh.to_dict("records")):
+                checkpoint(cancel, i)
+                emplid = row.get('Instructor Emplid')
+                if pd.isna(emplid) or emplid not in tracks:
+                    continue
+                course = Course(row, policy, special)
+                if emplid not in model.faculty:
+                    # name, email and roles are filled in from the first row below
+                    model.faculty[emplid] = FacultyMember('', '', emplid, '', tracks[emplid])
+                firstBefore.setdefault(emplid, taught[emplid][0] if taught.get(emplid) else None)
+                taught[emplid].append(course)
+                model.courseById[id(course)] = course
+                model._index(course)
+                self.rows[course.rowSignature] = course
+                incoming.append(course)
+
+        for c in model.neighbourhood(incoming):
+            if id(c) not in old:
+                old.update(model.carried([c]))
+                group.append(c)
+
+        # detection and pricing see the rows in full-run order
+        order = lambda c: rank[c.rowSignature]
+        for key in {c.getGroupKeyForGrouping() for c in group}:
+            model.teams[key].sort(key=order)
+        group.sort(key=self._sortKey)
+
+        # each touched instructor as a full run would build them from their current rows
+        touched = {e for e, _ in old.values()}
+        for emplid in touched:
+            held = taught.get(emplid)
+            if not held:
+                taught.pop(emplid, None)
+                model.faculty.pop(emplid, None)
+                continue
+            held.sort(key=order)
+            first = held[0].rawData
+            fac = model.faculty[emplid]
+            fac.name, fac.email = first.get('Instructor', ''), first.get('Instructor Email', '')
+            fac.roles = {str(first.get('Instructor Role', '')).strip().upper()}
+            fac.courses = {}
+            for c in held:
+                fac.addCourse(c)
+
+        model.recompute(group, old)
+        for emplid in touched:
+            if emplid in model.faculty:
+                # summed afresh in course order, as the full run's mat-vec adds them up
+                fac = model.faculty[emplid]
+                fac.totalLoad = sum(c.load for c in sorted(fac.courses.values(), key=self._sortKey))
+
+        # faculty are listed by their first row; only a changed first row can move one
+        if any(taught[e][0] is not before for e, before in firstBefore.items() if taught.get(e)):
+            members = sorted(model.faculty.items(), key=lambda kv: rank[taught[kv[0]][0].rowSignature])
+            model.faculty.clear()
+            model.faculty.update(members)
+
+        state = RunState(self.key, model, current, self.rows, rank, taught)
+        return state, {"added": len(added), "removed": len(removed), "changed": len(changed), "repriced": len(group)}
@@ -1,172 +1,191 @@
 import os
 import pandas as pd
-import numpy as np
 import openpyxl
-import math
-import time
-import random
 from PyQt6.QtCore import QThread, pyqtSignal
-import openpyxl
-from openpyxl import Workbook
-from openpyxl.chart import PieChart, Reference
-from openpyxl.styles import PatternFill
-from collections import defaultdict, Counter
-from openpyxl.chart.label import DataLabelList
-from openpyxl.chart.shapes import GraphicalProperties
 from openpyxl import Workbook
 from openpyxl.chart import PieChart, Reference
 from openpyxl.chart.label import DataLabelList
 from openpyxl.chart.series import DataPoint
 from openpyxl.chart.shapes import GraphicalProperties
 from openpyxl.styles import PatternFill
-from collections import defaultdict
 from openpyxl.utils import get_column_letter
 
-
 from algorithmPolicy import (
-    loadWorkloadPolicy, loadInstructorTrack, loadSpecialCourses,
-    rowIsValid, Course, FacultyMember, adjust_co_convened
+    loadWorkloadPolicy, SIGNATURE_COLUMN, signatureText, FacultyMember
+)
+from report_common import (
+    GREEN, YELLOW, RED, ORANGE, BLUE, BREAKDOWN_CATEGORIES, BREAKDOWN_COLORS,
+    displayed_load, load_color, breakdown_percentages, glossary_label
+)
+from workload_cube import WorkloadCube, ALL
+from html_report import export_faculty_html
+from machine_outputs import export_machine_readable
+from balancer import proposeReassignments
+from schedule import findInstructorConflicts, roomOccupancy
+from instructor_matching import matchUnmatched
+from history_store import appendRun
+from workloads import compute_workloads
+from input_cache import LOADERS
+from cancellation import (
+    CancelToken, Cancelled, checkpoint, outputPaths, snapshotOutputs, restoreOutputs, discardSnapshot
 )
 
+class WorkloadJob:
+    """One run from the input files to the reports, without Qt – used by ExcelProcessor and the worker process."""
+
+    def __init__(self, raw_file_path, policy_file_path, track_file_path, special_file_path, output_mode="xlsx",
+                 machine_outputs=False, propose_balance=False, strict_coconvened=False, history_db=None,
+                 previous_state=None, partitions=None, workers=None, inputs=None):
+        self.raw_file_path = raw_file_path
+        self.policy_file_path = policy_file_path
+        self.track_file_path = track_file_path
+        self.special_file_path = special_file_path
+        # "xlsx", "html" or "both" – format(s) of the per-unit report
+        self.output_mode = output_mode
+        # also write per-course / per-faculty tables as parquet + jsonl
+        self.machine_outputs = machine_outputs
+        # add Proposed Changes / Balance Summary sheets from the load balancer
+        self.propose_balance = propose_balance
+        # co-convened sections must also meet in the same room
+        self.strict_coconvened = strict_coconvened
+        # SQLite file to append this run's results to (None = don't)
+        self.history_db = history_db
+        # RunState of an earlier run: if its inputs still match, only the
+        # rows that changed since are re-priced
+        self.previous_state = previous_state
+        # None = single process, "term" or "unit" = partitioned across a process pool
+        self.partitions = partitions
+        # process pool size for a partitioned run (None = one per core, or in-process for small exports)
+        self.workers = workers
+        # input_cache.InputCache holding files parsed ahead of the run (None = read them here)
+        self.inputs = inputs
+        self.state = None
+        self.result = None
+        self.faculty = None
+        self.courses = None
+        self.cube = None
+
+    def outputPaths(self) -> list:
+        return outputPaths(self.raw_file_path, self.output_mode, self.machine_outputs)
+
+    def _load(self, kind, path):
+        return self.inputs.get(kind, path) if self.inputs is not None else LOADERS[kind](path)
+
+    def run(self, progress=lambda pct: None, cancel=None) -> str:
+        """
+        Runs the job, reporting percent done through progress; returns the
+        summary workbook path. With a CancelToken, raises Cancelled at the
+        next checkpoint after cancel() and puts the outputs back as they were
+        before the run.
+        """
+        snapshot = snapshotOutputs(self.outputPaths())
+        try:
+            return self._run(progress, cancel)
+        except Cancelled:
+            restoreOutputs(snapshot)
+            raise
+        finally:
+            discardSnapshot(snapshot)
+
+    def _run(self, progress, cancel):
+        step = lambda pct: (checkpoint(cancel), progress(pct))
+
+        # 1) Load raw data (xlsx, csv, parquet or arrow)
+        raw_df, duplicates = self._load("raw", self.raw_file_path)
+        step(20)
+
+        # 2) Supporting data
+        policy = self._load("policy", self.policy_file_path) if self.policy_file_path else loadWorkloadPolicy()
+        if self.strict_coconvened:
+            # a copy: the parsed policy may be shared through the input cache
+            policy = {**policy, "coconvenedSameRoom": 1.0}
+        tracks = self._load("tracks", self.track_file_path) if self.track_file_path else {}
+        special = self._load("special", self.special_file_path) if self.special_file_path else set()
+        step(30)
+
+        # 3-7) The calculation itself (workloads.compute_workloads)
+        result = compute_workloads(raw_df, policy, tracks, special,
+                                   previous_state=self.previous_state, partitions=self.partitions,
+                                   workers=self.workers, cancel=cancel)
+        faculty = result.faculty
+        # kept for what-if scenarios and the next delta run once the run has finished
+        self.result = result
+        self.state = result.state
+        self.faculty, self.courses, self.cube = faculty, result.courses, result.cube
+        summary_df = result.summary
+        step(50)
+
+        # 8) Write output
+        data_dir = os.path.dirname(self.raw_file_path)
+        base = os.path.splitext(os.path.basename(self.raw_file_path))[0]
+
+        out_file = os.path.join(data_dir, f"{base}_summary.xlsx")
+        with pd.ExcelWriter(out_file, engine='openpyxl') as writer:
+            raw_df.assign(**{SIGNATURE_COLUMN: signatureText(raw_df[SIGNATURE_COLUMN])}).to_excel(
+                writer, sheet_name='Processed Raw Data', index=False)
+            summary_df.to_excel(writer, sheet_name='Faculty Summary', index=False)
+            duplicates.to_excel(writer, sheet_name='Dropped Duplicates', index=False)
+            findInstructorConflicts(raw_df).to_excel(writer, sheet_name='Conflicts', index=False)
+            checkpoint(cancel)
+            roster = self._load("roster", self.track_file_path) if self.track_file_path else pd.DataFrame()
+            matchUnmatched(result.unmatched, roster).to_excel(writer, sheet_name='Unmatched Instructors', index=False)
+            double_booked, utilization = roomOccupancy(raw_df)
+            double_booked.to_excel(writer, sheet_name='Room Double Bookings', index=False)
+            utilization.to_excel(writer, sheet_name='Room Utilization', index=False)
+            checkpoint(cancel)
+            if self.propose_balance:
+                _, changes_df, balance_df = proposeReassignments(faculty, result.matrix, result.loads)
+                changes_df.to_excel(writer, sheet_name='Proposed Changes', index=False)
+                balance_df.to_excel(writer, sheet_name='Balance Summary', index=False)
+        step(75)
+
+        if self.output_mode in ("xlsx", "both"):
+            export_faculty_by_unit(faculty, outputFile=os.path.join(data_dir, "faculty_by_unit.xlsx"), cube=self.cube)
+            checkpoint(cancel)
+        if self.output_mode in ("html", "both"):
+            export_faculty_html(faculty, outputFile=os.path.join(data_dir, "faculty_by_unit.html"), cube=self.cube)
+            checkpoint(cancel)
+        if self.machine_outputs:
+            export_machine_readable(faculty, data_dir, base)
+            checkpoint(cancel)
+        # last step: the history store commits in one transaction, so it is all or nothing
+        if self.history_db:
+            # keyed only by options that change the stored loads (propose_balance just adds sheets)
+            appendRun(self.history_db, faculty, self.raw_file_path, self.policy_file_path,
+                      self.track_file_path, self.special_file_path,
+                      options={"strict_coconvened": self.strict_coconvened})
+        progress(100)
+        return out_file
+
+
 class ExcelProcessor(QThread):
-    """Threaded Excel workload processor using updated algorithm."""
+    """Threaded Excel workload processor using updated algorithm (a WorkloadJob on a QThread)."""
     progress = pyqtSignal(int)
     completed = pyqtSignal(str)
     error = pyqtSignal(str)
+    cancelled = pyqtSignal()
 
-    def __init__(self, raw_file_path, policy_file_path, track_file_path, special_file_path):
+    def __init__(self, *args, **kwargs):
         super().__init__()
-        self.raw_file_path = raw_file_path
-        self.policy_file_path = policy_file_path
-        self.track_file_path = track_file_path
-        self.special_file_path = special_file_path
+        self.job = WorkloadJob(*args, **kwargs)
+        self.cancel_token = CancelToken()
 
+    def cancel(self):
+        """Stops the run at its next checkpoint; cancelled is emitted instead of completed."""
+        self.cancel_token.cancel()
 
+    # results of the finished run live on the job
+    faculty = property(lambda self: self.job.faculty)
+    courses = property(lambda self: self.job.courses)
+    cube = property(lambda self: self.job.cube)
+    state = property(lambda self: self.job.state)
+    result = property(lambda self: self.job.result)
 
     def run(self):
         try:
-            # 1) Load raw data
-            converters = {
-                'Max Units': lambda x: float(x) if pd.notna(x) else 0.0,
-                'Enroll Total': lambda x: int(float(x)) if pd.notna(x) else 0
-            }
-            raw_df = pd.read_excel(self.raw_file_path, sheet_name='Raw Data', converters=converters)
-            raw_df = raw_df[raw_df.apply(rowIsValid, axis=1)].reset_index(drop=True)
-            raw_df = raw_df.drop_duplicates(subset=[
-                'Instructor Emplid', 'Term', 'Subject', 'Cat Nbr', 'Section',
-                'Start Date', 'End Date', 'Start Time', 'End Time', 'Facility Building', 'Facility Room', 'Days'
-            ])
-            
-            # 2) Supporting data
-            policy = loadWorkloadPolicy(self.policy_file_path) if self.policy_file_path else loadWorkloadPolicy()
-            tracks = loadInstructorTrack(self.track_file_path) if self.track_file_path else {}
-            special = loadSpecialCourses(self.special_file_path) if self.special_file_path else set()
-
-            # 3) Build structures
-            faculty = {}
-            courseGroups = {}
-            other = {}
-
-            for _, row in raw_df.iterrows():
-                role = str(row.get('Instructor Role', '')).strip().upper()
-
-                emplid_val = row.get('Instructor Emplid')
-                if pd.isna(emplid_val):
-                    continue
-
-                emplid = int(float(emplid_val))
-                if emplid not in tracks:
-                    other.setdefault(str(emplid), []).append(row.to_dict())
-                    continue
-
-                course = Course(row.to_dict(), policy, special)
-                key = course.getGroupKeyForGrouping()
-                courseGroups.setdefault(key, []).append(course)
-
-                if emplid not in faculty:
-                    faculty[emplid] = FacultyMember(row.get('Instructor', ''), row.get('Instructor Email', ''), emplid, role, tracks[emplid])
-                faculty[emplid].addCourse(course)
-
-            # 4) Team‑taught division
-            for lst in courseGroups.values():
-                valid = [c for c in lst if all(c._meeting_signature())]
-                valid = [c for c in valid if not any(t in c.catNbr for t in ("699", "799"))]
-                valid = [c for c in valid if any(k in c.courseCategory for k in ("lecture", "laboratory"))]
-                pi_only = [c for c in valid if c.instructorRole.upper()=="PI"]
-                unique_emplids = {c.instructorEmplid for c in pi_only}
-                if len(unique_emplids) >= 2:
-                    names = [c.rawData.get('Instructor','').strip() for c in pi_only]
-                    for c in pi_only:
-                        c.team_taught_members = [
-                            n for n in names 
-                            if n != c.rawData.get('Instructor','').strip()
-                        ]
-                        c.adjustLoadDivision(len(unique_emplids))
-
-            # 5) Co‑convened adjustment
-            adjust_co_convened([c for lst in courseGroups.values() for c in lst])
-
-            # 6) Calculate summary
-            summary_rows = []
-            for fac in faculty.values():
-                fac.calculateTotalLoad()
-                units = sorted({getattr(c, 'unit', '') for c in fac.courses.values() if getattr(c, 'unit', '')})
-
-                course_list = []
-                for c in fac.courses.values():
-
-                    groupFlag = (
-                        bool(getattr(c, "co_convened_members", None))
-                        or bool(getattr(c, "team_taught_members", None))
-                    )
-
-                    # base label
-                    subject = c.rawData.get('Subject','').strip()
-                    section = c.rawData.get('Section','').strip()
-                    desc    = c.rawData.get('Class Description','').strip().title()
-                    label = f"{'*' if groupFlag else ''}{subject} {c.catNbr}-{section} – {desc}"
-
-                    # tag on any partner info
-                    if getattr(c, 'co_convened_members', None):
-                        label += f" (co‑convened with {', '.join(c.co_convened_members)})"
-                    if getattr(c, 'team_taught_members', None):
-                        label += f" (team‑taught with {', '.join(c.team_taught_members)})"
-
-                    course_list.append(label)
-
-                course_list.sort()
-                summary_rows.append({
-                    'Instructor': fac.name,
-                    'Emplid': fac.emplid,
-                    'Track': fac.track or 'Unknown',
-                    'Total Workload': round(fac.totalLoad, 2),
-                    'Units Taught': ', '.join(units),
-                    'Courses Taught': '; '.join(course_list)
-                })
-
-            summary_df = pd.DataFrame(summary_rows)
-
-            # 7) Write output
-            data_dir = os.path.dirname(self.raw_file_path)
-            base = os.path.splitext(os.path.basename(self.raw_file_path))[0]
-
-            out_file = os.path.join(data_dir, f"{base}_summary.xlsx")
-            with pd.ExcelWriter(out_file, engine='openpyxl') as writer:
-                raw_df.to_excel(writer, sheet_name='Processed Raw Data', index=False)
-                summary_df.to_excel(writer, sheet_name='Faculty Summary', index=False)
-            
-            export_faculty_by_unit(faculty, outputFile=os.path.join(data_dir, "faculty_by_unit.xlsx"))
-
-            # Simulate progress
-            pct = 0
-            while pct < 100:
-                pct = min(pct + random.randint(20, 35), 100)
-                self.progress.emit(pct)
-                time.sleep(0.008)
-
-            self.completed.emit(out_file)
-
-
+            self.completed.emit(self.job.run(self.progress.emit, self.cancel_token))
+        except Cancelled:
+            self.cancelled.emit()
         except Exception as e:
             self.error.emit(str(e))
 
@@ -192,21 +211,7 @@ def add_glossary_sheet(wb, instructors: dict[int, FacultyMember]):
 
         # each course under that professor
         for course in prof.courses.values():
-
-            groupFlag = (
-                bool(getattr(course, "co_convened_members", None))
-                or bool(getattr(course, "team_taught_members", None))
-            )
-
-            subj   = course.rawData.get("Subject", "").strip()
-            cat    = course.rawData.get("Cat Nbr", "").strip()
-            sect   = course.rawData.get("Section", "").strip()
-            label = f"{'*' if groupFlag else ''}{subj} {cat}-{sect}"
-
-            if getattr(course, "co_convened_members", None):
-                label += f" (co-convened with {', '.join(course.co_convened_members)})"
-            if getattr(course, "team_taught_members", None):
-                label += f" (team-taught with {', '.join(course.team_taught_members)})"
+            label = glossary_label(course)
 
             if course.load is None:
                 course.calculateLoad()
@@ -225,51 +230,16 @@ def add_glossary_sheet(wb, instructors: dict[int, FacultyMember]):
             row[0].font = openpyxl.styles.Font(bold=True)
 
 
-def export_faculty_by_unit(facultyDict, outputFile="faculty_by_unit.xlsx"):
-
-    # Define colors
-    GREEN  = "90EE90"   # CT or CT Well
-    YELLOW = "FFFF00"   # For intermediary ranges (used in cell fill)
-    RED    = "FF6347"   # TT below/bad or CT very low
-    ORANGE = "FFA500"   # TT high (or TT poor performance)
-    BLUE   = "1E90FF"   # TT or TT Well
+def export_faculty_by_unit(facultyDict, outputFile="faculty_by_unit.xlsx", cube=None):
 
     # Define PatternFills
-    green_fill  = PatternFill(start_color=GREEN, end_color=GREEN, fill_type="solid")
-    yellow_fill = PatternFill(start_color=YELLOW, end_color=YELLOW, fill_type="solid")
-    red_fill    = PatternFill(start_color=RED, end_color=RED, fill_type="solid")
-    orange_fill = PatternFill(start_color=ORANGE, end_color=ORANGE, fill_type="solid")
+    fills = {
+        color: PatternFill(start_color=color, end_color=color, fill_type="solid")
+        for color in (GREEN, YELLOW, RED, ORANGE)
+    }
 
     def table_cell_fill(track_str, displayed_load_val):
-        """
-        Table cell color logic:
-         - If ceiled load is within ±2 of baseline -> green.
-         - Else, for loads deviating by 3-6 -> yellow.
-         - For loads 7 or more above (or 7 or more below) baseline,
-           use orange for high values (CT) and red for low values.
-        """
-        track_str = (track_str or "").strip().upper()
-        if track_str == "CT":
-            expected = 40
-        elif track_str == "TT":
-            expected = 30
-        else:
-            return red_fill
-
-        diff = displayed_load_val - expected
-        if abs(diff) <= 2:
-            return green_fill
-        elif diff > 0:
-            if 3 <= diff <= 6:
-                return yellow_fill
-            elif diff >= 7:
-                return orange_fill
-        else:  # diff < 0
-            if 3 <= abs(diff) <= 6:
-                return yellow_fill
-            elif abs(diff) >= 7:
-                return red_fill
-        return red_fill
+        return fills[load_color(track_str, displayed_load_val)]
 
     # Chart 1: Baseline Pie Chart (CT=40 vs TT=30)
     def add_simple_pie_chart(ws, anchor_cell="K2", chart_title="CT=40 vs TT=30 (Baseline)"):
@@ -296,20 +266,11 @@ def export_faculty_by_unit(facultyDict, outputFile="faculty_by_unit.xlsx"):
 
     # Chart 2: Performance Breakdown Pie Chart
     def add_breakdown_pie_chart(ws, anchor_cell, ct_well, ct_other, tt_well, tt_other, chart_title):
-        total = ct_well + ct_other + tt_well + tt_other
-        if total == 0:
-            pct_ct_well = pct_ct_other = pct_tt_well = pct_tt_other = 0
-        else:
-            pct_ct_well  = round(100 * ct_well / total, 2)
-            pct_ct_other = round(100 * ct_other / total, 2)
-            pct_tt_well  = round(100 * tt_well / total, 2)
-            pct_tt_other = round(100 * tt_other / total, 2)
+        values = breakdown_percentages(ct_well, ct_other, tt_well, tt_other)
         ws["AC10"] = "Category"
         ws["AE10"] = "Percentage"
-        categories = ["CT Balanced", "CT Out of Range", "TT Balanced", "TT Out of Range"]
-        values = [pct_ct_well, pct_ct_other, pct_tt_well, pct_tt_other]
         row_ptr = 11
-        for label, val in zip(categories, values):
+        for label, val in zip(BREAKDOWN_CATEGORIES, values):
             ws.cell(row=row_ptr, column=29, value=label)  # Column AC.
             ws.cell(row=row_ptr, column=31, value=val)     # Column AE.
             row_ptr += 1
@@ -323,123 +284,53 @@ def export_faculty_by_unit(facultyDict, outputFile="faculty_by_unit.xlsx"):
         pie.dataLabels.showSerName = False
         pie.dataLabels.showVal = True
         pie.series[0].data_points = [
-            DataPoint(idx=0, spPr=GraphicalProperties(solidFill=GREEN)),
-            DataPoint(idx=1, spPr=GraphicalProperties(solidFill=RED)),
-            DataPoint(idx=2, spPr=GraphicalProperties(solidFill=BLUE)),
-            DataPoint(idx=3, spPr=GraphicalProperties(solidFill=ORANGE))
+            DataPoint(idx=i, spPr=GraphicalProperties(solidFill=color))
+            for i, color in enumerate(BREAKDOWN_COLORS)
         ]
         ws.add_chart(pie, anchor_cell)
 
-    # Create workbook and remove default sheet.
-    wb = Workbook()
-    default_ws = wb.active
-    wb.remove(default_ws)
-
-    # ---------------------------
-    # 1) Create the "ALL" Sheet with Two Sub-tables (CT in A-C, TT in F-H)
-    # ---------------------------
-    all_ws = wb.create_sheet("ALL")
-    # CT Table header
-    all_ws["A1"] = "CT Table"
-    all_ws["A2"] = "Name"
-    all_ws["B2"] = "Track"
-    all_ws["C2"] = "Load"
-    # TT Table header
-    all_ws["F1"] = "TT Table"
-    all_ws["F2"] = "Name"
-    all_ws["G2"] = "Track"
-    all_ws["H2"] = "Load"
-    # Add Baseline Chart (Chart 1)
-    add_simple_pie_chart(all_ws, anchor_cell="K2", chart_title="CT=40 vs TT=30 (Baseline)")
-    
-    # Initialize breakdown counts for ALL sheet.
-    ct_well = ct_other = tt_well = tt_other = 0
-    row_ct = 3  # For CT table
-    row_tt = 3  # For TT table
-    all_fac_list = sorted(facultyDict.values(), key=lambda f: f.totalLoad if f.totalLoad else 0.0, reverse=True)
-    for fac in all_fac_list:
-        load_val = fac.totalLoad
-        track_str = (fac.track or "").strip().upper()
-        displayed_val = int(math.ceil(load_val))
-        if track_str == "CT":
-            all_ws.cell(row=row_ct, column=1, value=fac.name)
-            all_ws.cell(row=row_ct, column=2, value=fac.track)
-            cell_load = all_ws.cell(row=row_ct, column=3, value=displayed_val)
-            cell_load.fill = table_cell_fill(track_str, displayed_val)
-            if abs(displayed_val - 40) <= 2:
-                ct_well += 1
-            else:
-                ct_other += 1
-            row_ct += 1
-        elif track_str == "TT":
-            all_ws.cell(row=row_tt, column=6, value=fac.name)
-            all_ws.cell(row=row_tt, column=7, value=fac.track)
-            cell_load = all_ws.cell(row=row_tt, column=8, value=displayed_val)
-            cell_load.fill = table_cell_fill(track_str, displayed_val)
-            if abs(displayed_val - 30) <= 2:
-                tt_well += 1
-            else:
-                tt_other += 1
-            row_tt += 1
-    # Add Breakdown Chart (Chart 2)
-    add_breakdown_pie_chart(all_ws, anchor_cell="K15", ct_well=ct_well, ct_other=ct_other, tt_well=tt_well, tt_other=tt_other,
-                            chart_title="Performance Breakdown (Within ±2 vs Others)")
-
-    # ---------------------------
-    # 2) Create a Sheet per Unit (same structure as "ALL")
-    # ---------------------------
-    unit_map = defaultdict(set)
-    for fac in facultyDict.values():
-        units = { c.unit.strip() for c in fac.courses.values() if c.unit.strip() }
-        for unit in units:
-            unit_map[unit].add(fac)
-    for unit_name, fac_set in unit_map.items():
-        ws = wb.create_sheet(unit_name[:31])
-        # CT Table header
+    def write_unit_sheet(ws, unit, baseline_title, breakdown_title, breakdown_anchor):
+        # CT Table in A-C, TT Table in F-H
         ws["A1"] = "CT Table"
         ws["A2"] = "Name"
         ws["B2"] = "Track"
         ws["C2"] = "Load"
-        # TT Table header
         ws["F1"] = "TT Table"
         ws["F2"] = "Name"
         ws["G2"] = "Track"
         ws["H2"] = "Load"
-        # Add Baseline Chart for Unit
-        add_simple_pie_chart(ws, anchor_cell="K2", chart_title=f"{unit_name}: CT=40 vs TT=30 (Baseline)")
-        # Initialize unit breakdown counts.
-        ct_well_u = ct_other_u = tt_well_u = tt_other_u = 0
-        sorted_facs = sorted(fac_set, key=lambda f: f.totalLoad if f.totalLoad else 0.0, reverse=True)
-        row_ct = 3
-        row_tt = 3
-        for f2 in sorted_facs:
-            load_val = f2.totalLoad
-            track_s = (f2.track or "").strip().upper()
-            displayed_val = int(math.ceil(load_val))
-            if track_s == "CT":
-                ws.cell(row=row_ct, column=1, value=f2.name)
-                ws.cell(row=row_ct, column=2, value=f2.track)
-                cell_load = ws.cell(row=row_ct, column=3, value=displayed_val)
-                cell_load.fill = table_cell_fill(track_s, displayed_val)
-                if abs(displayed_val - 40) <= 2:
-                    ct_well_u += 1
-                else:
-                    ct_other_u += 1
-                row_ct += 1
-            elif track_s == "TT":
-                ws.cell(row=row_tt, column=6, value=f2.name)
-                ws.cell(row=row_tt, column=7, value=f2.track)
-                cell_load = ws.cell(row=row_tt, column=8, value=displayed_val)
-                cell_load.fill = table_cell_fill(track_s, displayed_val)
-                if abs(displayed_val - 30) <= 2:
-                    tt_well_u += 1
-                else:
-                    tt_other_u += 1
-                row_tt += 1
-        add_breakdown_pie_chart(ws, anchor_cell="K18", ct_well=ct_well_u, ct_other=ct_other_u,
-                                tt_well=tt_well_u, tt_other=tt_other_u,
-                                chart_title=f"{unit_name}: Performance Breakdown")
-        
+        add_simple_pie_chart(ws, anchor_cell="K2", chart_title=baseline_title)
+
+        for track_str, col in (("CT", 1), ("TT", 6)):
+            for row, fac in enumerate(cube.faculty(unit, track_str), start=3):
+                displayed_val = displayed_load(fac)
+                ws.cell(row=row, column=col, value=fac.name)
+                ws.cell(row=row, column=col + 1, value=fac.track)
+                cell_load = ws.cell(row=row, column=col + 2, value=displayed_val)
+                cell_load.fill = table_cell_fill(track_str, displayed_val)
+
+        ct_well, ct_other, tt_well, tt_other = cube.breakdown(unit)
+        add_breakdown_pie_chart(ws, anchor_cell=breakdown_anchor, ct_well=ct_well, ct_other=ct_other,
+                                tt_well=tt_well, tt_other=tt_other, chart_title=breakdown_title)
+
+    if cube is None:
+        cube = WorkloadCube.build(facultyDict)
+
+    # Create workbook and remove default sheet.
+    wb = Workbook()
+    default_ws = wb.active
+    wb.remove(default_ws)
+
+    # 1) "ALL" sheet
+    write_unit_sheet(wb.create_sheet("ALL"), ALL, "CT=40 vs TT=30 (Baseline)",
+                     "Performance Breakdown (Within ±2 vs Others)", "K15")
+
+    # 2) One sheet per unit, same structure as "ALL"
+    for unit_name in cube.units:
+        write_unit_sheet(wb.create_sheet(unit_name[:31]), unit_name,
+                         f"{unit_name}: CT=40 vs TT=30 (Baseline)",
+                         f"{unit_name}: Performance Breakdown", "K18")
+
     add_glossary_sheet(wb, facultyDict)
     wb.save(outputFile)
     print(f"Export complete. See '{outputFile}'.")
\ No newline at end of file
@@ -0,0 +1,254 @@
+import os
+import sys
+import sqlite3
+import json
+import hashlib
+import argparse
+from datetime import datetime
+
+import pandas as pd
+
+from machine_outputs import buildCourseTable, buildFacultyTable
+from workload_rules import RULES_FILE_NAMES
+
+# ---------------------------------------------------------------------------
+# Historical workload store
+#
+# Optionally, each run appends its per-course and per-faculty results to a
+# local SQLite file. A run is keyed by the hashes of its input files (the
+# policy's together with the rule table next to it) and the run options that
+# change results, so re-running the same inputs with the same options replaces
+# that run instead of duplicating it.
+# Course rows are indexed by emplid, (term, run), unit and subject, so
+# cross-term questions ("this instructor's load over six terms") are index
+# lookups. When a term appears in several runs, queries use the newest run.
+#
+#   python history_store.py workload_history.sqlite runs
+#   python history_store.py workload_history.sqlite trend 1234567
+#   python history_store.py workload_history.sqlite units --term 1251
+#   python history_store.py workload_history.sqlite subject BIO
+# ---------------------------------------------------------------------------
+
+HISTORY_FILE_NAME = "workload_history.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    created TEXT NOT NULL,
+    raw_file TEXT,
+    raw_hash TEXT, policy_hash TEXT, track_hash TEXT, special_hash TEXT,
+    options TEXT
+);
+CREATE TABLE IF NOT EXISTS courses (
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    emplid INTEGER NOT NULL,
+    course_key TEXT NOT NULL,
+    subject TEXT,
+    term TEXT,
+    class_nbr TEXT,
+    unit TEXT,
+    pre_division_load REAL,
+    divisor INTEGER,
+    co_convened INTEGER,
+    team_taught INTEGER,
+    final_load REAL,
+    enroll_total INTEGER,
+    max_units REAL,
+    team_key TEXT,
+    bundle_key TEXT,
+    policy_hash TEXT
+);
+CREATE TABLE IF NOT EXISTS faculty (
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    emplid INTEGER NOT NULL,
+    instructor TEXT,
+    email TEXT,
+    track TEXT,
+    total_load REAL,
+    course_count INTEGER,
+    units TEXT
+);
+CREATE INDEX IF NOT EXISTS courses_emplid ON courses(emplid);
+CREATE INDEX IF NOT EXISTS courses_term_run ON courses(term, run_id);
+CREATE INDEX IF NOT EXISTS courses_unit ON courses(unit);
+CREATE INDEX IF NOT EXISTS courses_subject ON courses(subject);
+CREATE INDEX IF NOT EXISTS courses_run ON courses(run_id);
+CREATE INDEX IF NOT EXISTS faculty_emplid ON faculty(emplid);
+CREATE INDEX IF NOT EXISTS faculty_run ON faculty(run_id);
+"""
+
+# newest run for every term – the rows every query below reads from
+_LATEST = """
+WITH latest AS (
+    SELECT term, run_id FROM (
+        SELECT t.term, t.run_id,
+               ROW_NUMBER() OVER (PARTITION BY t.term ORDER BY r.created DESC) AS rn
+        FROM (SELECT DISTINCT term, run_id FROM courses) t JOIN runs r USING (run_id)
+    ) WHERE rn = 1
+)
+"""
+
+
+def fileHash(path) -> str:
+    if not path or not os.path.exists(path):
+        return ""
+    h = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def policyFileHash(policy_file) -> str:
+    """The policy file's hash, extended by the rule table loaded from beside it."""
+    if not policy_file:
+        return ""
+    folder = os.path.dirname(os.path.abspath(policy_file))
+    rules = [fileHash(os.path.join(folder, name)) for name in RULES_FILE_NAMES]
+    if not any(rules):
+        return fileHash(policy_file)
+    return hashlib.sha1("|".join([fileHash(policy_file)] + rules).encode("ascii")).hexdigest()
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    con = sqlite3.connect(db_path)
+    con.executescript(_SCHEMA)
+    # stores created before run options / course link columns were recorded
+    for table, column in (("runs", "options"), ("courses", "team_key"), ("courses", "bundle_key"),
+                          ("courses", "policy_hash")):
+        if column not in {row[1] for row in con.execute(f"PRAGMA table_info({table})")}:
+            con.execute(f"ALTER TABLE {table} ADD COLUMN {column} TEXT")
+    return con
+
+
+def appendRun(db_path, facultyDict, raw_file, policy_file=None, track_file=None, special_file=None,
+              options=None) -> str:
+    """
+    Stores one run's results; returns its run id (hash of the four input hashes
+    and options, a dict of the run options that change results, e.g.
+    {"strict_coconvened": True}).
+    """
+    hashes = [fileHash(raw_file), policyFileHash(policy_file), fileHash(track_file), fileHash(special_file)]
+    options = json.dumps(options or {}, sort_keys=True)
+    run_id = hashlib.sha1("|".join(hashes + [options]).encode("utf-8")).hexdigest()[:16]
+
+    courses = buildCourseTable(facultyDict)
+    courses.insert(0, "run_id", run_id)
+    courses.insert(3, "subject", courses["course_key"].str.split(" ", n=1).str[0])
+    faculty = buildFacultyTable(facultyDict)
+    faculty.insert(0, "run_id", run_id)
+
+    con = connect(db_path)
+    try:
+        with con:
+            for table in ("courses", "faculty", "runs"):
+                con.execute(f"DELETE FROM {table} WHERE run_id = ?", (run_id,))
+            con.execute(
+                "INSERT INTO runs (run_id, created, raw_file, raw_hash, policy_hash, track_hash, special_hash, options)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, datetime.now().isoformat(timespec="seconds"), os.path.basename(raw_file), *hashes, options),
+            )
+            con.executemany(
+                f"INSERT INTO courses ({', '.join(courses.columns)}) VALUES ({', '.join('?' * len(courses.columns))})",
+                courses.astype(object).where(courses.notna(), None).itertuples(index=False, name=None),
+            )
+            con.executemany(
+                f"INSERT INTO faculty ({', '.join(faculty.columns)}) VALUES ({', '.join('?' * len(faculty.columns))})",
+                faculty.astype(object).where(faculty.notna(), None).itertuples(index=False, name=None),
+            )
+    finally:
+        con.close()
+    return run_id
+
+# ---------------------------------------------------------------------------
+# Queries
+# ---------------------------------------------------------------------------
+
+def query(db_path, sql, params=()) -> pd.DataFrame:
+    con = connect(db_path)
+    try:
+        return pd.read_sql_query(sql, con, params=params)
+    finally:
+        con.close()
+
+
+def listRuns(db_path) -> pd.DataFrame:
+    return query(db_path, """
+        SELECT r.run_id, r.created, r.raw_file, r.options, GROUP_CONCAT(DISTINCT c.term) AS terms
+        FROM runs r LEFT JOIN courses c USING (run_id)
+        GROUP BY r.run_id ORDER BY r.created
+    """)
+
+
+def instructorTrend(db_path, emplid) -> pd.DataFrame:
+    """One row per term: the instructor's total carried load and section count."""
+    return query(db_path, _LATEST + """
+        SELECT c.term, ROUND(SUM(c.final_load), 2) AS total_load, COUNT(*) AS sections,
+               GROUP_CONCAT(DISTINCT c.unit) AS units
+        FROM courses c JOIN latest l ON c.term = l.term AND c.run_id = l.run_id
+        WHERE c.emplid = ?
+        GROUP BY c.term ORDER BY c.term
+    """, (int(emplid),))
+
+
+def unitTotals(db_path, term=None) -> pd.DataFrame:
+    sql = _LATEST + """
+        SELECT c.term, c.unit, ROUND(SUM(c.final_load), 2) AS total_load,
+               COUNT(DISTINCT c.emplid) AS faculty, COUNT(*) AS sections
+        FROM courses c JOIN latest l ON c.term = l.term AND c.run_id = l.run_id
+    """
+    params = ()
+    if term is not None:
+        sql += " WHERE c.term = ?"
+        params = (str(term),)
+    return query(db_path, sql + " GROUP BY c.term, c.unit ORDER BY c.term, c.unit", params)
+
+
+def subjectHistory(db_path, subject) -> pd.DataFrame:
+    return query(db_path, _LATEST + """
+        SELECT c.term, c.course_key, c.emplid, c.final_load, c.team_taught, c.co_convened
+        FROM courses c JOIN latest l ON c.term = l.term AND c.run_id = l.run_id
+        WHERE c.subject = ?
+        ORDER BY c.term, c.course_key
+    """, (subject.strip().upper(),))
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the Lumberjack Balancing workload history.")
+    parser.add_argument("db", help=f"history database (e.g. {HISTORY_FILE_NAME})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("runs", help="list stored runs")
+    trend = sub.add_parser("trend", help="an instructor's load per term")
+    trend.add_argument("emplid")
+    units = sub.add_parser("units", help="load per unit per term")
+    units.add_argument("--term")
+    subject = sub.add_parser("subject", help="every stored section of a subject")
+    subject.add_argument("subject")
+    sql = sub.add_parser("sql", help="run a read-only query")
+    sql.add_argument("statement")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        parser.error(f"no history database at {args.db}")
+    if args.command == "runs":
+        df = listRuns(args.db)
+    elif args.command == "trend":
+        df = instructorTrend(args.db, args.emplid)
+    elif args.command == "units":
+        df = unitTotals(args.db, args.term)
+    elif args.command == "subject":
+        df = subjectHistory(args.db, args.subject)
+    else:
+        con = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+        try:
+            df = pd.read_sql_query(args.statement, con)
+        finally:
+            con.close()
+    print(df.to_string(index=False) if not df.empty else "(no rows)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
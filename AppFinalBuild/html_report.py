@@ -0,0 +1,148 @@
+import html
+import math
+
+from report_common import (
+    GREEN, BLUE, TRACK_TARGETS, BREAKDOWN_CATEGORIES, BREAKDOWN_COLORS,
+    displayed_load, load_color, breakdown_percentages, glossary_label
+)
+from workload_cube import WorkloadCube, ALL
+
+# ---------------------------------------------------------------------------
+# Static HTML dashboard – same content as faculty_by_unit.xlsx, no openpyxl
+# ---------------------------------------------------------------------------
+
+_STYLE = """
+body { font-family: Segoe UI, Arial, sans-serif; margin: 0; color: #1A1A1A; }
+header { background: #003366; color: white; padding: 12px 20px; position: sticky; top: 0; }
+header input { margin-left: 20px; padding: 4px 8px; width: 260px; }
+nav { padding: 8px 20px; background: #f4f4f4; }
+nav a { margin-right: 12px; color: #003366; }
+section { padding: 10px 20px; border-bottom: 1px solid #ddd; }
+.tables, .charts { display: flex; gap: 40px; flex-wrap: wrap; align-items: flex-start; }
+table { border-collapse: collapse; }
+th, td { border: 1px solid #bbb; padding: 3px 8px; text-align: left; }
+th { background: #e6e6e6; }
+td.load { text-align: right; font-weight: bold; }
+.legend span { display: inline-block; width: 10px; height: 10px; margin-right: 4px; }
+.prof { font-weight: bold; padding-top: 10px; }
+"""
+
+_SCRIPT = """
+function filterRows(q) {
+  q = q.toLowerCase();
+  document.querySelectorAll("tr.row").forEach(function (tr) {
+    tr.style.display = tr.textContent.toLowerCase().indexOf(q) === -1 ? "none" : "";
+  });
+}
+"""
+
+
+def _svg_pie(slices, title, size=220):
+    """slices: list of (label, value, hex color) -> inline svg + legend."""
+    r = size / 2 - 10
+    cx = cy = size / 2
+    total = sum(v for _, v, _ in slices)
+    parts = [f'<svg width="{size}" height="{size}" viewBox="0 0 {size} {size}" role="img">',
+             f"<title>{html.escape(title)}</title>"]
+    nonzero = [s for s in slices if s[1] > 0]
+    if total <= 0:
+        parts.append(f'<circle cx="{cx}" cy="{cy}" r="{r}" fill="#eeeeee"/>')
+    elif len(nonzero) == 1:
+        parts.append(f'<circle cx="{cx}" cy="{cy}" r="{r}" fill="#{nonzero[0][2]}"/>')
+    else:
+        angle = -math.pi / 2
+        for _, value, color in nonzero:
+            sweep = 2 * math.pi * value / total
+            x1, y1 = cx + r * math.cos(angle), cy + r * math.sin(angle)
+            angle += sweep
+            x2, y2 = cx + r * math.cos(angle), cy + r * math.sin(angle)
+            large = 1 if sweep > math.pi else 0
+            parts.append(
+                f'<path d="M{cx},{cy} L{x1:.2f},{y1:.2f} A{r},{r} 0 {large} 1 {x2:.2f},{y2:.2f} Z" '
+                f'fill="#{color}" stroke="white"/>'
+            )
+    parts.append("</svg>")
+    legend = "".join(
+        f'<div><span style="background:#{color}"></span>{html.escape(label)}: {value}</div>'
+        for label, value, color in slices
+    )
+    return (f'<figure><figcaption>{html.escape(title)}</figcaption>{"".join(parts)}'
+            f'<div class="legend">{legend}</div></figure>')
+
+
+def _track_table(title, facs):
+    rows = []
+    for fac in facs:
+        shown = displayed_load(fac)
+        rows.append(
+            f'<tr class="row"><td>{html.escape(str(fac.name))}</td><td>{html.escape(str(fac.track))}</td>'
+            f'<td class="load" style="background:#{load_color(fac.track, shown)}">{shown}</td></tr>'
+        )
+    return (f"<div><h3>{title}</h3><table><tr><th>Name</th><th>Track</th><th>Load</th></tr>"
+            f'{"".join(rows)}</table></div>')
+
+
+def _unit_section(anchor, heading, cube, unit, baseline_title, breakdown_title):
+    ct = cube.faculty(unit, "CT")
+    tt = cube.faculty(unit, "TT")
+    pcts = breakdown_percentages(*cube.breakdown(unit))
+
+    baseline = _svg_pie(
+        [("CT Expectation", TRACK_TARGETS["CT"], GREEN), ("TT Expectation", TRACK_TARGETS["TT"], BLUE)],
+        baseline_title,
+    )
+    breakdown = _svg_pie(list(zip(BREAKDOWN_CATEGORIES, pcts, BREAKDOWN_COLORS)), breakdown_title)
+
+    return (f'<section id="{anchor}"><h2>{html.escape(heading)}</h2>'
+            f'<div class="tables">{_track_table("CT Table", ct)}{_track_table("TT Table", tt)}'
+            f'<div class="charts">{baseline}{breakdown}</div></div></section>')
+
+
+def _glossary_section(facultyDict):
+    rows = []
+    for prof in sorted(facultyDict.values(), key=lambda p: p.name):
+        rows.append(
+            f'<tr class="row prof"><td>Professor Name: {html.escape(str(prof.name))}</td>'
+            f"<td>ID: {prof.emplid}</td></tr>"
+        )
+        for course in prof.courses.values():
+            if course.load is None:
+                course.calculateLoad()
+            rows.append(
+                f'<tr class="row"><td>{html.escape(glossary_label(course))}</td>'
+                f'<td class="load">{course.load * 1:.2f}</td></tr>'
+            )
+    return f'<section id="glossary"><h2>Glossary</h2><table>{"".join(rows)}</table></section>'
+
+
+def export_faculty_html(facultyDict, outputFile="faculty_by_unit.html", cube=None):
+    """
+    Writes a single self-contained html dashboard (tables, inline svg charts and
+    the glossary) straight from the computed faculty data.
+    """
+    if cube is None:
+        cube = WorkloadCube.build(facultyDict)
+
+    sections = [_unit_section("all", "ALL", cube, ALL,
+                              "CT=40 vs TT=30 (Baseline)",
+                              "Performance Breakdown (Within ±2 vs Others)")]
+    links = ['<a href="#all">ALL</a>']
+    for i, unit_name in enumerate(cube.units):
+        anchor = f"unit-{i}"
+        links.append(f'<a href="#{anchor}">{html.escape(unit_name)}</a>')
+        sections.append(_unit_section(anchor, unit_name, cube, unit_name,
+                                      f"{unit_name}: CT=40 vs TT=30 (Baseline)",
+                                      f"{unit_name}: Performance Breakdown"))
+    links.append('<a href="#glossary">Glossary</a>')
+    sections.append(_glossary_section(facultyDict))
+
+    page = (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8">'
+        f"<title>Faculty Workload by Unit</title><style>{_STYLE}</style><script>{_SCRIPT}</script></head><body>"
+        '<header><strong>Lumberjack Balancing – Faculty Workload by Unit</strong>'
+        '<input type="search" placeholder="Filter names, courses…" oninput="filterRows(this.value)"></header>'
+        f'<nav>{"".join(links)}</nav>{"".join(sections)}</body></html>'
+    )
+    with open(outputFile, "w", encoding="utf-8") as fh:
+        fh.write(page)
+    print(f"Export complete. See '{outputFile}'.")
@@ -0,0 +1,82 @@
+from collections import defaultdict
+
+from algorithmPolicy import adjust_co_convened, detect_team_taught, priceCourses
+
+# ---------------------------------------------------------------------------
+# Incremental course model
+#
+# Team-taught groups and co-convened bundles are the only ways one course's
+# load depends on another, so a change to a few rows only needs the rows
+# sharing a group or bundle with them (transitively) re-detected and
+# re-priced, and only the faculty carrying those rows re-totalled. Shared by
+# what-if scenarios (scenario.py) and delta runs (delta.py).
+# ---------------------------------------------------------------------------
+
+class IncrementalModel:
+    def __init__(self, faculty: dict, courses):
+        self.faculty = faculty
+        # insertion-ordered, so removing a row is O(1)
+        self.courseById = {id(c): c for c in courses}
+
+        # neighbourhood indexes: team-taught groups never depend on the
+        # instructor, co-convened bundles always do
+        self.teams = defaultdict(list)
+        self.bundles = defaultdict(list)
+        for c in self.courseById.values():
+            self._index(c)
+
+    @property
+    def courses(self) -> list:
+        return list(self.courseById.values())
+
+    def _index(self, c):
+        self.teams[c.getGroupKeyForGrouping()].append(c)
+        self.bundles[c.getGroupKeyForCollapsing()].append(c)
+
+    def _unindex(self, c):
+        self.teams[c.getGroupKeyForGrouping()].remove(c)
+        self.bundles[c.getGroupKeyForCollapsing()].remove(c)
+
+    # ------------------------------------------------------------------
+    def neighbourhood(self, seeds) -> list:
+        """The seeds plus every course linked to them through a team-taught group or co-convened bundle."""
+        seen = {id(c): c for c in seeds}
+        frontier = list(seeds)
+        while frontier:
+            c = frontier.pop()
+            for other in self.teams[c.getGroupKeyForGrouping()] + self.bundles[c.getGroupKeyForCollapsing()]:
+                if id(other) not in seen:
+                    seen[id(other)] = other
+                    frontier.append(other)
+        return list(seen.values())
+
+    def counted(self, c) -> bool:
+        # a faculty member holds one course per grouping key; a second raw row
+        # with the same key is priced but, as in a full run, not totalled
+        fac = self.faculty.get(c.instructorEmplid)
+        return fac is not None and fac.courses.get(c.getGroupKeyForGrouping()) is c
+
+    def carried(self, courses) -> dict:
+        """id -> (emplid, load carried) – what to take back out of the totals before a recompute."""
+        return {id(c): (c.instructorEmplid, (c.load or 0.0) if self.counted(c) else 0.0) for c in courses}
+
+    def recompute(self, group, old: dict) -> None:
+        """
+        Re-runs team-taught / co-convened detection and pricing for group (a
+        union of whole neighbourhoods), then moves each faculty total by the
+        difference: old's carried loads out, the group's new loads in.
+        """
+        for c in group:
+            c.resetGrouping()
+        detect_team_taught({k: self.teams[k] for k in {c.getGroupKeyForGrouping() for c in group}})
+        adjust_co_convened(group)
+        for c, load in zip(group, priceCourses(group).tolist()):
+            c.preDivisionLoad = load
+            c.load = load * c.shareWeight()
+
+        for emplid, carried in old.values():
+            if emplid in self.faculty:
+                self.faculty[emplid].totalLoad -= carried
+        for c in group:
+            if self.counted(c):
+                self.faculty[c.instructorEmplid].totalLoad += c.load
@@ -0,0 +1,58 @@
+import os
+
+from algorithmPolicy import loadRawData, loadWorkloadPolicy, loadInstructorTrack, loadTrackRoster, loadSpecialCourses
+from workload_rules import RULES_FILE_NAMES
+
+# ---------------------------------------------------------------------------
+# Parsed input cache
+#
+# The GUI asks the worker to parse each input file as soon as it is picked –
+# the raw export is read, validated and de-duplicated while the user is still
+# choosing the policy, track and special-course files – and the run then
+# takes the parsed copy from here. An entry is reused only while the file's
+# size and modification time are unchanged (for the policy, also those of the
+# rule table next to it), so an edited file is simply read again.
+# ---------------------------------------------------------------------------
+
+LOADERS = {
+    "raw": loadRawData,
+    "policy": loadWorkloadPolicy,
+    "tracks": loadInstructorTrack,
+    "roster": loadTrackRoster,
+    "special": loadSpecialCourses,
+}
+
+
+def _stamp(kind, path):
+    paths = [path]
+    if kind == "policy":
+        folder = os.path.dirname(os.path.abspath(path))
+        paths += [os.path.join(folder, name) for name in RULES_FILE_NAMES]
+    return tuple((os.path.getsize(p), os.path.getmtime(p)) if os.path.exists(p) else None for p in paths)
+
+
+class InputCache:
+    """One parsed file per kind – the last one picked."""
+
+    def __init__(self):
+        # kind -> (absolute path, stamp, parsed value)
+        self._entries = {}
+
+    def get(self, kind, path):
+        path = os.path.abspath(path)
+        stamp = _stamp(kind, path)
+        entry = self._entries.get(kind)
+        if entry is not None and entry[0] == path and entry[1] == stamp:
+            return entry[2]
+        value = LOADERS[kind](path)
+        self._entries[kind] = (path, stamp, value)
+        return value
+
+    def preload(self, kind, path) -> bool:
+        """Parses path ahead of a run; a failure is left for the run itself to report."""
+        try:
+            self.get(kind, path)
+            return True
+        except Exception:
+            self._entries.pop(kind, None)
+            return False
@@ -0,0 +1,173 @@
+import re
+from collections import defaultdict
+from functools import lru_cache
+
+import pandas as pd
+
+# ---------------------------------------------------------------------------
+# Unmatched instructors
+#
+# Raw rows whose emplid is not in the track file are dropped from the loads.
+# This stage proposes which track-file entry each of them probably is. The
+# roster is indexed once by blocking keys – name tokens, email tokens and the
+# one-digit-deleted variants of each emplid (so a mistyped, missing or extra
+# digit still lands in the same block) – and every unmatched instructor is
+# scored only against the entries sharing a block with it.
+# ---------------------------------------------------------------------------
+
+MAX_CANDIDATES = 3
+MIN_SCORE = 0.3
+# rare tokens only: a block holding more entries than this says nothing
+MAX_BLOCK = 50
+
+UNMATCHED_COLUMNS = [
+    "Instructor", "Instructor Email", "Emplid", "Rows", "Units",
+    "Rank", "Candidate", "Candidate Email", "Candidate Emplid", "Candidate Track", "Score", "Evidence",
+]
+
+_TOKEN = re.compile(r"[a-z]+")
+
+
+def normalizeEmplid(value) -> str:
+    """Digits only, no leading zeros: 123456.0, ' 0123456 ' and 123456 all give '123456'."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    text = str(value).strip()
+    if re.fullmatch(r"\d+\.0*", text):
+        text = text.split(".")[0]
+    return re.sub(r"\D", "", text).lstrip("0")
+
+
+@lru_cache(maxsize=None)
+def _nameTokens(name: str) -> frozenset:
+    return frozenset(t for t in _TOKEN.findall(name.lower()) if len(t) > 1)
+
+
+def _emailParts(email: str):
+    email = email.strip().lower()
+    local = email.split("@", 1)[0]
+    return email, frozenset(t for t in _TOKEN.findall(local) if len(t) > 1)
+
+
+def _deletions(emplid: str) -> set:
+    return {emplid[:i] + emplid[i + 1:] for i in range(len(emplid))} | {emplid}
+
+
+def _text(v) -> str:
+    return "" if v is None or (not isinstance(v, str) and pd.isna(v)) else str(v)
+
+
+class RosterIndex:
+    """Blocking index over the track file (Instructor, Instructor Email, Instructor Emplid, Track)."""
+
+    def __init__(self, roster: pd.DataFrame):
+        self.entries = []
+        self.blocks = defaultdict(set)
+        for row in roster.to_dict("records"):
+            name = _text(row.get("Instructor"))
+            email, emailTokens = _emailParts(_text(row.get("Instructor Email")))
+            emplid = normalizeEmplid(row.get("Instructor Emplid"))
+            i = len(self.entries)
+            self.entries.append({
+                "name": name, "email": email, "emplid": emplid, "track": row.get("Track"),
+                "raw": row.get("Instructor Emplid"),
+                "tokens": _nameTokens(name) | emailTokens,
+            })
+            for key in self._keys(name, email, emailTokens, emplid):
+                self.blocks[key].add(i)
+
+    @staticmethod
+    def _keys(name, email, emailTokens, emplid):
+        keys = {("tok", t) for t in _nameTokens(name) | emailTokens}
+        if email:
+            keys.add(("email", email))
+        if emplid:
+            keys |= {("id", d) for d in _deletions(emplid)}
+        return keys
+
+    def candidates(self, name, email, emplid) -> list:
+        email, emailTokens = _emailParts(email)
+        emplid = normalizeEmplid(emplid)
+        tokens = _nameTokens(name) | emailTokens
+        seen = set()
+        for key in self._keys(name, email, emailTokens, emplid):
+            block = self.blocks.get(key, set())
+            if len(block) <= MAX_BLOCK or key[0] != "tok":
+                seen |= block
+
+        scored = []
+        for i in seen:
+            e = self.entries[i]
+            score, evidence = 0.0, []
+            if emplid and e["emplid"] == emplid:
+                score += 0.6
+                evidence.append("same emplid once normalized")
+            elif emplid and e["emplid"] and (_deletions(emplid) & _deletions(e["emplid"])):
+                # emplids are dense, so a near miss only counts alongside name/email evidence
+                score += 0.2
+                evidence.append("emplid differs by one digit")
+            if email and e["email"] == email:
+                score += 0.3
+                evidence.append("same email")
+            if tokens and e["tokens"]:
+                overlap = len(tokens & e["tokens"]) / len(tokens | e["tokens"])
+                if overlap:
+                    score += 0.4 * overlap
+                    evidence.append(f"name/email tokens {overlap:.0%} alike")
+            if score >= MIN_SCORE:
+                scored.append((round(min(score, 1.0), 2), e, "; ".join(evidence)))
+        scored.sort(key=lambda s: (-s[0], s[1]["name"]))
+        return scored[:MAX_CANDIDATES]
+
+
+def collectUnmatched(raw_df: pd.DataFrame, tracks: dict) -> dict:
+    """emplid -> {"Instructor", "Instructor Email", "Rows", "Units"} for every emplid missing from tracks."""
+    emplids = raw_df["Instructor Emplid"]
+    rows = raw_df[emplids.notna() & ~emplids.isin(list(tracks))]
+    unmatched = {}
+    for row in rows.to_dict("records"):
+        info = unmatched.setdefault(row.get("Instructor Emplid"), {
+            "Instructor": row.get("Instructor"), "Instructor Email": row.get("Instructor Email"),
+            "Rows": 0, "Units": set(),
+        })
+        info["Rows"] += 1
+        if pd.notna(row.get("Unit")):
+            info["Units"].add(str(row.get("Unit")).strip())
+    return unmatched
+
+
+def matchUnmatched(unmatched: dict, roster: pd.DataFrame) -> pd.DataFrame:
+    """
+    unmatched: emplid -> {"Instructor", "Instructor Email", "Rows", "Units"}
+    as collected by collectUnmatched. One output row per proposed candidate
+    (best first); instructors without any candidate get a single blank row.
+    """
+    index = RosterIndex(roster)
+    rows = []
+    for emplid, info in sorted(unmatched.items(), key=lambda kv: _text(kv[1]["Instructor"])):
+        base = {
+            "Instructor": info["Instructor"],
+            "Instructor Email": info["Instructor Email"],
+            "Emplid": emplid,
+            "Rows": info["Rows"],
+            "Units": ", ".join(sorted(info["Units"])),
+        }
+        found = index.candidates(_text(info["Instructor"]), _text(info["Instructor Email"]), emplid)
+        if not found:
+            rows.append(base)
+        for rank, (score, e, evidence) in enumerate(found, start=1):
+            rows.append({
+                **base,
+                "Rank": rank,
+                "Candidate": e["name"],
+                "Candidate Email": e["email"],
+                "Candidate Emplid": e["raw"],
+                "Candidate Track": e["track"],
+                "Score": score,
+                "Evidence": evidence,
+            })
+    out = pd.DataFrame(rows, columns=UNMATCHED_COLUMNS)
+    # whole numbers like on the other sheets, not 2370125.0 next to blank candidates
+    for column in ("Emplid", "Candidate Emplid"):
+        out[column] = pd.to_numeric(out[column], errors="coerce").astype("Int64")
+    return out
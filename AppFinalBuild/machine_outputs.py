@@ -0,0 +1,97 @@
+import os
+import hashlib
+import pandas as pd
+
+from report_common import term_text
+from workload_rules import policyHash
+
+# ---------------------------------------------------------------------------
+# Machine-readable outputs – long per-course table and per-faculty totals,
+# written straight from the computed faculty data (no openpyxl)
+# ---------------------------------------------------------------------------
+
+COURSE_COLUMNS = [
+    "emplid", "course_key", "term", "class_nbr", "pre_division_load", "divisor",
+    "co_convened", "team_taught", "final_load", "unit", "enroll_total", "max_units",
+    "team_key", "bundle_key", "policy_hash",
+]
+
+# columns that only link rows to each other (for run_diff), not shown in previews
+LINK_COLUMNS = ["team_key", "bundle_key", "policy_hash"]
+
+FACULTY_COLUMNS = [
+    "emplid", "instructor", "email", "track", "total_load", "course_count", "units",
+]
+
+
+def _keyText(key) -> str:
+    return hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+
+
+def buildCourseTable(facultyDict) -> pd.DataFrame:
+    rows = []
+    # one hash per policy object – every course of a run shares the same one
+    policies = {}
+    for fac in facultyDict.values():
+        for c in fac.courses.values():
+            if id(c.policy) not in policies:
+                policies[id(c.policy)] = policyHash(c.policy)
+            final = c.calculateLoad() if c.load is None else c.load
+            pre = c.preDivisionLoad if c.preDivisionLoad is not None else final
+            rows.append((
+                fac.emplid,
+                c.courseKey(),
+                term_text(c.rawData.get("Term")),
+                c.classNbr,
+                float(pre),
+                int(c.divisor),
+                bool(c.isCoconvened),
+                bool(c.isTeamTaught),
+                float(final),
+                c.unit,
+                int(c.enrollTotal),
+                float(c.maxUnits),
+                # the team-taught group / co-convened bundle the row is priced with
+                _keyText(c.getGroupKeyForGrouping()),
+                _keyText(c.getGroupKeyForCollapsing()),
+                policies[id(c.policy)],
+            ))
+    return pd.DataFrame.from_records(rows, columns=COURSE_COLUMNS)
+
+
+def buildFacultyTable(facultyDict) -> pd.DataFrame:
+    rows = []
+    for fac in facultyDict.values():
+        units = sorted({c.unit for c in fac.courses.values() if c.unit})
+        rows.append((
+            fac.emplid,
+            fac.name,
+            fac.email,
+            fac.track or "Unknown",
+            float(fac.totalLoad),
+            len(fac.courses),
+            ", ".join(units),
+        ))
+    return pd.DataFrame.from_records(rows, columns=FACULTY_COLUMNS)
+
+
+def _write(df: pd.DataFrame, stem: str) -> list:
+    written = []
+    try:
+        df.to_parquet(f"{stem}.parquet", index=False)
+        written.append(f"{stem}.parquet")
+    except ImportError as e:
+        print("Warning: parquet output needs pyarrow – skipping:", e)
+    df.to_json(f"{stem}.jsonl", orient="records", lines=True)
+    written.append(f"{stem}.jsonl")
+    return written
+
+
+def export_machine_readable(facultyDict, data_dir: str, base: str) -> list:
+    """
+    Writes <base>_courses and <base>_faculty as parquet and newline-delimited json.
+    Returns the list of files written.
+    """
+    written = _write(buildCourseTable(facultyDict), os.path.join(data_dir, f"{base}_courses"))
+    written += _write(buildFacultyTable(facultyDict), os.path.join(data_dir, f"{base}_faculty"))
+    return written
@@ -1,15 +1,23 @@
 import sys
 import os
 import ctypes
+import multiprocessing
+import numpy as np
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton, QLabel, QFileDialog, QMessageBox, QProgressBar,
-    QDialog, QFormLayout, QLineEdit
+    QDialog, QFormLayout, QLineEdit, QComboBox, QCheckBox, QHBoxLayout, QPlainTextEdit, QTableView,
+    QHeaderView, QAbstractItemView
 )
 from PyQt6.QtGui import QIcon, QPixmap
 from PyQt6.QtCore import Qt
 
-# Using the updated excel_processor that references the new algorithm
-from excel_processor import ExcelProcessor
+# Runs go to a worker process running excel_processor.WorkloadJob
+from worker import WorkerClient
+from table_reader import FILE_FILTER
+from scenario import Scenario
+from history_store import HISTORY_FILE_NAME
+from results_view import FrameModel
+from machine_outputs import LINK_COLUMNS
 
 def get_absolute_path(filename):
     if getattr(sys, '_MEIPASS', False):
@@ -93,6 +101,182 @@ class SettingsDialog(QDialog):
                 values[key] = 1
         return values
 
+class WhatIfDialog(QDialog):
+    """Try section moves / Enroll Total changes against the last run without re-processing."""
+
+    def __init__(self, parent, scenario):
+        super().__init__(parent)
+        self.scenario = scenario
+        self.setWindowTitle("What-If Scenarios")
+        self.setGeometry(400, 300, 640, 520)
+
+        layout = QVBoxLayout()
+        form_layout = QFormLayout()
+        self.course_edit = QLineEdit(self)
+        self.course_edit.setPlaceholderText("e.g. ENG 105-003")
+        self.from_edit = QLineEdit(self)
+        self.to_edit = QLineEdit(self)
+        self.enroll_edit = QLineEdit(self)
+        form_layout.addRow("Section", self.course_edit)
+        form_layout.addRow("From Emplid", self.from_edit)
+        form_layout.addRow("To Emplid", self.to_edit)
+        form_layout.addRow("Enroll Total", self.enroll_edit)
+        layout.addLayout(form_layout)
+
+        buttons = QHBoxLayout()
+        for text, slot in (("Move Section", self.move_section), ("Set Enroll Total", self.set_enrollment),
+                           ("Undo", self.undo), ("Redo", self.redo)):
+            button = QPushButton(text, self)
+            button.clicked.connect(slot)
+            buttons.addWidget(button)
+        layout.addLayout(buttons)
+
+        self.diff_view = QPlainTextEdit(self)
+        self.diff_view.setReadOnly(True)
+        self.diff_view.setStyleSheet("font-family: Consolas, monospace;")
+        layout.addWidget(self.diff_view)
+
+        self.setLayout(layout)
+        self.refresh()
+
+    def _run(self, edit):
+        try:
+            edit()
+        except (KeyError, ValueError) as e:
+            QMessageBox.warning(self, "Scenario", str(e).strip("'\""))
+        self.refresh()
+
+    def move_section(self):
+        self._run(lambda: self.scenario.moveSection(self.course_edit.text(), self.from_edit.text().strip(),
+                                                    self.to_edit.text().strip()))
+
+    def set_enrollment(self):
+        self._run(lambda: self.scenario.setEnrollment(self.course_edit.text(), self.enroll_edit.text().strip()))
+
+    def undo(self):
+        self._run(self.scenario.undo)
+
+    def redo(self):
+        self._run(self.scenario.redo)
+
+    def refresh(self):
+        history = self.scenario.history()
+        diff = self.scenario.facultyDiff()
+        text = "Edits:\n" + ("\n".join(f"  {h}" for h in history) or "  (none)")
+        text += "\n\nFaculty totals vs. baseline:\n"
+        text += diff.to_string(index=False) if not diff.empty else "  (no change)"
+        self.diff_view.setPlainText(text)
+
+class ResultsDialog(QDialog):
+    """Faculty and course tables of the last run; pick an instructor to see only their courses."""
+
+    ALL_UNITS = "All Units"
+    ALL_TRACKS = "All Tracks"
+
+    def __init__(self, parent, faculty_table, course_table):
+        super().__init__(parent)
+        self.setWindowTitle("Results")
+        self.setGeometry(300, 200, 1000, 700)
+        tracks = dict(zip(faculty_table["emplid"], faculty_table["track"]))
+        self.selected_emplid = None
+
+        layout = QVBoxLayout()
+        filters = QHBoxLayout()
+        self.unit_filter = QComboBox(self)
+        self.unit_filter.addItems([self.ALL_UNITS] + sorted(u for u in course_table["unit"].unique() if u))
+        self.track_filter = QComboBox(self)
+        self.track_filter.addItems([self.ALL_TRACKS] + sorted(faculty_table["track"].unique()))
+        self.unit_filter.currentTextChanged.connect(self.apply_filters)
+        self.track_filter.currentTextChanged.connect(self.apply_filters)
+        filters.addWidget(QLabel("Unit", self))
+        filters.addWidget(self.unit_filter)
+        filters.addWidget(QLabel("Track", self))
+        filters.addWidget(self.track_filter)
+        filters.addStretch()
+        layout.addLayout(filters)
+
+        self.faculty_label = QLabel(self)
+        layout.addWidget(self.faculty_label)
+        self.faculty_model = FrameModel(faculty_table, self)
+        self.faculty_view = self._table_view(self.faculty_model)
+        self.faculty_view.selectionModel().currentRowChanged.connect(self.drill_down)
+        layout.addWidget(self.faculty_view, 3)
+
+        courses_header = QHBoxLayout()
+        self.course_label = QLabel(self)
+        show_all = QPushButton("Show All Courses", self)
+        show_all.clicked.connect(self.show_all_courses)
+        courses_header.addWidget(self.course_label)
+        courses_header.addStretch()
+        courses_header.addWidget(show_all)
+        layout.addLayout(courses_header)
+        # the instructor's track travels with each course row, for the track filter
+        courses = course_table.drop(columns=LINK_COLUMNS)
+        self.course_model = FrameModel(courses.assign(track=courses["emplid"].map(tracks)), self)
+        self.course_view = self._table_view(self.course_model)
+        layout.addWidget(self.course_view, 2)
+
+        self.setLayout(layout)
+        self.apply_filters()
+
+    def _table_view(self, model):
+        view = QTableView(self)
+        view.setModel(model)
+        view.setSortingEnabled(True)
+        view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        # fixed row heights: the view never measures rows it is not showing
+        view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        view.verticalHeader().setDefaultSectionSize(22)
+        view.horizontalHeader().setStretchLastSection(True)
+        return view
+
+    def _masks(self):
+        unit = self.unit_filter.currentText()
+        track = self.track_filter.currentText()
+        faculty, courses = self.faculty_model.frame, self.course_model.frame
+        faculty_mask = np.ones(len(faculty), dtype=bool)
+        course_mask = np.ones(len(courses), dtype=bool)
+        if unit != self.ALL_UNITS:
+            in_unit = (courses["unit"] == unit).to_numpy()
+            course_mask &= in_unit
+            faculty_mask &= faculty["emplid"].isin(courses["emplid"][in_unit]).to_numpy()
+        if track != self.ALL_TRACKS:
+            faculty_mask &= (faculty["track"] == track).to_numpy()
+            course_mask &= (courses["track"] == track).to_numpy()
+        if self.selected_emplid is not None:
+            course_mask &= (courses["emplid"] == self.selected_emplid).to_numpy()
+        return faculty_mask, course_mask
+
+    def apply_filters(self):
+        self.selected_emplid = None
+        faculty_mask, course_mask = self._masks()
+        self.faculty_model.setMask(faculty_mask)
+        self.course_model.setMask(course_mask)
+        self._update_labels()
+
+    def drill_down(self, current, previous=None):
+        if not current.isValid():
+            return
+        self.selected_emplid = self.faculty_model.value(current.row(), "emplid")
+        self.course_model.setMask(self._masks()[1])
+        self._update_labels()
+
+    def show_all_courses(self):
+        self.selected_emplid = None
+        self.faculty_view.clearSelection()
+        self.course_model.setMask(self._masks()[1])
+        self._update_labels()
+
+    def _update_labels(self):
+        self.faculty_label.setText(f"Faculty ({self.faculty_model.visibleRows()})")
+        if self.selected_emplid is None:
+            self.course_label.setText(f"Courses ({self.course_model.visibleRows()})")
+        else:
+            faculty = self.faculty_model.frame
+            name = faculty.loc[faculty["emplid"] == self.selected_emplid, "instructor"].iat[0]
+            self.course_label.setText(f"Courses – {name} ({self.course_model.visibleRows()})")
+
 class ExcelParserApp(QWidget):
     def __init__(self):
         super().__init__()
@@ -100,7 +284,13 @@ class ExcelParserApp(QWidget):
             "Multiplier", "Offset", "Threshold", "Scaling Factor", "Precision",
             "Adjustment", "Limit", "Ratio", "Modifier", "Factor"
         ]}
+        # one warm worker process for every run of this session
+        self.worker = WorkerClient(self)
         self.initUI()
+        self.worker.progress.connect(self.progress_bar.setValue)
+        self.worker.completed.connect(self.show_success)
+        self.worker.error.connect(self.show_error)
+        self.worker.cancelled.connect(self.show_cancelled)
 
     def initUI(self):
         self.setWindowTitle("Lumberjack Balancing™")
@@ -188,6 +378,38 @@ class ExcelParserApp(QWidget):
         self.btn_select_special.clicked.connect(self.select_special_file)
         layout.addWidget(self.btn_select_special)
 
+        # Format of the per-unit report (the html dashboard skips openpyxl entirely)
+        self.report_format = QComboBox()
+        self.report_format.addItem("Unit Report: Excel Workbook", "xlsx")
+        self.report_format.addItem("Unit Report: HTML Dashboard", "html")
+        self.report_format.addItem("Unit Report: Excel + HTML", "both")
+        self.report_format.setStyleSheet("""
+            QComboBox {
+                border: 1px solid #bbb;
+                border-radius: 5px;
+                padding: 5px;
+            }
+        """)
+        layout.addWidget(self.report_format)
+
+        self.machine_outputs_box = QCheckBox("Also write Parquet/JSON tables")
+        layout.addWidget(self.machine_outputs_box)
+
+        self.propose_balance_box = QCheckBox("Propose load-balancing reassignments")
+        layout.addWidget(self.propose_balance_box)
+
+        self.strict_coconvened_box = QCheckBox("Co-convened sections must share a room")
+        layout.addWidget(self.strict_coconvened_box)
+
+        self.history_box = QCheckBox("Append results to the workload history database")
+        layout.addWidget(self.history_box)
+
+        self.incremental_box = QCheckBox("Incremental run (re-price only rows changed since the last run)")
+        layout.addWidget(self.incremental_box)
+
+        self.parallel_box = QCheckBox("Spread the calculation over all CPU cores (by term and unit)")
+        layout.addWidget(self.parallel_box)
+
         # This button triggers the actual processing (once all files are chosen)
         self.browse_button = QPushButton("Run Workload Calculation")
         self.browse_button.setStyleSheet("""
@@ -204,6 +426,11 @@ class ExcelParserApp(QWidget):
         self.browse_button.clicked.connect(self.process_excel)
         layout.addWidget(self.browse_button)
 
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancel_run)
+        self.cancel_button.setEnabled(False)
+        layout.addWidget(self.cancel_button)
+
         # ---------------------------
         # Settings Button
         # ---------------------------
@@ -223,6 +450,16 @@ class ExcelParserApp(QWidget):
         self.settings_button.hide() 
 
 
+        self.what_if_button = QPushButton("What-If Scenarios")
+        self.what_if_button.clicked.connect(self.open_what_if)
+        self.what_if_button.setEnabled(False)
+        layout.addWidget(self.what_if_button)
+
+        self.results_button = QPushButton("View Results")
+        self.results_button.clicked.connect(self.open_results)
+        self.results_button.setEnabled(False)
+        layout.addWidget(self.results_button)
+
         self.progress_bar = QProgressBar()
         self.progress_bar.setValue(0)
         self.progress_bar.setTextVisible(True)
@@ -272,10 +509,12 @@ class ExcelParserApp(QWidget):
     # ------------
     def select_raw_file(self):
         file_path, _ = QFileDialog.getOpenFileName(
-            self, "Select Raw Data Excel File", "", "Excel Files (*.xlsx);;All Files (*)"
+            self, "Select Raw Data File", "", FILE_FILTER
         )
         if file_path:
             self.raw_file_path = file_path
+            # parsed in the worker while the user picks the other files
+            self.worker.preload("raw", file_path)
             QMessageBox.information(self, "Raw File Selected",
                                     f"Raw data file:\n{file_path}")
 
@@ -285,24 +524,28 @@ class ExcelParserApp(QWidget):
         )
         if file_path:
             self.policy_file_path = file_path
+            self.worker.preload("policy", file_path)
             QMessageBox.information(self, "Policy File Selected",
                                     f"Policy file:\n{file_path}")
 
     def select_track_file(self):
         file_path, _ = QFileDialog.getOpenFileName(
-            self, "Select Instructor Track File", "", "Excel Files (*.xlsx);;All Files (*)"
+            self, "Select Instructor Track File", "", FILE_FILTER
         )
         if file_path:
             self.track_file_path = file_path
+            self.worker.preload("tracks", file_path)
+            self.worker.preload("roster", file_path)
             QMessageBox.information(self, "Track File Selected",
                                     f"Track file:\n{file_path}")
 
     def select_special_file(self):
         file_path, _ = QFileDialog.getOpenFileName(
-            self, "Select Special Courses File", "", "Excel Files (*.xlsx);;All Files (*)"
+            self, "Select Special Courses File", "", FILE_FILTER
         )
         if file_path:
             self.special_file_path = file_path
+            self.worker.preload("special", file_path)
             QMessageBox.information(self, "Special Courses File Selected",
                                     f"Special courses file:\n{file_path}")
 
@@ -317,38 +560,83 @@ class ExcelParserApp(QWidget):
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
 
-        # Initialize our QThread-based processor
-        self.thread = ExcelProcessor(
+        # Hand the run to the worker process
+        self.browse_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.worker.submit(
             raw_file_path=self.raw_file_path,
             policy_file_path=self.policy_file_path,
             track_file_path=self.track_file_path,
-            special_file_path=self.special_file_path
+            special_file_path=self.special_file_path,
+            output_mode=self.report_format.currentData(),
+            machine_outputs=self.machine_outputs_box.isChecked(),
+            propose_balance=self.propose_balance_box.isChecked(),
+            strict_coconvened=self.strict_coconvened_box.isChecked(),
+            history_db=(os.path.join(os.path.dirname(self.raw_file_path), HISTORY_FILE_NAME)
+                        if self.history_box.isChecked() else None),
+            incremental=self.incremental_box.isChecked(),
+            partitions="unit" if self.parallel_box.isChecked() else None
         )
 
-        # Connect signals
-        self.thread.progress.connect(self.progress_bar.setValue)
-        self.thread.completed.connect(self.show_success)
-        self.thread.error.connect(self.show_error)
+    def cancel_run(self):
+        self.cancel_button.setEnabled(False)
+        self.worker.cancel()
+
+    def show_cancelled(self):
+        self.progress_bar.setValue(0)
+        self.browse_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
 
-        # Start the thread
-        self.thread.start()
+    def closeEvent(self, event):
+        self.worker.shutdown()
+        super().closeEvent(event)
 
     def open_settings(self):
         settings_dialog = SettingsDialog(self, self.settings_values)
         if settings_dialog.exec():
             self.settings_values = settings_dialog.get_values()
 
+    def open_what_if(self):
+        if self.worker.faculty is None:
+            return
+        if getattr(self, "scenario", None) is None:
+            # edits apply to the GUI's copy; the worker's model for incremental runs is untouched
+            self.scenario = Scenario(self.worker.faculty, self.worker.courses)
+        WhatIfDialog(self, self.scenario).exec()
+
+    def open_results(self):
+        if self.worker.facultyTable is None:
+            return
+        ResultsDialog(self, self.worker.facultyTable, self.worker.courseTable).exec()
+
     def show_success(self, output_file):
         self.progress_bar.setValue(100)
-        QMessageBox.information(self, "Success",
-                                f"Workload calculations complete.\nOutput file created at:\n{output_file}")
+        self.scenario = None
+        self.browse_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.what_if_button.setEnabled(True)
+        self.results_button.setEnabled(True)
+        message = f"Workload calculations complete.\nOutput file created at:\n{output_file}"
+        if self.worker.delta is not None:
+            delta = self.worker.delta
+            message += (f"\n\nIncremental run: {delta['added']} added, {delta['removed']} removed, "
+                        f"{delta['changed']} changed rows; {delta['repriced']} courses re-priced")
+        if self.worker.cube is not None:
+            ct_well, ct_other, tt_well, tt_other = self.worker.cube.breakdown()
+            message += (f"\n\nCT within ±2 of target: {ct_well} of {ct_well + ct_other}"
+                        f"\nTT within ±2 of target: {tt_well} of {tt_well + tt_other}")
+        QMessageBox.information(self, "Success", message)
 
     def show_error(self, error_message):
         self.progress_bar.setValue(0)
+        self.browse_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
         QMessageBox.critical(self, "Error", f"Failed to process the file:\n{error_message}")
 
 
 if __name__ == "__main__":
+    # partitioned runs start worker processes, which must not re-run the GUI when frozen
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     icon_path = get_absolute_path("favicon.ico")
     app.setWindowIcon(QIcon(icon_path))
@@ -0,0 +1,146 @@
+import os
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+import pandas as pd
+
+from algorithmPolicy import FacultyMember, buildCourseModel, priceCourses
+from assignment import AssignmentMatrix
+from cancellation import checkpoint
+
+# ---------------------------------------------------------------------------
+# Partitioned runs
+#
+# Term is part of every team-taught and co-convened key, so no course's load
+# depends on a course from another term: each term can be detected and priced
+# on its own, in its own process. Splitting further by Unit is only safe once
+# the units linked through a shared section or bundle are put back together,
+# so those links are found first (on the raw key columns) and linked units
+# share a partition.
+#
+# Workers return their priced courses; the parent re-assembles them in raw-file
+# order and builds the faculty and assignment matrix exactly as a serial run
+# would, so totals do not depend on how many workers ran or which finished first.
+# ---------------------------------------------------------------------------
+
+# raw columns behind Course.getGroupKeyForGrouping / getGroupKeyForCollapsing
+TEAM_KEY_COLUMNS = ['Term', 'Subject', 'Cat Nbr', 'Section', 'Class Nbr', 'Class',
+                    'Start Date', 'End Date', 'Start Time', 'Days']
+BUNDLE_KEY_COLUMNS = ['Instructor Emplid', 'Term', 'Subject', 'Section',
+                      'Start Date', 'End Date', 'Start Time', 'Days']
+
+POSITION_COLUMN = '_position'
+
+# below this many rows starting the pool costs more than it saves
+MIN_PARALLEL_ROWS = 20000
+
+
+def partitionLabels(raw_df: pd.DataFrame, by_unit: bool = False) -> np.ndarray:
+    """One integer label per raw row; rows that can affect each other always share a label."""
+    if not by_unit or 'Unit' not in raw_df.columns:
+        return raw_df['Term'].factorize(use_na_sentinel=False)[0]
+
+    labels = pd.MultiIndex.from_frame(raw_df[['Term', 'Unit']].astype(str)).factorize()[0]
+    parent = list(range(labels.max() + 1 if len(labels) else 0))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # any team-taught group or bundle touching two (term, unit) partitions joins them;
+    # keys are compared on the raw columns, which can only over-join, never split
+    for columns in (TEAM_KEY_COLUMNS, BUNDLE_KEY_COLUMNS):
+        keyed = pd.DataFrame({'key': pd.util.hash_pandas_object(raw_df[columns], index=False).to_numpy(),
+                              'label': labels})
+        first = keyed.groupby('key')['label'].transform('first').to_numpy()
+        for a, b in set(zip(first[first != labels].tolist(), labels[first != labels].tolist())):
+            parent[find(a)] = find(b)
+
+    roots = np.array([find(i) for i in range(len(parent))], dtype=np.intp)
+    return pd.factorize(roots[labels])[0] if len(labels) else labels
+
+
+def _exitWithParent():
+    # pool initializer: if the process that started the pool is killed (e.g. a
+    # forced cancel of the GUI's worker), its pool processes go with it
+    parent = multiprocessing.parent_process()
+
+    def watch():
+        while parent.is_alive():
+            time.sleep(1.0)
+        os._exit(1)
+
+    if parent is not None:
+        threading.Thread(target=watch, daemon=True).start()
+
+
+def _pricePartition(part: pd.DataFrame, policy: dict, tracks: dict, special):
+    """Worker: the serial pipeline on one partition. Returns [(raw position, course)]."""
+    _, courses = buildCourseModel(part, policy, tracks, special)
+    for c, load in zip(courses, priceCourses(courses).tolist()):
+        c.preDivisionLoad = load
+        c.load = load * c.shareWeight()
+    return [(c.rawData[POSITION_COLUMN], c) for c in courses]
+
+
+def computePartitioned(raw_df: pd.DataFrame, policy: dict, tracks: dict, special,
+                       by_unit: bool = False, workers: int | None = None, cancel=None):
+    """
+    Same result as buildCourseModel + applyAssignment, computed one partition
+    per process (workers=None: one per core, or in-process for small exports).
+    Returns (faculty, courses, matrix, loads).
+    """
+    raw_df = raw_df.assign(**{POSITION_COLUMN: np.arange(len(raw_df))})
+    labels = partitionLabels(raw_df, by_unit)
+    parts = [raw_df[labels == k] for k in range(labels.max() + 1 if len(labels) else 0)]
+    if workers is None and len(raw_df) < MIN_PARALLEL_ROWS:
+        workers = 1
+    workers = min(workers or os.cpu_count() or 1, len(parts))
+    special = frozenset(special)
+
+    if workers <= 1:
+        results = []
+        for p in parts:
+            checkpoint(cancel)
+            results.append(_pricePartition(p, policy, tracks, special))
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_exitWithParent)
+        try:
+            futures = [pool.submit(_pricePartition, p, policy, tracks, special) for p in parts]
+            pending = set(futures)
+            while pending:
+                checkpoint(cancel)
+                _, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            # in submission order, whichever finished first
+            results = [f.result() for f in futures]
+        finally:
+            # on cancel, drop the queued partitions instead of waiting for them
+            pool.shutdown(wait=not (cancel is not None and cancel.cancelled), cancel_futures=True)
+
+    # raw-file order, with every course pointing at the parent's policy again
+    placed = sorted((pair for result in results for pair in result), key=lambda pair: pair[0])
+    faculty = {}
+    groupStart = {}
+    for position, c in placed:
+        c.policy, c.special = policy, special
+        del c.rawData[POSITION_COLUMN]
+        groupStart.setdefault(c.getGroupKeyForGrouping(), position)
+        emplid = c.instructorEmplid
+        if emplid not in faculty:
+            role = str(c.rawData.get('Instructor Role', '')).strip().upper()
+            faculty[emplid] = FacultyMember(c.rawData.get('Instructor', ''), c.rawData.get('Instructor Email', ''),
+                                            emplid, role, tracks[emplid])
+        faculty[emplid].addCourse(c)
+
+    # courses group by group in order of first appearance, as buildCourseModel lists them
+    courses = [c for position, c in sorted(placed, key=lambda pair: (groupStart[pair[1].getGroupKeyForGrouping()], pair[0]))]
+    loads = np.array([c.preDivisionLoad for c in courses], dtype=float)
+    matrix = AssignmentMatrix.build(faculty, courses)
+    for emplid, total in zip(matrix.emplids, matrix.facultyTotals(loads).tolist()):
+        faculty[emplid].totalLoad = total
+    return faculty, courses, matrix, loads
@@ -0,0 +1,88 @@
+import math
+import pandas as pd
+
+# ---------------------------------------------------------------------------
+# Shared report constants – used by the xlsx and html writers
+# ---------------------------------------------------------------------------
+
+GREEN  = "90EE90"   # CT or CT Well
+YELLOW = "FFFF00"   # For intermediary ranges (used in cell fill)
+RED    = "FF6347"   # TT below/bad or CT very low
+ORANGE = "FFA500"   # TT high (or TT poor performance)
+BLUE   = "1E90FF"   # TT or TT Well
+
+TRACK_TARGETS = {"CT": 40, "TT": 30}
+
+BREAKDOWN_CATEGORIES = ["CT Balanced", "CT Out of Range", "TT Balanced", "TT Out of Range"]
+BREAKDOWN_COLORS = [GREEN, RED, BLUE, ORANGE]
+
+
+def displayed_load(fac) -> int:
+    return int(math.ceil(fac.totalLoad or 0.0))
+
+
+def load_color(track_str, displayed_load_val) -> str:
+    """
+    Table cell color logic:
+     - If ceiled load is within ±2 of baseline -> green.
+     - Else, for loads deviating by 3-6 -> yellow.
+     - For loads 7 or more above (or 7 or more below) baseline,
+       use orange for high values (CT) and red for low values.
+    """
+    track_str = (track_str or "").strip().upper()
+    expected = TRACK_TARGETS.get(track_str)
+    if expected is None:
+        return RED
+
+    diff = displayed_load_val - expected
+    if abs(diff) <= 2:
+        return GREEN
+    elif diff > 0:
+        if 3 <= diff <= 6:
+            return YELLOW
+        elif diff >= 7:
+            return ORANGE
+    else:  # diff < 0
+        if 3 <= abs(diff) <= 6:
+            return YELLOW
+        elif abs(diff) >= 7:
+            return RED
+    return RED
+
+
+def is_balanced(track_str, displayed_load_val) -> bool:
+    expected = TRACK_TARGETS.get((track_str or "").strip().upper())
+    return expected is not None and abs(displayed_load_val - expected) <= 2
+
+
+def breakdown_percentages(ct_well, ct_other, tt_well, tt_other):
+    total = ct_well + ct_other + tt_well + tt_other
+    if total == 0:
+        return [0, 0, 0, 0]
+    return [round(100 * n / total, 2) for n in (ct_well, ct_other, tt_well, tt_other)]
+
+
+def glossary_label(course) -> str:
+    groupFlag = (
+        bool(getattr(course, "co_convened_members", None))
+        or bool(getattr(course, "team_taught_members", None))
+    )
+
+    subj   = course.rawData.get("Subject", "").strip()
+    cat    = course.rawData.get("Cat Nbr", "").strip()
+    sect   = course.rawData.get("Section", "").strip()
+    label = f"{'*' if groupFlag else ''}{subj} {cat}-{sect}"
+
+    if getattr(course, "co_convened_members", None):
+        label += f" (co-convened with {', '.join(course.co_convened_members)})"
+    if getattr(course, "team_taught_members", None):
+        label += f" (team-taught with {', '.join(course.team_taught_members)})"
+    return label
+
+
+def term_text(term) -> str:
+    if pd.isna(term):
+        return ""
+    if isinstance(term, float) and term.is_integer():
+        return str(int(term))
+    return str(term).strip()
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+# ---------------------------------------------------------------------------
+# Results preview model
+#
+# A Qt table model over one of the computed tables (workloads.Result
+# .facultyTable / .courseTable). Cells are read straight from the frame's
+# column arrays; sorting and filtering only reorder an index array of row
+# positions, and the view is handed FETCH_ROWS rows at a time as it scrolls
+# (canFetchMore / fetchMore), so tens of thousands of rows never turn into
+# widgets or copies.
+# ---------------------------------------------------------------------------
+
+FETCH_ROWS = 500
+
+
+def _header(name: str) -> str:
+    return name.replace("_", " ").title()
+
+
+class FrameModel(QAbstractTableModel):
+    def __init__(self, frame: pd.DataFrame, parent=None):
+        super().__init__(parent)
+        self._frame = frame.reset_index(drop=True)
+        self._columns = [self._frame[c].to_numpy() for c in self._frame.columns]
+        self._numeric = [pd.api.types.is_numeric_dtype(self._frame[c]) and not pd.api.types.is_bool_dtype(self._frame[c])
+                         for c in self._frame.columns]
+        # visible rows (positions in the frame) after filtering and sorting
+        self._rows = np.arange(len(self._frame))
+        self._mask = None
+        self._sort = None
+        self._loaded = min(FETCH_ROWS, len(self._rows))
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        return self._frame
+
+    def value(self, row: int, column: str):
+        """Value of column for the row shown at position row."""
+        return self._frame[column].iat[self._rows[row]]
+
+    # --- Qt model interface ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            value = self._columns[index.column()][self._rows[index.row()]]
+            if value is None or value is pd.NA or (isinstance(value, float) and np.isnan(value)):
+                return ""
+            if isinstance(value, (float, np.floating)):
+                return f"{value:.2f}"
+            return str(value)
+        if role == Qt.ItemDataRole.TextAlignmentRole and self._numeric[index.column()]:
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return _header(str(self._frame.columns[section]))
+        return str(section + 1)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < len(self._rows)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(FETCH_ROWS, len(self._rows) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self._sort = (column, order)
+        self._refresh()
+
+    # --- filtering ---
+
+    def setMask(self, mask):
+        """Shows only the rows where mask (a boolean array over the frame) is True; None shows all."""
+        self._mask = mask
+        self._refresh()
+
+    def visibleRows(self) -> int:
+        return len(self._rows)
+
+    def _refresh(self):
+        self.beginResetModel()
+        rows = np.flatnonzero(self._mask) if self._mask is not None else np.arange(len(self._frame))
+        if self._sort is not None:
+            column, order = self._sort
+            values = pd.Series(self._columns[column][rows])
+            ranked = values.sort_values(kind="stable", na_position="last",
+                                        ascending=order == Qt.SortOrder.AscendingOrder)
+            rows = rows[ranked.index.to_numpy()]
+        self._rows = rows
+        self._loaded = min(FETCH_ROWS, len(rows))
+        self.endResetModel()
@@ -0,0 +1,223 @@
+import os
+import sys
+import sqlite3
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------------------------
+# Diff between two runs
+#
+# Compares the per-course and per-faculty results of two runs (the
+# machine-readable <base>_courses / <base>_faculty tables, or a run stored in
+# the history database) with hash joins on emplid + term + course key, so the
+# cost is linear in the number of rows. Every changed section names the input
+# fields that moved, which is usually enough to explain a load change:
+# enrollment, units, the team-taught divisor or co-convened status. A section
+# whose own fields did not move is explained by the sections it is priced
+# with – the other shares of its team-taught group, the other sections of its
+# co-convened bundle – e.g. "enrollment of AST 570-001"; only when there are
+# none, and the two runs' policy hashes differ, is it put down to
+# "policy / rules".
+#
+#   python run_diff.py old_courses.parquet new_courses.parquet -o diff.xlsx
+#   python run_diff.py workload_history.sqlite#<run_id> new_courses.jsonl
+# ---------------------------------------------------------------------------
+
+COURSE_KEY = ["emplid", "term", "course_key"]
+
+# field in the course table -> how it is named in the "Changed Fields" column
+CAUSE_FIELDS = {
+    "enroll_total": "enrollment",
+    "max_units": "units",
+    "divisor": "team-taught divisor",
+    "co_convened": "co-convened status",
+    "team_taught": "team-taught status",
+}
+
+# (flag, key) columns linking a row to the rows it is priced with
+LINKS = (("team_taught", "team_key"), ("co_convened", "bundle_key"))
+
+LOAD_TOLERANCE = 0.005
+
+
+def _stem(path: str) -> str:
+    for suffix in ("_courses.parquet", "_courses.jsonl", "_faculty.parquet", "_faculty.jsonl"):
+        if path.endswith(suffix):
+            return path[: -len(suffix)]
+    return os.path.splitext(path)[0]
+
+
+def _readTable(stem: str, name: str) -> pd.DataFrame:
+    for ext, reader in ((".parquet", pd.read_parquet), (".jsonl", lambda p: pd.read_json(p, lines=True))):
+        path = f"{stem}_{name}{ext}"
+        if os.path.exists(path):
+            return reader(path)
+    raise FileNotFoundError(f"No {stem}_{name}.parquet or .jsonl – run with machine-readable outputs enabled")
+
+
+def loadRun(source: str):
+    """
+    (courses, faculty) frames from a machine-output file/stem, or from
+    "<history.sqlite>#<run_id>".
+    """
+    if "#" in source and source.split("#", 1)[0].endswith((".sqlite", ".db")):
+        db, run_id = source.split("#", 1)
+        con = sqlite3.connect(f"file:{db}?mode=ro", uri=True)
+        try:
+            courses = pd.read_sql_query("SELECT * FROM courses WHERE run_id = ?", con, params=(run_id,))
+            faculty = pd.read_sql_query("SELECT * FROM faculty WHERE run_id = ?", con, params=(run_id,))
+        finally:
+            con.close()
+        if courses.empty and faculty.empty:
+            raise KeyError(f"No run '{run_id}' in {db}")
+        return courses, faculty
+    stem = _stem(source)
+    return _readTable(stem, "courses"), _readTable(stem, "faculty")
+
+
+def _keyed(courses: pd.DataFrame) -> pd.DataFrame:
+    df = courses.copy()
+    df["term"] = df["term"].astype(str)
+    df["emplid"] = df["emplid"].astype("int64")
+    # the same key twice in one run (e.g. two roles) pairs up by occurrence
+    df["occurrence"] = df.groupby(COURSE_KEY).cumcount()
+    return df
+
+
+def _linkedCauses(merged: pd.DataFrame, changed_fields: pd.Series) -> pd.Series:
+    """
+    Per row, what changed in the team-taught group / co-convened bundle it
+    belongs to in either run: other sections' field changes, or sections
+    added to or removed from it. "" where nothing did.
+    """
+    course = merged["course_key"]
+    side = merged["_merge"]
+    contributed = pd.Series(np.select(
+        [side == "left_only", side == "right_only", changed_fields != ""],
+        [course + " removed", course + " added", changed_fields + " of " + course], default=""),
+        index=merged.index)
+    has = contributed != ""
+
+    parts = []
+    for flag, key in LINKS:
+        for suffix in ("_old", "_new"):
+            if f"{key}{suffix}" not in merged or f"{flag}{suffix}" not in merged:
+                continue
+            keys = merged[f"{key}{suffix}"].where(merged[f"{flag}{suffix}"].fillna(0).astype(bool))
+            texts = contributed[has & keys.notna()].groupby(keys[has & keys.notna()]).agg("; ".join)
+            parts.append(keys.map(texts))
+    if not parts:
+        return pd.Series("", index=merged.index)
+    # one row's causes from every link, each named once
+    found = pd.concat(parts, axis=1)
+    found = found[found.notna().any(axis=1)]
+    if found.empty:
+        return pd.Series("", index=merged.index)
+    joined = found.apply(lambda r: "; ".join(dict.fromkeys(t for v in r.dropna() for t in v.split("; "))), axis=1)
+    return joined.reindex(merged.index, fill_value="")
+
+
+def diffCourses(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    keys = COURSE_KEY + ["occurrence"]
+    merged = _keyed(old).merge(_keyed(new), on=keys, how="outer", suffixes=("_old", "_new"), indicator=True)
+
+    changed_fields = pd.Series("", index=merged.index)
+    both = merged["_merge"] == "both"
+    for field, label in CAUSE_FIELDS.items():
+        a, b = f"{field}_old", f"{field}_new"
+        if a not in merged or b not in merged:
+            continue
+        moved = both & (merged[a].astype(float) - merged[b].astype(float)).abs().gt(1e-9)
+        changed_fields = changed_fields.where(~moved, changed_fields + ", " + label)
+    changed_fields = changed_fields.str.lstrip(", ")
+
+    linked = _linkedCauses(merged, changed_fields)
+    if "policy_hash_old" in merged and "policy_hash_new" in merged:
+        policy_moved = merged["policy_hash_old"].notna() & merged["policy_hash_new"].notna() \
+            & (merged["policy_hash_old"] != merged["policy_hash_new"])
+    else:
+        policy_moved = pd.Series(False, index=merged.index)
+    causes = changed_fields.where(changed_fields != "", linked)
+    causes = causes.where(causes != "", pd.Series(np.where(policy_moved, "policy / rules", "unexplained"),
+                                                  index=merged.index))
+
+    old_load = merged["final_load_old"].fillna(0.0)
+    new_load = merged["final_load_new"].fillna(0.0)
+    status = np.select(
+        [merged["_merge"] == "left_only", merged["_merge"] == "right_only",
+         ((new_load - old_load).abs() >= LOAD_TOLERANCE) | (changed_fields != "")],
+        ["removed", "added", "changed"], default="unchanged",
+    )
+
+    out = pd.DataFrame({
+        "Status": status,
+        "Emplid": merged["emplid"],
+        "Term": merged["term"],
+        "Course": merged["course_key"],
+        "Unit": merged["unit_new"].fillna(merged["unit_old"]) if "unit_new" in merged else "",
+        "Old Load": merged["final_load_old"].round(2),
+        "New Load": merged["final_load_new"].round(2),
+        "Delta": (new_load - old_load).round(2),
+        "Changed Fields": np.where(status == "changed", causes, ""),
+    })
+    for field in ("enroll_total", "max_units", "divisor"):
+        if f"{field}_old" in merged:
+            label = CAUSE_FIELDS[field].title()
+            out[f"Old {label}"] = merged[f"{field}_old"]
+            out[f"New {label}"] = merged[f"{field}_new"]
+    out = out[out["Status"] != "unchanged"]
+    return out.sort_values(["Emplid", "Term", "Course"]).reset_index(drop=True)
+
+
+def diffFaculty(old: pd.DataFrame, new: pd.DataFrame, course_diff: pd.DataFrame) -> pd.DataFrame:
+    merged = old.merge(new, on="emplid", how="outer", suffixes=("_old", "_new"), indicator=True)
+    old_total = merged["total_load_old"].fillna(0.0)
+    new_total = merged["total_load_new"].fillna(0.0)
+    sections = course_diff.groupby("Emplid").size()
+
+    out = pd.DataFrame({
+        "Emplid": merged["emplid"],
+        "Instructor": merged["instructor_new"].fillna(merged["instructor_old"]),
+        "Track": merged["track_new"].fillna(merged["track_old"]),
+        "Status": merged["_merge"].map({"left_only": "removed", "right_only": "added", "both": "changed"}).astype(str),
+        "Old Load": merged["total_load_old"].round(2),
+        "New Load": merged["total_load_new"].round(2),
+        "Delta": (new_total - old_total).round(2),
+        "Sections Changed": merged["emplid"].map(sections).fillna(0).astype(int),
+    })
+    keep = (out["Status"] != "changed") | (out["Delta"].abs() >= LOAD_TOLERANCE) | (out["Sections Changed"] > 0)
+    out = out[keep]
+    return out.reindex(out["Delta"].abs().sort_values(ascending=False).index).reset_index(drop=True)
+
+
+def diffRuns(old_source: str, new_source: str):
+    """(faculty_diff, course_diff) between two runs."""
+    old_courses, old_faculty = loadRun(old_source)
+    new_courses, new_faculty = loadRun(new_source)
+    courses = diffCourses(old_courses, new_courses)
+    return diffFaculty(old_faculty, new_faculty, courses), courses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two Lumberjack Balancing runs.")
+    parser.add_argument("old", help="old run: <base>_courses.parquet/.jsonl or history.sqlite#<run_id>")
+    parser.add_argument("new", help="new run, same forms")
+    parser.add_argument("-o", "--output", help="write 'Faculty Changes' and 'Section Changes' sheets to this xlsx")
+    args = parser.parse_args(argv)
+
+    faculty, courses = diffRuns(args.old, args.new)
+    if args.output:
+        with pd.ExcelWriter(args.output, engine="openpyxl") as writer:
+            faculty.to_excel(writer, sheet_name="Faculty Changes", index=False)
+            courses.to_excel(writer, sheet_name="Section Changes", index=False)
+        print(f"Diff written to '{args.output}'.")
+    else:
+        print(faculty.to_string(index=False) if not faculty.empty else "No faculty load changes.")
+        print()
+        print(courses.to_string(index=False) if not courses.empty else "No section changes.")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+from collections import defaultdict
+
+import pandas as pd
+
+from incremental import IncrementalModel
+
+# ---------------------------------------------------------------------------
+# What-if scenarios
+#
+# A Scenario wraps the computed faculty / course objects of one run and lets
+# a caller move sections between instructors or change Enroll Total in memory.
+# Each edit only touches its neighbourhood: the team-taught group and
+# co-convened bundles the edited rows belong to (before and after the edit)
+# are re-detected and re-priced, and only the faculty carrying those rows
+# have their totals adjusted by the difference. Edits are kept on an
+# undo/redo stack and the baseline is remembered for diffs.
+# ---------------------------------------------------------------------------
+
+class Scenario(IncrementalModel):
+    def __init__(self, faculty: dict, courses: list):
+        super().__init__(faculty, courses)
+        # place of each row in the run's course order; a move never changes it
+        self.position = {cid: i for i, cid in enumerate(self.courseById)}
+        self.byKey = defaultdict(list)
+        for c in self.courseById.values():
+            self.byKey[c.courseKey()].append(c)
+
+        self.baselineTotals = {e: fac.totalLoad for e, fac in faculty.items()}
+        self.baselineCourses = self.carried(self.courseById.values())
+        self.undoStack = []
+        self.redoStack = []
+
+    # ------------------------------------------------------------------
+    # lookups
+    # ------------------------------------------------------------------
+    def find(self, courseKey: str, emplid=None) -> list:
+        """Rows for e.g. "ENG 105-003", optionally only those taught by one instructor."""
+        rows = self.byKey.get(courseKey.strip(), [])
+        if emplid is not None:
+            rows = [c for c in rows if c.instructorEmplid == int(emplid)]
+        if not rows:
+            who = f" for instructor {emplid}" if emplid is not None else ""
+            raise KeyError(f"No section '{courseKey}'{who} in this run")
+        return rows
+
+    # ------------------------------------------------------------------
+    # edits
+    # ------------------------------------------------------------------
+    def moveSection(self, courseKey: str, fromEmplid, toEmplid) -> None:
+        """Reassigns fromEmplid's rows of a section to toEmplid."""
+        toEmplid = int(toEmplid)
+        if toEmplid not in self.faculty:
+            raise KeyError(f"Emplid {toEmplid} is not a tracked instructor")
+        dst = self.faculty[toEmplid]
+        changes = []
+        for c in self.find(courseKey, fromEmplid):
+            if c.getGroupKeyForGrouping() in dst.courses:
+                raise ValueError(f"{dst.name} already teaches {courseKey}")
+            raw = dict(c.rawData)
+            raw.update({"Instructor": dst.name, "Instructor Email": dst.email, "Instructor Emplid": toEmplid})
+            changes.append((c, {"rawData": c.rawData, "instructorEmplid": c.instructorEmplid},
+                               {"rawData": raw, "instructorEmplid": toEmplid}))
+        self._do(f"Move {courseKey} from {fromEmplid} to {toEmplid}", changes)
+
+    def setEnrollment(self, courseKey: str, enroll: int, emplid=None) -> None:
+        """
+        Changes Enroll Total of every row of a section (all team-taught shares
+        by default). Loads are priced from Enroll Total only – Enroll Cap plays
+        no part – so this is the edit for a different head count.
+        """
+        enroll = int(enroll)
+        if enroll < 0:
+            raise ValueError("Enrollment cannot be negative")
+        changes = [
+            (c, {"enrollTotal": c.enrollTotal}, {"enrollTotal": enroll})
+            for c in self.find(courseKey, emplid)
+        ]
+        self._do(f"Set {courseKey} Enroll Total to {enroll}", changes)
+
+    def undo(self) -> str | None:
+        if not self.undoStack:
+            return None
+        label, changes = self.undoStack.pop()
+        self._apply([(c, before) for c, before, _ in changes])
+        self.redoStack.append((label, changes))
+        return label
+
+    def redo(self) -> str | None:
+        if not self.redoStack:
+            return None
+        label, changes = self.redoStack.pop()
+        self._apply([(c, after) for c, _, after in changes])
+        self.undoStack.append((label, changes))
+        return label
+
+    def history(self) -> list:
+        return [label for label, _ in self.undoStack]
+
+    def _do(self, label, changes):
+        self._apply([(c, after) for c, _, after in changes])
+        self.undoStack.append((label, changes))
+        self.redoStack.clear()
+
+    # ------------------------------------------------------------------
+    # incremental update
+    # ------------------------------------------------------------------
+    def _apply(self, assignments):
+        seeds = [c for c, _ in assignments]
+        group = self.neighbourhood(seeds)
+        old = self.carried(group)
+
+        for c, attrs in assignments:
+            self._set(c, attrs)
+
+        for c in self.neighbourhood(seeds):
+            if id(c) not in old:
+                old.update(self.carried([c]))
+                group.append(c)
+
+        # detection sees the rows in run order, so the same section is the
+        # co-convened representative as in a full run
+        order = lambda c: self.position[id(c)]
+        for key in {c.getGroupKeyForGrouping() for c in group}:
+            self.teams[key].sort(key=order)
+        group.sort(key=order)
+        self.recompute(group, old)
+
+    def _set(self, course, attrs):
+        emplid = attrs.get("instructorEmplid", course.instructorEmplid)
+        moved = emplid != course.instructorEmplid
+        if moved:
+            self.faculty[course.instructorEmplid].courses.pop(course.getGroupKeyForGrouping(), None)
+            self._unindex(course)
+        for name, value in attrs.items():
+            setattr(course, name, value)
+        if moved:
+            self.faculty[emplid].addCourse(course)
+            self._index(course)
+
+    # ------------------------------------------------------------------
+    # diffs against the baseline run
+    # ------------------------------------------------------------------
+    def facultyDiff(self) -> pd.DataFrame:
+        rows = []
+        for e, fac in self.faculty.items():
+            before = self.baselineTotals.get(e, 0.0)
+            if abs(fac.totalLoad - before) >= 0.005:
+                rows.append({
+                    "Instructor": fac.name,
+                    "Emplid": e,
+                    "Track": fac.track or "Unknown",
+                    "Baseline Load": round(before, 2),
+                    "Scenario Load": round(fac.totalLoad, 2),
+                    "Change": round(fac.totalLoad - before, 2),
+                })
+        return pd.DataFrame(rows, columns=["Instructor", "Emplid", "Track", "Baseline Load", "Scenario Load", "Change"])
+
+    def courseDiff(self) -> pd.DataFrame:
+        rows = []
+        for c in self.courseById.values():
+            emplid, load = self.baselineCourses[id(c)]
+            if emplid != c.instructorEmplid or abs((c.load or 0.0) - load) >= 0.005:
+                rows.append({
+                    "Course": c.courseKey(),
+                    "Baseline Emplid": emplid,
+                    "Scenario Emplid": c.instructorEmplid,
+                    "Baseline Load": round(load, 2),
+                    "Scenario Load": round(c.load or 0.0, 2),
+                })
+        return pd.DataFrame(rows, columns=["Course", "Baseline Emplid", "Scenario Emplid", "Baseline Load", "Scenario Load"])
@@ -0,0 +1,252 @@
+import re
+import heapq
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------------------------
+# Meeting intervals
+#
+# Each raw row meets on one or more weekdays between Start Time and End Time,
+# for the dates Start Date .. End Date. meetingTable() explodes the rows into
+# one interval per weekday (minutes after midnight); overlaps() then finds
+# every overlapping pair inside a bucket (instructor + day, room + day, ...)
+# with one sorted sweep and a heap of the intervals still open, so the cost is
+# O(n log n) plus the number of overlaps reported – never all pairs.
+# ---------------------------------------------------------------------------
+
+_DAY_PATTERN = re.compile(r"Th|Sa|Su|M|T|W|R|F|S|U")
+
+DAY_NAMES = {
+    "M": "Mon", "T": "Tue", "W": "Wed", "Th": "Thu", "R": "Thu",
+    "F": "Fri", "S": "Sat", "Sa": "Sat", "Su": "Sun", "U": "Sun",
+}
+
+DAY_ORDER = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+MEETING_COLUMNS = ["Start Date", "End Date", "Start Time", "End Time", "Days"]
+
+
+@lru_cache(maxsize=None)
+def parseDays(text: str) -> tuple:
+    """'MWF' -> ('Mon', 'Wed', 'Fri'); 'TTh' -> ('Tue', 'Thu')."""
+    return tuple(dict.fromkeys(DAY_NAMES[t] for t in _DAY_PATTERN.findall(str(text).strip())))
+
+
+def _minutes(times: pd.Series) -> np.ndarray:
+    return (times.dt.hour * 60 + times.dt.minute).to_numpy(dtype=float)
+
+
+def meetingTable(raw_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per (raw row, weekday) for rows with a complete meeting pattern.
+    'row' is the raw_df index; start/end are minutes after midnight.
+    """
+    df = raw_df.dropna(subset=MEETING_COLUMNS)
+    df = df[_minutes(df["End Time"]) > _minutes(df["Start Time"])]
+    days = df["Days"].astype(str).map(parseDays)
+    counts = days.map(len).to_numpy()
+    idx = np.repeat(df.index.to_numpy(), counts)
+    return pd.DataFrame({
+        "row": idx,
+        "Day": [d for ds in days for d in ds],
+        "start": np.repeat(_minutes(df["Start Time"]), counts),
+        "end": np.repeat(_minutes(df["End Time"]), counts),
+        "startDate": np.repeat(df["Start Date"].to_numpy(), counts),
+        "endDate": np.repeat(df["End Date"].to_numpy(), counts),
+    })
+
+
+def overlaps(meetings: pd.DataFrame, bucket: list, coverage: dict | None = None):
+    """
+    Yields (i, j) positional pairs of meetings in the same bucket whose times
+    and date ranges overlap. One pass over the meetings sorted by bucket and
+    start time; the heap holds the intervals of the current bucket still open.
+    If coverage is given it is filled, in the same pass, with the minutes of
+    each bucket covered by at least one meeting.
+    """
+    if meetings.empty:
+        return
+    order = meetings.sort_values(bucket + ["start"], kind="mergesort").index
+    pos = meetings.index.get_indexer(order)
+    keys = list(zip(*(meetings[c].to_numpy()[pos] for c in bucket)))
+    start = meetings["start"].to_numpy()[pos]
+    end = meetings["end"].to_numpy()[pos]
+    d0 = meetings["startDate"].to_numpy()[pos]
+    d1 = meetings["endDate"].to_numpy()[pos]
+
+    active, reach = [], 0.0
+    for k in range(len(pos)):
+        if k and keys[k] != keys[k - 1]:
+            active, reach = [], 0.0
+        if coverage is not None:
+            coverage[keys[k]] = coverage.get(keys[k], 0.0) + max(0.0, end[k] - max(start[k], reach))
+            reach = max(reach, end[k])
+        while active and active[0][0] <= start[k]:
+            heapq.heappop(active)
+        for _, other in active:
+            if d0[other] <= d1[k] and d0[k] <= d1[other]:
+                yield pos[other], pos[k]
+        heapq.heappush(active, (end[k], k))
+
+# ---------------------------------------------------------------------------
+# Instructor conflicts
+# ---------------------------------------------------------------------------
+
+CONFLICT_COLUMNS = [
+    "Instructor", "Emplid", "Term", "Day", "Course", "Time",
+    "Conflicts With", "Other Time", "Overlap (min)",
+]
+
+
+def _courseLabel(row) -> str:
+    return f"{str(row.get('Subject', '')).strip()} {str(row.get('Cat Nbr', '')).strip()}-{str(row.get('Section', '')).strip()}"
+
+
+def _clock(minutes: float) -> str:
+    return f"{int(minutes) // 60:02d}:{int(minutes) % 60:02d}"
+
+
+def _meetingSignatures(raw: pd.DataFrame) -> dict:
+    return raw[MEETING_COLUMNS].astype(str).agg("|".join, axis=1).to_dict()
+
+
+def findInstructorConflicts(raw_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Meetings where one instructor is booked in two places at once. Rows with
+    an identical meeting pattern (same dates, times and days) are treated as
+    co-convened / cross-listed and not reported, nor are two rows of the same
+    class number.
+    """
+    raw = raw_df.dropna(subset=["Instructor Emplid"])
+    meetings = meetingTable(raw)
+    meetings["Emplid"] = raw.loc[meetings["row"], "Instructor Emplid"].to_numpy()
+
+    signature = _meetingSignatures(raw)
+    records = raw.to_dict("index")
+    mrows = meetings.to_dict("records")
+    rows = []
+    for i, j in overlaps(meetings, ["Emplid", "Day"]):
+        a, b = mrows[i], mrows[j]
+        ra, rb = records[a["row"]], records[b["row"]]
+        if signature[a["row"]] == signature[b["row"]] or ra.get("Class Nbr") == rb.get("Class Nbr"):
+            continue
+        rows.append({
+            "Instructor": ra.get("Instructor"),
+            "Emplid": a["Emplid"],
+            "Term": ra.get("Term"),
+            "Day": a["Day"],
+            "Course": _courseLabel(ra),
+            "Time": f"{_clock(a['start'])}-{_clock(a['end'])}",
+            "Conflicts With": _courseLabel(rb),
+            "Other Time": f"{_clock(b['start'])}-{_clock(b['end'])}",
+            "Overlap (min)": int(min(a["end"], b["end"]) - max(a["start"], b["start"])),
+        })
+
+    # the same section can appear once per instructor role; report each clash once
+    conflicts = pd.DataFrame(rows, columns=CONFLICT_COLUMNS).drop_duplicates(
+        subset=["Emplid", "Day", "Course", "Conflicts With"])
+    if not conflicts.empty:
+        conflicts["Day"] = pd.Categorical(conflicts["Day"], categories=DAY_ORDER, ordered=True)
+        conflicts = conflicts.sort_values(["Instructor", "Day", "Time"]).reset_index(drop=True)
+    return conflicts
+
+# ---------------------------------------------------------------------------
+# Room occupancy
+# ---------------------------------------------------------------------------
+
+# utilization is measured against a teaching week of 08:00-22:00, Mon-Fri
+TEACHING_DAY_MINUTES = (22 - 8) * 60
+TEACHING_DAYS = 5
+
+DOUBLE_BOOKING_COLUMNS = [
+    "Term", "Building", "Room", "Day", "Course", "Time", "Instructor",
+    "Other Course", "Other Time", "Other Instructor", "Overlap (min)",
+]
+
+UTILIZATION_COLUMNS = [
+    "Term", "Building", "Room", "Sections", "Hours Per Week", "Utilization %", "Double Bookings",
+]
+
+
+@lru_cache(maxsize=None)
+def _roomText(value: str) -> str:
+    return " ".join(value.split()).lower()
+
+
+def roomKey(building, room):
+    """Normalized (building, room) – the bucket key of the occupancy index, None when unknown."""
+    if pd.isna(building) or pd.isna(room) or not str(building).strip() or not str(room).strip():
+        return None
+    return (_roomText(str(building)), _roomText(str(room)))
+
+
+def roomOccupancy(raw_df: pd.DataFrame):
+    """
+    Buckets meetings by term, building, room and day and sweeps each bucket
+    once. Returns (double_bookings, utilization): pairs of different sections
+    in the same room at the same time, and booked hours per room per week.
+    Sections with an identical meeting pattern in the same room are the
+    co-convened / cross-listed case and are not double bookings.
+    """
+    raw = raw_df.dropna(subset=["Facility Building", "Facility Room"])
+    meetings = meetingTable(raw)
+    keys = [roomKey(b, r) for b, r in zip(raw["Facility Building"], raw["Facility Room"])]
+    room = dict(zip(raw.index, keys))
+    meetings["Term"] = raw.loc[meetings["row"], "Term"].to_numpy()
+    meetings["Class Nbr"] = raw.loc[meetings["row"], "Class Nbr"].to_numpy()
+    meetings["Room"] = [room[r] for r in meetings["row"]]
+    meetings = meetings[meetings["Room"].notna()].reset_index(drop=True)
+
+    signature = _meetingSignatures(raw)
+    records = raw.to_dict("index")
+    mrows = meetings.to_dict("records")
+    coverage = {}
+    rows = []
+    for i, j in overlaps(meetings, ["Term", "Room", "Day"], coverage):
+        a, b = mrows[i], mrows[j]
+        ra, rb = records[a["row"]], records[b["row"]]
+        if signature[a["row"]] == signature[b["row"]] or ra.get("Class Nbr") == rb.get("Class Nbr"):
+            continue
+        rows.append({
+            "Term": ra.get("Term"),
+            "Building": ra.get("Facility Building"),
+            "Room": ra.get("Facility Room"),
+            "Day": a["Day"],
+            "Course": _courseLabel(ra),
+            "Time": f"{_clock(a['start'])}-{_clock(a['end'])}",
+            "Instructor": ra.get("Instructor"),
+            "Other Course": _courseLabel(rb),
+            "Other Time": f"{_clock(b['start'])}-{_clock(b['end'])}",
+            "Other Instructor": rb.get("Instructor"),
+            "Overlap (min)": int(min(a["end"], b["end"]) - max(a["start"], b["start"])),
+        })
+
+    # several instructors of one section give several raw rows; one clash per pair of sections
+    double = pd.DataFrame(rows, columns=DOUBLE_BOOKING_COLUMNS).drop_duplicates(
+        subset=["Term", "Building", "Room", "Day", "Course", "Other Course"]).reset_index(drop=True)
+
+    booked = defaultdict(float)
+    for (term, key, _), minutes in coverage.items():
+        booked[(term, key)] += minutes
+    sections = meetings.groupby(["Term", "Room"])["Class Nbr"].nunique()
+    clashes = Counter(zip(double["Term"], [roomKey(b, r) for b, r in zip(double["Building"], double["Room"])]))
+    first = {}
+    for r, key in room.items():
+        if key is not None:
+            first.setdefault((records[r].get("Term"), key), records[r])
+    utilization = pd.DataFrame([
+        {
+            "Term": term,
+            "Building": first[(term, key)].get("Facility Building"),
+            "Room": first[(term, key)].get("Facility Room"),
+            "Sections": int(sections.get((term, key), 0)),
+            "Hours Per Week": round(minutes / 60, 2),
+            "Utilization %": round(100 * minutes / (TEACHING_DAY_MINUTES * TEACHING_DAYS), 1),
+            "Double Bookings": clashes.get((term, key), 0),
+        }
+        for (term, key), minutes in sorted(booked.items(), key=lambda kv: (str(kv[0][0]), kv[0][1]))
+    ], columns=UTILIZATION_COLUMNS)
+    return double, utilization
@@ -0,0 +1,143 @@
+import os
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------------------------
+# Input formats
+# ---------------------------------------------------------------------------
+
+RAW_SHEET = "Raw Data"
+
+FORMATS = {
+    ".xlsx": "excel", ".xlsm": "excel", ".xls": "excel",
+    ".csv": "csv", ".txt": "csv",
+    ".parquet": "parquet", ".pq": "parquet",
+    ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow", ".arrows": "arrow",
+}
+
+FILE_FILTER = "Data Files (*.xlsx *.xls *.csv *.parquet *.arrow *.feather);;All Files (*)"
+
+def detectFormat(path: str) -> str:
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Unsupported file type '{ext}' – expected one of {', '.join(sorted(FORMATS))}")
+    return FORMATS[ext]
+
+
+def _readExcel(path, sheet_name, columns, text):
+    usecols = (lambda c: c in columns) if columns else None
+    return pd.read_excel(path, sheet_name=sheet_name, usecols=usecols, dtype=text or None)
+
+
+def _readCsv(path, columns, text):
+    if columns:
+        header = pd.read_csv(path, nrows=0).columns
+        columns = [c for c in header if c in columns]
+    try:
+        import pyarrow as pa
+        from pyarrow import csv as pacsv
+    except ImportError:
+        # pyarrow not installed – the C engine reads the same file, just slower
+        return pd.read_csv(path, usecols=columns, dtype=text or None, low_memory=False)
+    # column types are fixed up front (pandas' pyarrow engine only casts after
+    # inference, which turns "001" into "1.0")
+    options = pacsv.ConvertOptions(
+        include_columns=columns,
+        column_types={c: pa.string() for c in (text or {}) if columns is None or c in columns},
+        strings_can_be_null=True,
+    )
+    return pacsv.read_csv(path, convert_options=options).to_pandas()
+
+
+def _readParquet(path, columns):
+    if columns:
+        import pyarrow.parquet as pq
+        names = pq.read_schema(path).names
+        columns = [c for c in names if c in columns]
+    return pd.read_parquet(path, columns=columns)
+
+
+def _readArrow(path, columns):
+    import pyarrow as pa
+    try:
+        with pa.memory_map(str(path), "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+    except pa.ArrowInvalid:
+        # streaming IPC format (.arrows) has no footer
+        with pa.memory_map(str(path), "r") as source:
+            table = pa.ipc.open_stream(source).read_all()
+    if columns:
+        table = table.select([c for c in table.column_names if c in columns])
+    return table.to_pandas()
+
+# ---------------------------------------------------------------------------
+# Schema
+#
+# A schema maps column name -> one of "Int64", "Float64", "category", "text",
+# "datetime" or "code" (an identifier such as a term code: Int64 when every
+# value is a whole number, otherwise text, so "Fall 2024" or "1247A" is kept
+# rather than coerced to <NA>). Only the listed columns are read (projection at read time) and
+# each is converted once, column-wise, so nothing downstream re-parses values
+# row by row.
+# ---------------------------------------------------------------------------
+
+def _asText(s: pd.Series) -> pd.Series:
+    if not pd.api.types.is_numeric_dtype(s) or pd.api.types.is_bool_dtype(s):
+        return s
+    # numeric column from parquet/arrow (or an all-number csv column): 100.0 -> "100"
+    num = s.astype("Float64")
+    if (num.dropna() % 1 == 0).all():
+        num = num.astype("Int64")
+    return num.astype("string").astype(object).where(s.notna(), np.nan)
+
+
+def _asCode(s: pd.Series) -> pd.Series:
+    num = pd.to_numeric(s, errors="coerce")
+    present = s.notna()
+    if num[present].notna().all() and (num[present] % 1 == 0).all():
+        return num.astype("Float64").astype("Int64")
+    # mixed column: whole numbers ("1251.0", 1251) read the same as in an all-number column
+    whole = num.notna() & (num % 1 == 0)
+    text = s.astype(object).where(~present, s.astype(str).str.strip())
+    return text.where(~whole, num.where(whole).astype("Float64").astype("Int64").astype(str)).astype(object)
+
+
+def applySchema(df: pd.DataFrame, schema: dict) -> pd.DataFrame:
+    for col, kind in schema.items():
+        if col not in df.columns:
+            continue
+        s = df[col]
+        if kind == "Int64":
+            df[col] = np.trunc(pd.to_numeric(s, errors="coerce").astype("Float64")).astype("Int64")
+        elif kind == "Float64":
+            df[col] = pd.to_numeric(s, errors="coerce").astype("Float64")
+        elif kind == "category":
+            df[col] = s.astype("category")
+        elif kind == "text":
+            df[col] = _asText(s)
+        elif kind == "code":
+            df[col] = _asCode(s)
+        elif kind == "datetime" and not pd.api.types.is_datetime64_any_dtype(s):
+            if s.map(lambda v: isinstance(v, str)).any():
+                df[col] = pd.to_datetime(s, errors="coerce", format="mixed")
+    return df
+
+
+def readTable(path: str, sheet_name=0, schema: dict | None = None) -> pd.DataFrame:
+    """
+    Reads one table from xlsx, csv, parquet or arrow ipc depending on the file
+    extension. With a schema only its columns are loaded, with its dtypes.
+    """
+    fmt = detectFormat(path)
+    columns = list(schema) if schema else None
+    # text/category columns are read as str so "001" sections survive csv/xlsx
+    text = {c: str for c, kind in (schema or {}).items() if kind in ("text", "category")}
+    if fmt == "excel":
+        df = _readExcel(path, sheet_name, columns, text)
+    elif fmt == "csv":
+        df = _readCsv(path, columns, text)
+    elif fmt == "parquet":
+        df = _readParquet(path, columns)
+    else:
+        df = _readArrow(path, columns)
+    return applySchema(df, schema) if schema else df
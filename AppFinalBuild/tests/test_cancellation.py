@@ -0,0 +1,70 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, HERE)
+
+from cancellation import CancelToken, Cancelled, snapshotOutputs, restoreOutputs, discardSnapshot
+from excel_processor import WorkloadJob
+
+SAMPLE = os.path.join(HERE, "FIle 1 choke a goat.xlsx")
+
+
+def write(path, text):
+    with open(path, "wb") as fh:
+        fh.write(text.encode("utf-8"))
+
+
+def read(path):
+    with open(path, "rb") as fh:
+        return fh.read().decode("utf-8", errors="replace")
+
+
+class OutputSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.kept = os.path.join(self.folder, "raw_summary.xlsx")
+        self.new = os.path.join(self.folder, "faculty_by_unit.html")
+        write(self.kept, "previous report")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_restore_puts_back_overwritten_and_removes_new_files(self):
+        snapshot = snapshotOutputs([self.kept, self.new])
+        write(self.kept, "half written")
+        write(self.new, "half written")
+        self.assertEqual(sorted(restoreOutputs(snapshot)), sorted([self.kept, self.new]))
+        self.assertEqual(read(self.kept), "previous report")
+        self.assertFalse(os.path.exists(self.new))
+
+    def test_discard_keeps_the_run_outputs(self):
+        snapshot = snapshotOutputs([self.kept, self.new])
+        copies = [c for c in snapshot.values() if c is not None]
+        write(self.kept, "new report")
+        discardSnapshot(snapshot)
+        self.assertEqual(read(self.kept), "new report")
+        self.assertFalse(any(os.path.exists(c) for c in copies))
+
+    def test_cancel_after_the_summary_was_rewritten(self):
+        raw = shutil.copy(SAMPLE, os.path.join(self.folder, "raw.xlsx"))
+        job = WorkloadJob(raw, os.path.join(HERE, "workload_policy.xlsx"), os.path.join(HERE, "Instructor Track.xlsx"),
+                          os.path.join(HERE, "CEFNS courses with extra load assigned.xlsx"), output_mode="html")
+        cancel = CancelToken()
+        # 75% is reported once the summary workbook has been written over
+        def progress(pct):
+            if pct >= 75:
+                self.assertNotEqual(read(self.kept), "previous report")
+                cancel.cancel()
+
+        with self.assertRaises(Cancelled):
+            job.run(progress, cancel)
+        self.assertEqual(read(self.kept), "previous report")
+        self.assertFalse(os.path.exists(self.new))
+
+
+if __name__ == "__main__":
+    unittest.main()
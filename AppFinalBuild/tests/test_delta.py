@@ -0,0 +1,106 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, HERE)
+
+from algorithmPolicy import RAW_SCHEMA, SIGNATURE_COLUMN, dedupeRawRows, loadWorkloadPolicy, loadInstructorTrack, loadSpecialCourses
+from table_reader import readTable, RAW_SHEET
+from workloads import compute_workloads
+
+SAMPLE = os.path.join(HERE, "FIle 1 choke a goat.xlsx")
+
+
+class DeltaRunTest(unittest.TestCase):
+    """An incremental run must give exactly what a full run of the same export gives."""
+
+    @classmethod
+    def setUpClass(cls):
+        # the export's own repeated rows are dropped up front: dropping the first
+        # copy later would move the row to where its next copy sits (a reorder)
+        raw = readTable(SAMPLE, sheet_name=RAW_SHEET, schema=RAW_SCHEMA)
+        cls.raw = dedupeRawRows(raw)[0].drop(columns=SIGNATURE_COLUMN)
+        cls.policy = loadWorkloadPolicy(os.path.join(HERE, "workload_policy.xlsx"))
+        cls.tracks = loadInstructorTrack(os.path.join(HERE, "Instructor Track.xlsx"))
+        cls.special = loadSpecialCourses(os.path.join(HERE, "CEFNS courses with extra load assigned.xlsx"))
+
+    def run_workloads(self, raw, previous_state=None):
+        return compute_workloads(raw, self.policy, self.tracks, self.special, previous_state=previous_state)
+
+    def assertSameResult(self, delta, full):
+        pd.testing.assert_frame_equal(delta.summary, full.summary)
+        pd.testing.assert_frame_equal(delta.courseTable, full.courseTable)
+        self.assertEqual([c.rowSignature for c in delta.courses], [c.rowSignature for c in full.courses])
+
+    def edit(self, raw, rng, reorder=False):
+        """Changed enrollments, dropped rows, exact copies, rows re-assigned or added for another instructor."""
+        raw = raw.copy()
+        n = len(raw)
+        rows = rng.choice(n, 12, replace=False)
+        raw.loc[rows[:4], "Enroll Total"] = rng.integers(0, 250, 4)
+        emplids = raw["Instructor Emplid"].dropna().unique()
+        raw.loc[rows[4:6], "Instructor Emplid"] = rng.choice(emplids, 2)
+        partners = raw.loc[rows[6:9]].assign(**{"Instructor Emplid": rng.choice(emplids, 3)})
+        copies = raw.loc[rows[9:11]]
+        raw = raw.drop(index=rng.choice(np.setdiff1d(np.arange(n), rows[9:11]), 5, replace=False))
+        # new rows land anywhere in the export, not just at the end; a copy
+        # after its original (one ahead of it would move the row, see below)
+        starts = [0] * len(partners) + [raw.index.get_loc(i) + 1 for i in copies.index]
+        at = [int(rng.integers(lo, len(raw) + 1)) for lo in starts]
+        extra = pd.concat([partners, copies])
+        parts, start = [], 0
+        for pos, i in sorted(zip(at, range(len(extra)))):
+            parts += [raw.iloc[start:pos], extra.iloc[[i]]]
+            start = pos
+        raw = pd.concat(parts + [raw.iloc[start:]], ignore_index=True)
+        if reorder:
+            raw = raw.sample(frac=1, random_state=int(rng.integers(1 << 31))).reset_index(drop=True)
+        return raw
+
+    def test_delta_runs_match_full_runs(self):
+        rng = np.random.default_rng(2024)
+        raw = self.raw
+        state = self.run_workloads(raw).state
+        for i in range(9):
+            with self.subTest(run=i):
+                reorder = i % 3 == 2
+                raw = self.edit(raw, rng, reorder=reorder)
+                delta = self.run_workloads(raw, previous_state=state)
+                # a reordered export is run in full; anything else is patched
+                self.assertEqual(delta.delta is None, reorder)
+                self.assertSameResult(delta, self.run_workloads(raw))
+                state = delta.state
+                raw = dedupeRawRows(raw)[0].drop(columns=SIGNATURE_COLUMN)
+
+    def test_reordered_export(self):
+        state = self.run_workloads(self.raw).state
+        raw = self.raw.sample(frac=1, random_state=3).reset_index(drop=True)
+        delta = self.run_workloads(raw, previous_state=state)
+        self.assertIsNone(delta.delta)
+        self.assertSameResult(delta, self.run_workloads(raw))
+
+    def test_copy_ahead_of_its_original(self):
+        state = self.run_workloads(self.raw).state
+        # the copy is the row that is kept, so the row has moved up the export
+        raw = pd.concat([self.raw.iloc[:10], self.raw.iloc[[2000]], self.raw.iloc[10:]], ignore_index=True)
+        delta = self.run_workloads(raw, previous_state=state)
+        self.assertIsNone(delta.delta)
+        self.assertSameResult(delta, self.run_workloads(raw))
+
+    def test_previous_state_is_consumed(self):
+        first = self.run_workloads(self.raw)
+        raw = self.edit(self.raw, np.random.default_rng(5))
+        second = self.run_workloads(raw, previous_state=first.state)
+        self.assertIsNotNone(second.delta)
+        # the same state again cannot be patched a second time; it falls back to a full run
+        again = self.run_workloads(self.raw, previous_state=first.state)
+        self.assertIsNone(again.delta)
+        self.assertSameResult(again, self.run_workloads(self.raw))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import sys
+import unittest
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, HERE)
+
+from algorithmPolicy import RAW_SCHEMA, SIGNATURE_COLUMN, loadWorkloadPolicy, loadInstructorTrack, loadSpecialCourses
+from machine_outputs import buildCourseTable
+from partitioned import computePartitioned, partitionLabels
+from table_reader import readTable, RAW_SHEET
+from workloads import compute_workloads, facultySummary
+
+SAMPLE = os.path.join(HERE, "FIle 1 choke a goat.xlsx")
+
+# AST 570-001 is co-convened with AST 470-001; BIO 479-001 is taught by three
+# instructors. The rows given here are moved to another unit, splitting each
+# bundle / group across two units.
+CROSS_UNIT = (("AST 570-001", None), ("BIO 479-001", 1020252))
+LINKED = ({"AST 470-001", "AST 570-001"}, {"BIO 479-001"})
+
+
+class PartitionedRunTest(unittest.TestCase):
+    """A run split by term / unit across processes must equal the serial run."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.policy = loadWorkloadPolicy(os.path.join(HERE, "workload_policy.xlsx"))
+        cls.tracks = loadInstructorTrack(os.path.join(HERE, "Instructor Track.xlsx"))
+        cls.special = loadSpecialCourses(os.path.join(HERE, "CEFNS courses with extra load assigned.xlsx"))
+        first = cls.run_workloads(readTable(SAMPLE, sheet_name=RAW_SHEET, schema=RAW_SCHEMA))
+
+        raw = first.raw.copy()
+        units = raw["Unit"].astype(str)
+        for courseKey, emplid in CROSS_UNIT:
+            rows = {c.rowSignature for c in first.courses
+                    if c.courseKey() == courseKey and emplid in (None, c.instructorEmplid)}
+            at = raw[SIGNATURE_COLUMN].isin(rows)
+            other = next(u for u in units.unique() if u not in set(units[at]))
+            raw.loc[at, "Unit"] = other
+        # a second term, so there are term partitions as well
+        raw = raw.drop(columns=SIGNATURE_COLUMN)
+        cls.serial = cls.run_workloads(pd.concat([raw, raw.assign(Term=raw["Term"] + 6)], ignore_index=True))
+
+    @classmethod
+    def run_workloads(cls, raw):
+        return compute_workloads(raw, cls.policy, cls.tracks, cls.special)
+
+    def test_linked_units_share_a_partition(self):
+        raw = self.serial.raw
+        labels = partitionLabels(raw, by_unit=True)
+        self.assertGreater(labels.max(), 2)
+        for courseKeys in LINKED:
+            rows = {c.rowSignature for c in self.serial.courses if c.courseKey() in courseKeys}
+            linked = raw[SIGNATURE_COLUMN].isin(rows).to_numpy()
+            self.assertGreater(raw.loc[linked, "Unit"].nunique(), 1)
+            # one partition per term
+            self.assertEqual(len(set(labels[linked])), raw.loc[linked, "Term"].nunique())
+
+    def test_partitioned_runs_match_serial_run(self):
+        for by_unit, workers in ((False, 2), (True, 2), (True, 1)):
+            with self.subTest(by_unit=by_unit, workers=workers):
+                faculty, courses, _, _ = computePartitioned(self.serial.raw, self.policy, self.tracks, self.special,
+                                                            by_unit=by_unit, workers=workers)
+                self.assertEqual([c.rowSignature for c in courses], [c.rowSignature for c in self.serial.courses])
+                pd.testing.assert_frame_equal(facultySummary(faculty), self.serial.summary)
+                pd.testing.assert_frame_equal(buildCourseTable(faculty), self.serial.courseTable)
+
+
+if __name__ == "__main__":
+    unittest.main()
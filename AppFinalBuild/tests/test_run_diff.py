@@ -0,0 +1,57 @@
+import os
+import sys
+import unittest
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, HERE)
+
+from algorithmPolicy import RAW_SCHEMA, SIGNATURE_COLUMN, loadWorkloadPolicy, loadInstructorTrack, loadSpecialCourses
+from run_diff import diffCourses
+from table_reader import readTable, RAW_SHEET
+from workloads import compute_workloads
+
+SAMPLE = os.path.join(HERE, "FIle 1 choke a goat.xlsx")
+
+
+class RunDiffTest(unittest.TestCase):
+    """Changed sections are explained by what moved, in the row or in what it is priced with."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.policy = loadWorkloadPolicy(os.path.join(HERE, "workload_policy.xlsx"))
+        cls.tracks = loadInstructorTrack(os.path.join(HERE, "Instructor Track.xlsx"))
+        cls.special = loadSpecialCourses(os.path.join(HERE, "CEFNS courses with extra load assigned.xlsx"))
+        result = compute_workloads(readTable(SAMPLE, sheet_name=RAW_SHEET, schema=RAW_SCHEMA),
+                                   cls.policy, cls.tracks, cls.special)
+        cls.raw, cls.courses, cls.base = result.raw, result.courses, result.courseTable
+
+    @classmethod
+    def courseTable(cls, raw, policy=None):
+        return compute_workloads(raw, policy or cls.policy, cls.tracks, cls.special).courseTable
+
+    def edited(self, course, field, delta):
+        raw = self.raw.copy()
+        at = raw[SIGNATURE_COLUMN].isin({c.rowSignature for c in self.courses if c.courseKey() == course})
+        self.assertTrue(at.any())
+        raw.loc[at, field] = raw.loc[at, field] + delta
+        return raw
+
+    def changes(self, new):
+        diff = diffCourses(self.base, new)
+        return dict(zip(diff["Course"], diff["Changed Fields"]))
+
+    def test_coconvened_representative_takes_its_members_cause(self):
+        # AST 570-001 is the non-representative section of AST 470-001's bundle
+        changes = self.changes(self.courseTable(self.edited("AST 570-001", "Enroll Total", 150)))
+        self.assertEqual(changes["AST 570-001"], "enrollment")
+        self.assertEqual(changes["AST 470-001"], "enrollment of AST 570-001")
+
+    def test_policy_is_blamed_only_when_it_changed(self):
+        policy = dict(self.policy, lectureRate=self.policy["lectureRate"] + 1.0)
+        changes = self.changes(self.courseTable(self.raw, policy))
+        self.assertTrue(changes)
+        self.assertEqual(set(changes.values()), {"policy / rules"})
+
+
+if __name__ == "__main__":
+    unittest.main()
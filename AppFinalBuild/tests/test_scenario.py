@@ -0,0 +1,108 @@
+import os
+import sys
+import unittest
+from collections import Counter
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, HERE)
+
+from algorithmPolicy import RAW_SCHEMA, SIGNATURE_COLUMN, loadWorkloadPolicy, loadInstructorTrack, loadSpecialCourses
+from scenario import Scenario
+from table_reader import readTable, RAW_SHEET
+from workloads import compute_workloads
+
+SAMPLE = os.path.join(HERE, "FIle 1 choke a goat.xlsx")
+
+# sections of the sample export: AST 570-001 is the non-representative half of
+# a co-convened bundle, BIO 479-001 and BIO 498-003 are team-taught
+COCONVENED = ("AST 570-001", 3330798)
+TEAM_TAUGHT = ("BIO 479-001", 1020252)
+SHARED = ("BIO 498-003", 1079102)
+
+
+class ScenarioTest(unittest.TestCase):
+    """Scenario edits must leave the model as a full run of the edited export would."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.policy = loadWorkloadPolicy(os.path.join(HERE, "workload_policy.xlsx"))
+        cls.tracks = loadInstructorTrack(os.path.join(HERE, "Instructor Track.xlsx"))
+        cls.special = loadSpecialCourses(os.path.join(HERE, "CEFNS courses with extra load assigned.xlsx"))
+        cls.raw = cls.run_workloads(readTable(SAMPLE, sheet_name=RAW_SHEET, schema=RAW_SCHEMA)).raw
+
+    @classmethod
+    def run_workloads(cls, raw):
+        return compute_workloads(raw, cls.policy, cls.tracks, cls.special)
+
+    def setUp(self):
+        result = self.run_workloads(self.raw)
+        self.scenario = Scenario(result.faculty, result.courses)
+
+    # the same edits made to the export, for the full run to compare against
+    def rows(self, raw, courseKey, emplid=None):
+        sigs = {c.rowSignature for c in self.scenario.find(courseKey, emplid)}
+        return raw[SIGNATURE_COLUMN].isin(sigs)
+
+    def setRaw(self, raw, courseKey, enroll):
+        raw.loc[self.rows(raw, courseKey), "Enroll Total"] = enroll
+
+    def moveRaw(self, raw, courseKey, fromEmplid, toEmplid):
+        dst = self.scenario.faculty[toEmplid]
+        at = self.rows(raw, courseKey, fromEmplid)
+        raw.loc[at, "Instructor Emplid"] = toEmplid
+        raw.loc[at, "Instructor"] = dst.name
+        raw.loc[at, "Instructor Email"] = dst.email
+
+    def assertMatchesFullRun(self, raw):
+        full = self.run_workloads(raw.drop(columns=SIGNATURE_COLUMN))
+        totals = {e: round(f.totalLoad, 6) for e, f in self.scenario.faculty.items() if f.courses}
+        self.assertEqual(totals, {e: round(f.totalLoad, 6) for e, f in full.faculty.items()})
+        loads = lambda courses: Counter((c.courseKey(), c.instructorEmplid, round(c.load, 6)) for c in courses)
+        self.assertEqual(loads(self.scenario.courses), loads(full.courses))
+
+    def otherInstructor(self, courseKey):
+        taken = {c.instructorEmplid for c in self.scenario.find(courseKey)}
+        return next(e for e, f in self.scenario.faculty.items() if e not in taken and len(f.courses) > 1)
+
+    def test_set_enrollment_of_coconvened_section(self):
+        raw = self.raw.copy()
+        self.scenario.setEnrollment(COCONVENED[0], 164)
+        self.setRaw(raw, COCONVENED[0], 164)
+        self.assertMatchesFullRun(raw)
+
+    def test_set_enrollment_of_team_taught_section(self):
+        raw = self.raw.copy()
+        self.scenario.setEnrollment(TEAM_TAUGHT[0], 120)
+        self.setRaw(raw, TEAM_TAUGHT[0], 120)
+        self.assertMatchesFullRun(raw)
+
+    def test_move_sections(self):
+        raw = self.raw.copy()
+        for courseKey, emplid in (COCONVENED, SHARED):
+            to = self.otherInstructor(courseKey)
+            self.moveRaw(raw, courseKey, emplid, to)
+            self.scenario.moveSection(courseKey, emplid, to)
+            self.assertMatchesFullRun(raw)
+
+    def test_undo_and_redo(self):
+        raw = self.raw.copy()
+        to = self.otherInstructor(COCONVENED[0])
+        self.moveRaw(raw, COCONVENED[0], COCONVENED[1], to)
+        self.setRaw(raw, TEAM_TAUGHT[0], 3)
+        self.scenario.moveSection(COCONVENED[0], COCONVENED[1], to)
+        self.scenario.setEnrollment(TEAM_TAUGHT[0], 3)
+
+        while self.scenario.undo():
+            pass
+        self.assertMatchesFullRun(self.raw)
+        self.assertTrue(self.scenario.facultyDiff().empty)
+        self.assertTrue(self.scenario.courseDiff().empty)
+
+        while self.scenario.redo():
+            pass
+        self.assertMatchesFullRun(raw)
+        self.assertEqual(len(self.scenario.history()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, HERE)
+
+from PyQt6.QtCore import QCoreApplication
+
+from algorithmPolicy import (
+    RAW_SCHEMA, loadRawData, prepareRawData, loadWorkloadPolicy, loadInstructorTrack, loadSpecialCourses
+)
+from partitioned import MIN_PARALLEL_ROWS
+from table_reader import readTable, RAW_SHEET
+from worker import WorkerClient
+from workloads import compute_workloads
+
+SAMPLE = os.path.join(HERE, "FIle 1 choke a goat.xlsx")
+TIMEOUT_S = 300
+
+
+class WorkerClientTest(unittest.TestCase):
+    """Runs through the GUI's worker process, as main.py submits them."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+        cls.folder = tempfile.mkdtemp()
+        # enough terms of the sample for a partitioned run to start its process
+        # pool (counted after the sample's repeated rows are dropped)
+        raw = readTable(SAMPLE, sheet_name=RAW_SHEET, schema=RAW_SCHEMA)
+        copies = -(-MIN_PARALLEL_ROWS // len(prepareRawData(raw)[0]))
+        big = pd.concat([raw.assign(Term=raw["Term"] + 2 * k) for k in range(copies)], ignore_index=True)
+        cls.raw_file = os.path.join(cls.folder, "raw.csv")
+        big.to_csv(cls.raw_file, index=False)
+        cls.worker = WorkerClient()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.worker.shutdown()
+        shutil.rmtree(cls.folder, ignore_errors=True)
+
+    def submit(self, **job):
+        events = []
+        self.worker.completed.connect(lambda path: events.append(("completed", path)))
+        self.worker.error.connect(lambda message: events.append(("error", message)))
+        self.worker.submit(**job)
+        deadline = time.monotonic() + TIMEOUT_S
+        while not events and time.monotonic() < deadline:
+            self.app.processEvents()
+            time.sleep(0.05)
+        self.worker.completed.disconnect()
+        self.worker.error.disconnect()
+        self.assertTrue(events, "the worker did not finish in time")
+        return events[0]
+
+    def test_partitioned_run(self):
+        files = [os.path.join(HERE, name) for name in
+                 ("workload_policy.xlsx", "Instructor Track.xlsx", "CEFNS courses with extra load assigned.xlsx")]
+        event = self.submit(raw_file_path=self.raw_file, policy_file_path=files[0], track_file_path=files[1],
+                            special_file_path=files[2], partitions="unit", workers=2)
+        self.assertEqual(event[0], "completed", event[1])
+        self.assertTrue(os.path.exists(event[1]))
+
+        raw, _ = loadRawData(self.raw_file)
+        self.assertGreaterEqual(len(raw), MIN_PARALLEL_ROWS)
+        serial = compute_workloads(raw, loadWorkloadPolicy(files[0]), loadInstructorTrack(files[1]),
+                                   loadSpecialCourses(files[2]))
+        self.assertEqual({e: f.totalLoad for e, f in self.worker.faculty.items()},
+                         {e: f.totalLoad for e, f in serial.faculty.items()})
+
+
+if __name__ == "__main__":
+    unittest.main()
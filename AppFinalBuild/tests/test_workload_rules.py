@@ -0,0 +1,59 @@
+import os
+import sys
+import unittest
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, HERE)
+
+from algorithmPolicy import loadWorkloadPolicy
+from workload_rules import CompiledRules, DEFAULT_RULES, enrollmentBands, loadRuleTable
+
+
+def price(policy, category, enrollments, units=1.0):
+    n = len(enrollments)
+    return CompiledRules(policy).evaluate({
+        "classCat": ["x 100"] * n,
+        "catNbr": ["100"] * n,
+        "courseCategory": [category] * n,
+        "instructorRole": ["pi"] * n,
+        "maxUnits": [units] * n,
+        "enrollTotal": enrollments,
+    }).tolist()
+
+
+class EnrollmentBandTest(unittest.TestCase):
+    def test_lecture_band_edges_are_inclusive(self):
+        policy = loadWorkloadPolicy()
+        # lectureThreshold low/mid/high = 90/150/200 -> midRate from 90, highRate from 151, maxRate from 201
+        self.assertEqual(price(policy, "lecture", [89, 90, 150, 151, 200, 201]),
+                         [3.33, 4.17, 4.17, 5.0, 5.0, 6.66])
+
+    def test_laboratory_ships_without_bands(self):
+        policy = loadWorkloadPolicy()
+        self.assertEqual(enrollmentBands(policy)["laboratory"], [])
+        self.assertEqual(price(policy, "laboratory", [1, 24, 500]), [5.0, 5.0, 5.0])
+
+    def test_laboratory_band_table_from_policy(self):
+        policy = loadWorkloadPolicy()
+        policy["enrollmentBands_laboratory"] = "24:6; 48:7.5"
+        policy["enrollmentBands"] = enrollmentBands(policy)
+        self.assertEqual(price(policy, "laboratory", [23, 24, 47, 48], units=2.0), [10.0, 12.0, 12.0, 15.0])
+
+
+class RuleOrderTest(unittest.TestCase):
+    def test_lecture_is_matched_before_laboratory(self):
+        shipped = loadRuleTable(os.path.join(HERE, "workload_policy.xlsx"))
+        for rules in (DEFAULT_RULES, shipped):
+            names = [r["Rule"] for r in rules]
+            self.assertLess(names.index("Lecture"), names.index("Laboratory"))
+
+    def test_mixed_component_is_priced_as_lecture(self):
+        policy = loadWorkloadPolicy()
+        # lectureRate / lecture bands, then the 20/3 per-unit cap
+        self.assertEqual(price(policy, "lecture/laboratory", [10, 120, 300], units=2.0), [6.66, 8.34, 13.32])
+        self.assertEqual(price(policy, "lecture/laboratory", [300], units=2.0),
+                         price(policy, "lecture", [300], units=2.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
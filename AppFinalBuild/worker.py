@@ -0,0 +1,211 @@
+import queue
+import atexit
+import multiprocessing
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from cancellation import outputPaths, snapshotOutputs, restoreOutputs, discardSnapshot
+
+# ---------------------------------------------------------------------------
+# Worker process
+#
+# The GUI hands each run to one long-lived process instead of a QThread, so
+# pandas / openpyxl never hold the GIL the Qt event loop needs. The process
+# imports the pipeline once at start-up (while the user is still picking
+# files) and stays warm between runs; it also keeps the last run's RunState,
+# so incremental runs never ship the model back and forth. Events come back
+# over a queue that the GUI polls from its own event loop:
+#
+#   ("progress", pct)
+#   ("completed", summary_path, {"faculty": ..., "courses": ..., "cube": ...,
+#                                "facultyTable": ..., "courseTable": ...,
+#                                "delta": ...})
+#   ("cancelled",)
+#   ("error", message)
+#
+# cancel() sets a shared event the run checks at its checkpoints; if the run
+# has not stopped within CANCEL_GRACE_MS (e.g. it is inside one long file
+# read) the process is terminated, the outputs put back as they were before
+# the run (see cancellation.py) and a fresh worker started.
+#
+# The process is not a daemon – daemonic processes may not start the process
+# pool of a partitioned run – so it is stopped explicitly: shutdown() from the
+# window's closeEvent, an atexit hook for any other way out, and the process
+# itself leaves once it sees the GUI process is gone.
+#
+# preload(kind, path) asks the process to parse an input file as soon as it
+# is picked (see input_cache.py); it is queued like a run, so a run submitted
+# while the raw export is still being parsed simply waits for – and then
+# reuses – that parse.
+# ---------------------------------------------------------------------------
+
+POLL_MS = 50
+CANCEL_GRACE_MS = 300
+# how often an idle worker checks that the GUI process is still there
+PARENT_POLL_S = 1.0
+
+
+def _jobs(jobs):
+    """Jobs until the GUI sends None, or exits without sending it."""
+    parent = multiprocessing.parent_process()
+    while True:
+        try:
+            job = jobs.get(timeout=PARENT_POLL_S)
+        except queue.Empty:
+            if parent is not None and not parent.is_alive():
+                return
+            continue
+        if job is None:
+            return
+        yield job
+
+
+def _serve(jobs, events, cancel_event):
+    # warm-up: every heavy import happens here, before the first job arrives
+    from excel_processor import WorkloadJob
+    from cancellation import CancelToken, Cancelled
+    from input_cache import InputCache
+
+    cancel = CancelToken(cancel_event)
+    inputs = InputCache()
+    last_state = None
+    for job in _jobs(jobs):
+        if "preload" in job:
+            inputs.preload(job["preload"], job["path"])
+            continue
+        job = dict(job)
+        incremental = job.pop("incremental", False)
+        try:
+            run = WorkloadJob(**job, previous_state=last_state if incremental else None, inputs=inputs)
+            out_file = run.run(lambda pct: events.put(("progress", pct)), cancel)
+            last_state = run.state
+            events.put(("completed", out_file, {"faculty": run.faculty, "courses": run.courses, "cube": run.cube,
+                                                "facultyTable": run.result.facultyTable,
+                                                "courseTable": run.result.courseTable,
+                                                "delta": run.result.delta}))
+        except Cancelled:
+            last_state = None
+            events.put(("cancelled",))
+        except Exception as e:
+            # a failed delta run may have left the model half patched
+            last_state = None
+            events.put(("error", str(e)))
+
+
+class WorkerClient(QObject):
+    """GUI side of the worker process; emits the same signals ExcelProcessor did."""
+    progress = pyqtSignal(int)
+    completed = pyqtSignal(str)
+    error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # spawn everywhere, so Linux/macOS behave like the Windows build
+        self._context = multiprocessing.get_context("spawn")
+        self.process = None
+        self.busy = False
+        # bumped per submit, so a late forced cancel never hits the next run
+        self._job = 0
+        self._snapshot = {}
+        # copies of the last finished run, for what-if scenarios and the GUI
+        self.faculty = None
+        self.courses = None
+        self.cube = None
+        # its per-faculty / per-course tables, for the results preview
+        self.facultyTable = None
+        self.courseTable = None
+        # row / course counts of an incremental run, None after a full run
+        self.delta = None
+        self._start()
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._poll)
+        self._timer.start(POLL_MS)
+        # runs before multiprocessing's own exit hook, which would wait on the process
+        atexit.register(self._stop)
+
+    def _start(self):
+        self.jobs = self._context.Queue()
+        self.events = self._context.Queue()
+        self.cancel_event = self._context.Event()
+        self.process = self._context.Process(target=_serve, args=(self.jobs, self.events, self.cancel_event))
+        self.process.start()
+
+    def submit(self, **job):
+        """Queues one run; keyword arguments are WorkloadJob's, plus incremental=True/False."""
+        if not self.process.is_alive():
+            self._start()
+        self.cancel_event.clear()
+        self._job += 1
+        self._snapshot = snapshotOutputs(outputPaths(job["raw_file_path"], job.get("output_mode", "xlsx"),
+                                                     job.get("machine_outputs", False)))
+        self.busy = True
+        self.jobs.put(job)
+
+    def preload(self, kind, path):
+        """Parses an input file in the background ahead of the run; kind is an input_cache.LOADERS key."""
+        if not path:
+            return
+        if not self.process.is_alive():
+            self._start()
+        self.jobs.put({"preload": kind, "path": path})
+
+    def cancel(self):
+        """Asks the running job to stop; forces it after CANCEL_GRACE_MS."""
+        if not self.busy:
+            return
+        self.cancel_event.set()
+        job = self._job
+        QTimer.singleShot(CANCEL_GRACE_MS, lambda: self._forceCancel(job))
+
+    def _forceCancel(self, job):
+        if not self.busy or job != self._job:
+            return
+        self.process.terminate()
+        self.process.join(1.0)
+        restoreOutputs(self._snapshot)
+        self.busy = False
+        self.cancelled.emit()
+        self._start()
+
+    def _poll(self):
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == "progress":
+                self.progress.emit(event[1])
+            elif event[0] == "cancelled":
+                # the job put its outputs back itself
+                self.busy = False
+                discardSnapshot(self._snapshot)
+                self.cancelled.emit()
+            elif event[0] == "completed":
+                self.busy = False
+                discardSnapshot(self._snapshot)
+                results = event[2]
+                self.faculty, self.courses, self.cube = results["faculty"], results["courses"], results["cube"]
+                self.facultyTable, self.courseTable = results["facultyTable"], results["courseTable"]
+                self.delta = results["delta"]
+                self.completed.emit(event[1])
+            else:
+                self.busy = False
+                discardSnapshot(self._snapshot)
+                self.error.emit(event[1])
+        if self.busy and not self.process.is_alive():
+            self.busy = False
+            restoreOutputs(self._snapshot)
+            self.error.emit(f"The worker process stopped unexpectedly (exit code {self.process.exitcode}).")
+            self._start()
+
+    def shutdown(self, timeout=2.0):
+        self._timer.stop()
+        self._stop(timeout)
+
+    def _stop(self, timeout=2.0):
+        if self.process is not None and self.process.is_alive():
+            self.jobs.put(None)
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
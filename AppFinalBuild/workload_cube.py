@@ -0,0 +1,110 @@
+from collections import defaultdict
+
+import pandas as pd
+
+from report_common import displayed_load, is_balanced, term_text
+
+# ---------------------------------------------------------------------------
+# Unit × Track × Term aggregation cube
+#
+# Every faculty member is counted once in each (unit, track, term) cell they
+# teach in, and once in each of the roll-ups where any of the three is "ALL".
+# The cells are built with a single groupby over that membership table and
+# hold the count, the load of the members' own courses in that unit / term,
+# balanced / out-of-range counts and the emplids sorted by whole-year load
+# (highest first, the order the unit sheets list them in), so a report asking
+# for "CT faculty in Forestry" or "everyone, all terms" is a dictionary lookup.
+# Balance is judged against the annual track targets, so it is only counted
+# in the all-terms cells; per-term cells leave it as None.
+# ---------------------------------------------------------------------------
+
+ALL = "ALL"
+
+CUBE_COLUMNS = ["Unit", "Track", "Term", "Faculty", "Total Load", "Balanced", "Out of Range"]
+
+
+def track_key(track) -> str:
+    return (track or "").strip().upper() or "UNKNOWN"
+
+
+class CubeCell:
+    def __init__(self, emplids=(), totalLoad=0.0, balanced=0):
+        self.emplids = list(emplids)
+        self.count = len(self.emplids)
+        self.totalLoad = totalLoad
+        # None in per-term cells (see above)
+        self.balanced = balanced
+        self.outOfRange = None if balanced is None else self.count - balanced
+
+
+_EMPTY = CubeCell()
+
+
+class WorkloadCube:
+    def __init__(self, facultyDict, cells: dict, units: list, terms: list):
+        self.facultyDict = facultyDict
+        self.cells = cells
+        # units in first-seen order (the order the unit sheets are written in)
+        self.units = units
+        self.terms = terms
+
+    @classmethod
+    def build(cls, facultyDict) -> "WorkloadCube":
+        rows = []
+        units = {}
+        for order, (emplid, fac) in enumerate(facultyDict.items()):
+            track = track_key(fac.track)
+            balanced = int(is_balanced(track, displayed_load(fac)))
+            # (unit, term) -> load of this member's courses there, roll-ups included
+            slices = defaultdict(float, {(ALL, ALL): 0.0})
+            for c in fac.courses.values():
+                unit, term = c.unit.strip(), term_text(c.rawData.get("Term"))
+                load = c.calculateLoad() if c.load is None else c.load
+                if unit:
+                    units.setdefault(unit, None)
+                for u in {unit, ALL}:
+                    if not u:
+                        continue
+                    for t in {term, ALL}:
+                        slices[(u, t)] += load
+            for (u, t), load in slices.items():
+                for tr in (track, ALL):
+                    rows.append((u, tr, t, emplid, order, fac.totalLoad or 0.0, load, balanced))
+
+        df = pd.DataFrame.from_records(
+            rows, columns=["Unit", "Track", "Term", "Emplid", "Order", "Whole", "Load", "Balanced"]
+        )
+        # highest whole-year load first; ties keep faculty order
+        df = df.sort_values(["Whole", "Order"], ascending=[False, True], kind="mergesort")
+
+        grouped = df.groupby(["Unit", "Track", "Term"], sort=False).agg(
+            emplids=("Emplid", list), total=("Load", "sum"), balanced=("Balanced", "sum")
+        )
+        cells = {
+            key: CubeCell(r.emplids, float(r.total), int(r.balanced) if key[2] == ALL else None)
+            for key, r in zip(grouped.index, grouped.itertuples(index=False))
+        }
+        terms = sorted({t for _, _, t in cells if t != ALL})
+        return cls(facultyDict, cells, list(units), terms)
+
+    # ------------------------------------------------------------------
+    def cell(self, unit=ALL, track=ALL, term=ALL) -> CubeCell:
+        return self.cells.get((unit, track_key(track) if track != ALL else ALL, term), _EMPTY)
+
+    def faculty(self, unit=ALL, track=ALL, term=ALL) -> list:
+        """FacultyMember objects of one cell, highest load first."""
+        return [self.facultyDict[e] for e in self.cell(unit, track, term).emplids]
+
+    def breakdown(self, unit=ALL, term=ALL) -> tuple:
+        """(ct_well, ct_other, tt_well, tt_other) for the performance pie charts."""
+        if term != ALL:
+            raise ValueError("Balance is measured against annual targets; use term=ALL")
+        ct, tt = self.cell(unit, "CT", term), self.cell(unit, "TT", term)
+        return ct.balanced, ct.outOfRange, tt.balanced, tt.outOfRange
+
+    def toFrame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            [(u, tr, t, c.count, round(c.totalLoad, 2), c.balanced, c.outOfRange)
+             for (u, tr, t), c in self.cells.items()],
+            columns=CUBE_COLUMNS,
+        ).astype({"Balanced": "Int64", "Out of Range": "Int64"}).sort_values(["Unit", "Track", "Term"]).reset_index(drop=True)
@@ -0,0 +1,379 @@
+import os
+import json
+import math
+import hashlib
+import numpy as np
+import pandas as pd
+
+from table_reader import readTable
+
+# ---------------------------------------------------------------------------
+# Workload rule table
+#
+# Each row is one rule: match conditions -> rate formula -> cap. Rules are
+# checked top to bottom and the first match decides a course's load, so a new
+# rule is one more row (and one more mask), never a code change.
+#
+#   Class Contains / Cat Nbr Contains / Category Contains
+#       "|"-separated substrings, any of which must appear (blank = any)
+#   Role                 instructor role, exact (blank = any)
+#   Units Above / Units At Most
+#       Max Units must be > / <= these (blank = unbounded)
+#   Formula              flat | per_student | per_unit | per_unit_banded
+#   Rate                 a policy key (e.g. lectureRate) or a number
+#   Cap / Cap Per Unit   a policy key or number; "20/3" style fractions allowed
+#   Bands                per_unit_banded only: name of the enrollment band
+#                        table to use (blank = "lecture")
+# ---------------------------------------------------------------------------
+
+RULES_FILE_NAMES = ("workload_rules.csv", "workload_rules.xlsx")
+
+RULE_COLUMNS = [
+    "Rule", "Class Contains", "Cat Nbr Contains", "Category Contains", "Role",
+    "Units Above", "Units At Most", "Formula", "Rate", "Cap", "Cap Per Unit", "Bands",
+]
+
+FORMULAS = ("flat", "per_student", "per_unit", "per_unit_banded")
+
+
+def _rule(name, formula, rate, classes=None, catNbrs=None, categories=None, role=None,
+          unitsAbove=None, unitsAtMost=None, cap=None, capPerUnit=None, bands=None):
+    return dict(zip(RULE_COLUMNS, (name, classes, catNbrs, categories, role,
+                                   unitsAbove, unitsAtMost, formula, rate, cap, capPerUnit, bands)))
+
+
+# Used when no workload_rules file sits next to the policy file. Mirrors the
+# shipped workload_rules.csv.
+DEFAULT_RULES = [
+    _rule("Supplemental Instruction", "flat", "supplementalInstructionRate",
+          classes="mat 100|mat 108|mat 114|mat 125", role="st"),
+    _rule("699 and 799", "per_student", "699 and 799 Rate", catNbrs="699|799", cap=5.0),
+    _rule("Independent Study (low units)", "per_student", "independentStudyRateLow",
+          categories="independent study|research|fieldwork", unitsAtMost=2, cap="maxLoadCap"),
+    _rule("Independent Study (high units)", "per_student", "independentStudyRateHigh",
+          categories="independent study|research|fieldwork", unitsAbove=2, cap="maxLoadCap"),
+    _rule("Individualized Study (low units)", "per_unit", "independentStudyRateLow",
+          categories="individualized study - experie", unitsAtMost=2),
+    _rule("Individualized Study (high units)", "per_unit", "independentStudyRateHigh",
+          categories="individualized study - experie", unitsAbove=2),
+    # Lecture first: a component naming both (e.g. "Lecture/Laboratory") takes
+    # the lecture bands and per-unit cap
+    _rule("Lecture", "per_unit_banded", "lectureRate", categories="lecture", capPerUnit="20/3", bands="lecture"),
+    _rule("Laboratory", "per_unit_banded", "laboratoryRate", categories="laboratory", bands="laboratory"),
+    _rule("Default", "per_unit", "lectureRate"),
+]
+
+
+def _blank(v):
+    return v is None or (isinstance(v, float) and np.isnan(v)) or str(v).strip() == ""
+
+
+def loadRuleTable(policy_path: str | None = None) -> list:
+    """Reads workload_rules.csv/.xlsx from the policy file's folder, else DEFAULT_RULES."""
+    if policy_path:
+        folder = os.path.dirname(os.path.abspath(policy_path))
+        for name in RULES_FILE_NAMES:
+            path = os.path.join(folder, name)
+            if os.path.exists(path):
+                try:
+                    df = readTable(path, schema={c: "text" for c in RULE_COLUMNS})
+                    return [
+                        {c: (None if _blank(row.get(c)) else str(row.get(c)).strip()) for c in RULE_COLUMNS}
+                        for row in df.to_dict("records")
+                    ]
+                except Exception as e:
+                    print("Warning: failed to load rule table – using defaults:", e)
+                    break
+    return [dict(r) for r in DEFAULT_RULES]
+
+# ---------------------------------------------------------------------------
+# Enrollment bands
+#
+# A band table is a list of (from enrollment, rate) pairs: a course with at
+# least `from` students (inclusive, whole students) takes that band's rate;
+# below the first band the rule's own Rate applies. In the policy file each
+# table is one row, e.g.
+#     enrollmentBands_lecture    90:4.17; 151:5; 201:6.66
+# The legacy lectureThreshold_low/mid/high + midRate/highRate/maxRate rows are
+# translated into the "lecture" table when no explicit one is given. The
+# "laboratory" table ships empty – laboratoryRate at every enrollment, as
+# before – until the policy file gives an enrollmentBands_laboratory row.
+# ---------------------------------------------------------------------------
+
+BAND_KEY_PREFIX = "enrollmentBands_"
+
+
+def parseBands(text: str) -> list:
+    bands = []
+    for part in str(text).replace(",", ";").split(";"):
+        if part.strip():
+            edge, rate = part.split(":", 1)
+            bands.append((float(edge), float(rate)))
+    return sorted(bands)
+
+
+def enrollmentBands(policy: dict) -> dict:
+    """All band tables in the policy, keyed by lowercase table name."""
+    tables = {"laboratory": []}
+    thresholds = policy.get("lectureThreshold")
+    if thresholds and all(k in policy for k in ("midRate", "highRate", "maxRate")):
+        # legacy semantics: low <= s <= mid -> midRate, mid < s <= high -> highRate, s > high -> maxRate
+        tables["lecture"] = [
+            (float(thresholds["low"]), float(policy["midRate"])),
+            (float(math.floor(float(thresholds["mid"])) + 1), float(policy["highRate"])),
+            (float(math.floor(float(thresholds["high"])) + 1), float(policy["maxRate"])),
+        ]
+    for key, value in policy.items():
+        if key.startswith(BAND_KEY_PREFIX):
+            tables[key[len(BAND_KEY_PREFIX):].strip().lower()] = parseBands(value)
+    return tables
+
+# ---------------------------------------------------------------------------
+# Unit / subject overrides
+#
+# The policy sheet may carry optional "Unit" and "Subject" columns. A row with
+# either filled in overrides that parameter only for matching courses, e.g.
+#     lectureRate   3.6    Biological Sciences
+#     maxLoadCap    6             CHM
+# The most specific match wins (unit + subject, then subject, then unit; later
+# rows over earlier ones). Any numeric parameter a rule refers to can be
+# overridden, as can specialCoursesRate, the legacy band rates/thresholds and
+# enrollmentBands_* tables. Each distinct override set is compiled once as a
+# variant of the rule table; evaluate() resolves every course's variant from
+# its (unit, subject) and reads the parameters as per-course columns, so a
+# mixed-policy college is still priced in a single pass.
+# ---------------------------------------------------------------------------
+
+OVERRIDE_SCOPE_COLUMNS = ("Unit", "Subject")
+
+
+def _scopeText(v):
+    return None if _blank(v) else str(v).strip().lower()
+
+
+def scopedPolicy(policy: dict, values: dict) -> dict:
+    """policy with one override set applied, band tables rebuilt to match."""
+    scoped = {k: v for k, v in policy.items() if k != "overrides"}
+    scoped["lectureThreshold"] = dict(policy.get("lectureThreshold") or {})
+    for key, value in values.items():
+        if key.startswith("lectureThreshold_"):
+            scoped["lectureThreshold"][key[len("lectureThreshold_"):]] = value
+        else:
+            scoped[key] = value
+    scoped["enrollmentBands"] = enrollmentBands(scoped)
+    return scoped
+
+# ---------------------------------------------------------------------------
+# Compilation
+# ---------------------------------------------------------------------------
+
+def policyHash(policy: dict) -> str:
+    blob = json.dumps(policy, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def _number(v, policy, rule, field):
+    if _blank(v):
+        return None
+    if isinstance(v, (int, float)):
+        return float(v)
+    text = str(v).strip()
+    if text in policy:
+        return float(policy[text])
+    try:
+        if "/" in text:
+            num, den = text.split("/", 1)
+            return float(num) / float(den)
+        return float(text)
+    except ValueError:
+        raise ValueError(f"Rule '{rule}': {field} '{text}' is neither a number nor a policy key")
+
+
+def _tokens(v):
+    if _blank(v):
+        return None
+    return tuple(t.strip().lower() for t in str(v).split("|") if t.strip())
+
+
+# rule fields that come from policy parameters and so may differ per variant
+_SCOPED_FIELDS = ("unitsAbove", "unitsAtMost", "rate", "cap", "capPerUnit")
+
+
+class CompiledRules:
+    """Rule table resolved against one policy; evaluate() prices a whole course table at once."""
+
+    def __init__(self, policy: dict):
+        self.policy = policy
+        self.rules = []
+        for r in policy.get("rules") or DEFAULT_RULES:
+            name = r.get("Rule") or "?"
+            formula = (r.get("Formula") or "").strip().lower()
+            if formula not in FORMULAS:
+                raise ValueError(f"Rule '{name}': unknown formula '{formula}' (expected {', '.join(FORMULAS)})")
+            self.rules.append({
+                "name": name,
+                "classes": _tokens(r.get("Class Contains")),
+                "catNbrs": _tokens(r.get("Cat Nbr Contains")),
+                "categories": _tokens(r.get("Category Contains")),
+                "role": None if _blank(r.get("Role")) else str(r.get("Role")).strip().lower(),
+                "unitsAbove": _number(r.get("Units Above"), policy, name, "Units Above"),
+                "unitsAtMost": _number(r.get("Units At Most"), policy, name, "Units At Most"),
+                "formula": formula,
+                "rate": _number(r.get("Rate"), policy, name, "Rate") or 0.0,
+                "cap": _number(r.get("Cap"), policy, name, "Cap"),
+                "capPerUnit": _number(r.get("Cap Per Unit"), policy, name, "Cap Per Unit"),
+                "bands": None if _blank(r.get("Bands")) else str(r.get("Bands")).strip().lower(),
+            })
+
+        # band table name -> (sorted lower edges, rates)
+        self.bands = {
+            key: (np.array([e for e, _ in table], dtype=float), np.array([r for _, r in table], dtype=float))
+            for key, table in (policy.get("enrollmentBands") or enrollmentBands(policy)).items()
+        }
+        for r in self.rules:
+            if r["formula"] == "per_unit_banded":
+                r["bands"] = r["bands"] or "lecture"
+                if r["bands"] not in self.bands:
+                    raise ValueError(f"Rule '{r['name']}': no enrollment band table '{r['bands']}' in the policy")
+        self.specialRate = float(policy.get("specialCoursesRate", 0.005))
+
+        # (unit, subject, parameter, value), least specific first
+        overrides = [
+            (_scopeText(o.get("Unit")), _scopeText(o.get("Subject")), o["Parameter"], o["Value"])
+            for o in policy.get("overrides") or ()
+        ]
+        self.overrides = sorted(overrides, key=lambda o: (o[1] is not None, o[0] is not None))
+        # variant 0 is this table; one more per distinct override set in use
+        self.variants = [self]
+        self._variantIndex = {}
+
+    def _variant(self, unit, subject) -> int:
+        values = {}
+        for u, s, key, value in self.overrides:
+            if (u is None or u == unit) and (s is None or s == subject):
+                values[key] = value
+        if not values:
+            return 0
+        sig = tuple(sorted(values.items(), key=lambda kv: kv[0]))
+        if sig not in self._variantIndex:
+            self._variantIndex[sig] = len(self.variants)
+            self.variants.append(compileRules(scopedPolicy(self.policy, values)))
+        return self._variantIndex[sig]
+
+    def _scopes(self, table: dict, n: int) -> np.ndarray:
+        """Variant index per course, resolved once per distinct (unit, subject)."""
+        if not self.overrides or "unit" not in table:
+            return np.zeros(n, dtype=np.intp)
+        pairs = [f"{str(u).strip().lower()}\x1f{str(s).strip().lower()}" for u, s in zip(table["unit"], table["subject"])]
+        codes, uniques = pd.factorize(pd.Series(pairs, dtype=object))
+        resolved = np.array([self._variant(*pair.split("\x1f")) for pair in uniques], dtype=np.intp)
+        return resolved[codes]
+
+    def _column(self, i, field, scope, variants):
+        # a rule parameter as a scalar, or per course when overrides disagree
+        values = [self.variants[v].rules[i][field] for v in variants]
+        if values[0] is None or all(x == values[0] for x in values):
+            return values[0]
+        lookup = np.zeros(len(self.variants))
+        lookup[variants] = values
+        return lookup[scope]
+
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _containsMask(values: np.ndarray, tokens, cache: dict) -> np.ndarray:
+        # text columns are low-cardinality: test each distinct value once, then broadcast
+        key = (id(values), tokens)
+        if key not in cache:
+            uniq, inv = np.unique(values, return_inverse=True)
+            hit = np.fromiter((any(t in u for t in tokens) for u in uniq), dtype=bool, count=len(uniq))
+            cache[key] = hit[inv]
+        return cache[key]
+
+    def _banded(self, table, base, enroll):
+        # one binary search per course over the sorted edges; index 0 = below every band
+        edges, rates = self.bands[table]
+        idx = np.searchsorted(edges, enroll, side="right")
+        return np.concatenate(([base], rates))[idx]
+
+    def evaluate(self, table: dict, special=frozenset()) -> np.ndarray:
+        """
+        table holds equal-length arrays: classCat, catNbr, courseCategory,
+        instructorRole (normalized text), maxUnits and enrollTotal, plus unit
+        and subject when the policy has overrides.
+        Returns the per-course load, rounded to 2 places.
+        """
+        classCat = np.asarray(table["classCat"], dtype=object)
+        catNbr = np.asarray(table["catNbr"], dtype=object)
+        category = np.asarray(table["courseCategory"], dtype=object)
+        role = np.asarray(table["instructorRole"], dtype=object)
+        units = np.asarray(table["maxUnits"], dtype=float)
+        enroll = np.asarray(table["enrollTotal"], dtype=float)
+
+        n = len(units)
+        load = np.zeros(n)
+        open_ = np.ones(n, dtype=bool)
+        cache = {}
+        scope = self._scopes(table, n)
+        variants = np.unique(scope)
+        at = lambda x, m: x[m] if isinstance(x, np.ndarray) else x
+        for i, r in enumerate(self.rules):
+            r = {f: self._column(i, f, scope, variants) if f in _SCOPED_FIELDS else v for f, v in r.items()}
+            m = open_.copy()
+            if r["classes"]:
+                m &= self._containsMask(classCat, r["classes"], cache)
+            if r["catNbrs"]:
+                m &= self._containsMask(catNbr, r["catNbrs"], cache)
+            if r["categories"]:
+                m &= self._containsMask(category, r["categories"], cache)
+            if r["role"] is not None:
+                m &= role == r["role"]
+            if r["unitsAbove"] is not None:
+                m &= units > r["unitsAbove"]
+            if r["unitsAtMost"] is not None:
+                m &= units <= r["unitsAtMost"]
+            if not m.any():
+                continue
+
+            rate, u, e = at(r["rate"], m), units[m], enroll[m]
+            if r["formula"] == "flat":
+                value = np.full(u.shape, rate) if np.isscalar(rate) else rate
+            elif r["formula"] == "per_student":
+                value = rate * e
+            elif r["formula"] == "per_unit":
+                value = u * rate
+            elif len(variants) == 1:
+                value = u * self.variants[variants[0]]._banded(r["bands"], rate, e)
+            else:
+                # each variant has its own band tables
+                s, banded = scope[m], np.empty(u.shape)
+                for v in np.unique(s):
+                    sel = s == v
+                    banded[sel] = self.variants[v]._banded(r["bands"], self.variants[v].rules[i]["rate"], e[sel])
+                value = u * banded
+            if r["cap"] is not None:
+                value = np.minimum(value, at(r["cap"], m))
+            if r["capPerUnit"] is not None:
+                value = np.minimum(value, u * at(r["capPerUnit"], m))
+
+            load[m] = value
+            open_ &= ~m
+
+        if special:
+            specialRate = np.array([v.specialRate for v in self.variants])[scope]
+            load += np.where(self._containsMask(classCat, tuple(special), cache), units * specialRate, 0.0)
+
+        load[(enroll == 0) | (units == 0)] = 0.0
+        # python's round (correctly rounded) rather than np.round, so reported
+        # loads match the per-course calculation to the cent
+        return np.array([round(x, 2) for x in load.tolist()])
+
+
+_COMPILED: dict = {}
+
+
+def compileRules(policy: dict) -> CompiledRules:
+    """Compiles the policy's rule table once; later calls with an identical policy reuse it."""
+    key = policyHash(policy)
+    if key not in _COMPILED:
+        _COMPILED[key] = CompiledRules(policy)
+    return _COMPILED[key]
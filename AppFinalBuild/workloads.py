@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+
+from algorithmPolicy import (
+    SIGNATURE_COLUMN, DEDUPE_COLUMNS, loadWorkloadPolicy, prepareRawData, buildCourseModel, applyAssignment
+)
+from assignment import AssignmentMatrix
+from delta import RunState, inputsKey
+from partitioned import computePartitioned
+from instructor_matching import collectUnmatched
+from machine_outputs import buildCourseTable, buildFacultyTable
+from workload_cube import WorkloadCube
+from cancellation import checkpoint
+
+# ---------------------------------------------------------------------------
+# Library API
+#
+# The whole calculation on in-memory inputs, with no file I/O and no Qt:
+#
+#   from workloads import compute_workloads
+#   result = compute_workloads(raw_df, policy, tracks, special)
+#   result.facultyTable, result.courseTable, result.cube.breakdown()
+#
+# raw_df may be the raw export as read (it is typed, validated and
+# de-duplicated here) or a frame that already went through loadRawData.
+# policy defaults to loadWorkloadPolicy()'s built-in values. ExcelProcessor
+# is this plus reading the input files and writing the reports.
+# ---------------------------------------------------------------------------
+
+class Result:
+    """Everything one calculation produces; the tables are built on first use."""
+
+    def __init__(self, raw, duplicates, faculty, courses, matrix, loads, state, unmatched, delta=None):
+        self.raw = raw
+        self.duplicates = duplicates
+        self.faculty = faculty
+        # courses / matrix / loads may be None (delta runs): derived on first use
+        self._courses = courses
+        self._matrix = matrix
+        self._loads = loads
+        # feeds the next incremental run (compute_workloads(previous_state=...))
+        self.state = state
+        # emplid -> {"Instructor", "Instructor Email", "Rows", "Units"} for emplids missing from tracks
+        self.unmatched = unmatched
+        # {"added", "removed", "changed", "repriced"} for a delta run, None for a full run
+        self.delta = delta
+        # unit × track × term roll-ups shared by every report writer and the GUI
+        self.cube = WorkloadCube.build(faculty)
+        self._tables = {}
+
+    @property
+    def courses(self) -> list:
+        if self._courses is None:
+            self._courses = self.state.courses()
+        return self._courses
+
+    @property
+    def matrix(self) -> AssignmentMatrix:
+        if self._matrix is None:
+            self._matrix = AssignmentMatrix.build(self.faculty, self.courses)
+        return self._matrix
+
+    @property
+    def loads(self) -> np.ndarray:
+        if self._loads is None:
+            self._loads = np.array([c.preDivisionLoad for c in self.courses], dtype=float)
+        return self._loads
+
+    def _table(self, name, build):
+        if name not in self._tables:
+            self._tables[name] = build(self.faculty)
+        return self._tables[name]
+
+    @property
+    def courseTable(self) -> pd.DataFrame:
+        return self._table("courses", buildCourseTable)
+
+    @property
+    def facultyTable(self) -> pd.DataFrame:
+        return self._table("faculty", buildFacultyTable)
+
+    @property
+    def summary(self) -> pd.DataFrame:
+        """The "Faculty Summary" sheet."""
+        return self._table("summary", facultySummary)
+
+
+def facultySummary(faculty: dict) -> pd.DataFrame:
+    summary_rows = []
+    for fac in faculty.values():
+        units = sorted({getattr(c, 'unit', '') for c in fac.courses.values() if getattr(c, 'unit', '')})
+
+        course_list = []
+        for c in fac.courses.values():
+
+            groupFlag = (
+                bool(getattr(c, "co_convened_members", None))
+                or bool(getattr(c, "team_taught_members", None))
+            )
+
+            # base label
+            subject = c.rawData.get('Subject','').strip()
+            section = c.rawData.get('Section','').strip()
+            desc    = c.rawData.get('Class Description','').strip().title()
+            label = f"{'*' if groupFlag else ''}{subject} {c.catNbr}-{section} – {desc}"
+
+            # tag on any partner info
+            if getattr(c, 'co_convened_members', None):
+                label += f" (co‑convened with {', '.join(c.co_convened_members)})"
+            if getattr(c, 'team_taught_members', None):
+                label += f" (team‑taught with {', '.join(c.team_taught_members)})"
+
+            course_list.append(label)
+
+        course_list.sort()
+        summary_rows.append({
+            'Instructor': fac.name,
+            'Emplid': fac.emplid,
+            'Track': fac.track or 'Unknown',
+            'Total Workload': round(fac.totalLoad, 2),
+            'Units Taught': ', '.join(units),
+            'Courses Taught': '; '.join(course_list)
+        })
+
+    return pd.DataFrame(summary_rows)
+
+
+def compute_workloads(raw_df: pd.DataFrame, policy: dict | None = None, tracks: dict | None = None,
+                      special=None, previous_state: RunState | None = None, partitions: str | None = None,
+                      workers: int | None = None, cancel=None) -> Result:
+    """
+    Runs the workload calculation in memory.
+
+    previous_state  RunState of an earlier result; when its policy / tracks /
+                    special courses match, only changed rows are re-priced.
+                    The earlier result's model is patched in place, so that
+                    result and its state are consumed: keep only the new one
+                    (passing a consumed state again just does a full run)
+    partitions      None (single process), "term" or "unit" (process pool)
+    workers         pool size for partitions (None: one per core, or
+                    in-process for small exports)
+    cancel          optional cancellation.CancelToken; raises Cancelled
+    """
+    policy = policy if policy is not None else loadWorkloadPolicy()
+    tracks = tracks if tracks is not None else {}
+    special = special if special is not None else frozenset()
+
+    if SIGNATURE_COLUMN in raw_df.columns:
+        duplicates = pd.DataFrame(columns=[SIGNATURE_COLUMN] + DEDUPE_COLUMNS + ['Copies Dropped'])
+    else:
+        raw_df, duplicates = prepareRawData(raw_df)
+
+    checkpoint(cancel)
+    inputs = inputsKey(policy, tracks, special)
+    unmatched = collectUnmatched(raw_df, tracks)
+
+    patched = None
+    if previous_state is not None and previous_state.compatible(inputs):
+        # patch the previous model with the changed rows (None: rows reordered, run in full)
+        patched = previous_state.apply(raw_df, policy, tracks, special, cancel)
+    if patched is not None:
+        state, counts = patched
+        return Result(raw_df, duplicates, state.model.faculty, None, None, None, state, unmatched, counts)
+
+    if partitions:
+        # one process per term (and unit), merged in raw-file order
+        faculty, courses, matrix, loads = computePartitioned(
+            raw_df, policy, tracks, special, by_unit=partitions == "unit", workers=workers, cancel=cancel)
+    else:
+        faculty, courses = buildCourseModel(raw_df, policy, tracks, special, cancel)
+        checkpoint(cancel)
+        matrix, loads = applyAssignment(faculty, courses)
+    state = RunState.capture(inputs, faculty, courses, raw_df)
+    return Result(raw_df, duplicates, faculty, courses, matrix, loads, state, unmatched)